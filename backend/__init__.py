@@ -9,6 +9,19 @@ Example usage:
     # With specific language
     text = transcribe("audio.mp3", language="es")
     
+    # Long audio: overlapping chunks transcribed in parallel, then stitched
+    text = transcribe("long_audio.mp3", chunked=True)
+    
+    # Many files at once (sent together so vLLM batches them)
+    results = transcribe_batch(["a.mp3", "b.mp3"])
+    
+    # Requests that trickle in: hold briefly so they reach vLLM together
+    future = get_coalescer().submit("audio.mp3")
+    text = future.result()
+    
+    # From async code (many requests in flight on one event loop)
+    text = await transcribe_async("audio.mp3")
+    
     # Advanced usage with explicit URL
     from backend import voice_to_text, config
     url = config.get_transcription_url()
@@ -22,7 +35,18 @@ from backend import config
 from backend.voice_to_text import (
     voice_to_text,
     transcribe,
+    transcribe_batch,
+    BatchTranscriptionResult,
+    voice_to_text_async,
+    voice_to_text_chunked,
+    transcribe_async,
+    TranscriptionCoalescer,
+    get_coalescer,
+    TranscriptionReadiness,
+    get_readiness_manager,
+    get_cached_transcript,
     clear_client_cache,
+    aclose_async_clients,
     app,
     serve,
 )
@@ -32,8 +56,18 @@ __all__ = [
     "config",
     "transcribe",           # Convenience function (recommended)
     "transcribe_batch",     # Batch processing with concurrent requests
+    "BatchTranscriptionResult",
+    "transcribe_async",     # Async convenience function
+    "get_coalescer",        # Client-side micro-batching (shared per server)
+    "TranscriptionCoalescer",
+    "get_readiness_manager",  # Background readiness probes + keep-warm
+    "TranscriptionReadiness",
+    "get_cached_transcript",  # Transcript cache lookup (no server needed)
     "voice_to_text",        # Advanced usage
+    "voice_to_text_async",  # Advanced usage (async)
+    "voice_to_text_chunked",  # Advanced usage (long audio)
     "clear_client_cache",   # Clear cached clients (for debugging)
+    "aclose_async_clients", # Close async connection pools
     "app",
     "serve",
 ]
@@ -107,6 +107,75 @@ VOXTRAL_HUB_INSTALL: str = "huggingface-hub>=0.36.0"
 DEFAULT_TRANSCRIPTION_LANGUAGE: str = "en"
 """Default ISO language code for transcription."""
 
+TRANSCRIPTION_BATCH_MAX_CONCURRENCY: int = 32
+"""Max requests transcribe_batch() keeps in flight at once.
+Keep at or below VOXTRAL_MAX_CONCURRENT_REQUESTS so one batch lands on a single container."""
+
+TRANSCRIPTION_CHUNK_SECONDS: float = 30.0
+"""Chunk length for chunked transcription of long audio (full shorts, watch URLs).
+Audio at most this long is sent as a single request."""
+
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS: float = 2.0
+"""Audio shared by consecutive chunks; the duplicated words are removed when stitching."""
+
+TRANSCRIPTION_CHUNK_SPLIT_SEARCH_SECONDS: float = 5.0
+"""How far before the nominal chunk end to search for a quiet point to cut at."""
+
+TRANSCRIPTION_COALESCE_WINDOW_MS: float = 100.0
+"""Initial time the client-side coalescer holds requests so they reach vLLM together."""
+
+TRANSCRIPTION_COALESCE_MIN_WINDOW_MS: float = 10.0
+TRANSCRIPTION_COALESCE_MAX_WINDOW_MS: float = 500.0
+"""Bounds for the adaptive coalescing window."""
+
+TRANSCRIPTION_COALESCE_LATENCY_FRACTION: float = 0.1
+"""Adaptive window = this fraction of the observed server latency (EWMA), within the bounds above.
+Waiting 10% of a request's own latency is a small tax for landing in a shared batch."""
+
+TRANSCRIPTION_COALESCE_MAX_BATCH_SIZE: int = 16
+"""Release held requests immediately once this many are waiting."""
+
+TRANSCRIPTION_READINESS_COLD_PROBE_SECONDS: float = 5.0
+"""Seconds between /health + /v1/models probes while the server is cold or loading."""
+
+TRANSCRIPTION_READINESS_COLD_AFTER_FAILURES: int = 3
+"""Consecutive failed /health probes before a warm server is considered cold. A single
+timeout or network blip keeps it warm, so pipeline transcriptions still go out."""
+
+TRANSCRIPTION_KEEP_WARM_INTERVAL_SECONDS: float = 60.0
+"""Seconds between keep-warm probes once the server is warm.
+Must be well under VOXTRAL_SCALEDOWN_WINDOW_MINUTES so Modal never sees the container idle."""
+
+TRANSCRIPTION_KEEP_WARM_TRANSCRIBE: bool = False
+"""Also send a tiny (1s silence) transcription with each keep-warm probe, keeping the
+model's inference path hot and not just the HTTP server."""
+
+TRANSCRIPTION_READY_WAIT_SECONDS: float = 20.0
+"""How long a pipeline transcription waits for a cold server before giving up on that video."""
+
+TRANSCRIPT_CACHE_ENABLED: bool = True
+"""Cache transcripts by a hash of the decoded audio (+ model id + language).
+Reuploads, trending sounds and pipeline retries then skip the network call entirely."""
+
+TRANSCRIPT_CACHE_PATH: Path = _PROJECT_ROOT / ".cache" / "transcripts.sqlite3"
+"""SQLite file for the persistent transcript cache."""
+
+TRANSCRIPT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+"""Max total transcript text kept in the cache; least recently used entries are evicted."""
+
+TRANSCRIPTION_ASYNC_HTTP2: bool = True
+"""Use HTTP/2 for the async transcription client (many streams over few connections).
+Falls back to HTTP/1.1 if the h2 package is not installed."""
+
+TRANSCRIPTION_ASYNC_MAX_CONNECTIONS: int = 200
+"""Max open connections in the shared async connection pool."""
+
+TRANSCRIPTION_ASYNC_MAX_KEEPALIVE_CONNECTIONS: int = 50
+"""Max idle keep-alive connections kept in the async pool between requests."""
+
+TRANSCRIPTION_ASYNC_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+"""How long an idle keep-alive connection stays in the async pool."""
+
 # -----------------------------------------------------------------------------
 # Env-based settings (overridable via .env)
 # -----------------------------------------------------------------------------
@@ -115,6 +184,89 @@ def get_transcription_url() -> Optional[str]:
     """URL of the deployed vLLM server (TRANSCRIPTION_URL). Empty = start server via modal run."""
     return os.environ.get("TRANSCRIPTION_URL") or None
 
+# -----------------------------------------------------------------------------
+# Voice activity detection (local, CPU-only speech gate before transcription)
+# -----------------------------------------------------------------------------
+
+VAD_ENABLED: bool = True
+"""Run VAD on extracted audio and skip transcription + web search when there is no speech."""
+
+VAD_SAMPLE_RATE: int = 16000
+"""Sample rate (Hz) audio is decoded to for VAD."""
+
+VAD_FRAME_MS: int = 30
+"""VAD analysis frame length in milliseconds."""
+
+VAD_MIN_SPEECH_RATIO: float = 0.1
+"""Minimum fraction of speech frames for a clip to count as having speech.
+Below this, the clip is treated as music/ambient sound and transcription is skipped.
+Keep this low: a false "no speech" skips fact-checking entirely."""
+
+
+def get_no_speech_result(speech_ratio: float) -> str:
+    """
+    Result text used in place of the transcript web search when VAD finds no speech.
+
+    Formatted like format_search_results() output so the synthesis prompt's
+    "Total Sources Found:" check still works.
+    """
+    return f"""NO SPEECH DETECTED
+Speech ratio: {speech_ratio:.2f} (threshold {VAD_MIN_SPEECH_RATIO:.2f})
+The audio appears to be music, sound effects or ambient sound only. Transcription and web search were skipped.
+Total Sources Found: 0"""
+
+# -----------------------------------------------------------------------------
+# Audio fingerprint index (reuse transcript + web search for repeated sounds)
+# -----------------------------------------------------------------------------
+
+FINGERPRINT_ENABLED: bool = True
+"""Match each clip's audio against earlier clips (trending songs, reused voice-overs)
+and reuse their transcript and web search result on a confident match."""
+
+FINGERPRINT_INDEX_PATH: Path = _PROJECT_ROOT / ".cache" / "fingerprints.sqlite3"
+"""SQLite file for the fingerprint index."""
+
+FINGERPRINT_MAX_CLIPS: int = 5000
+"""Clips kept in the index; least recently matched clips are evicted."""
+
+FINGERPRINT_MIN_MATCHES: int = 20
+"""Minimum fingerprint hashes agreeing on one time offset for a match."""
+
+FINGERPRINT_MIN_MATCH_RATIO: float = 0.8
+"""Minimum share of both clips' duration (the new clip's and the stored one's, in ~1 s windows)
+that matching hashes must cover. A match reuses the whole transcript and web search, so clips
+that only share part of their audio (a trending sound followed by new speech) must not match."""
+
+# -----------------------------------------------------------------------------
+# Near-duplicate video index (reuse Gemini analysis for reuploads)
+# -----------------------------------------------------------------------------
+
+VIDEO_DEDUP_ENABLED: bool = True
+"""Match each clip's frames against earlier videos and reuse the Gemini analysis of a reupload."""
+
+VIDEO_DEDUP_INDEX_PATH: Path = _PROJECT_ROOT / ".cache" / "video_hashes.sqlite3"
+"""SQLite file for the near-duplicate video index."""
+
+VIDEO_DEDUP_MAX_VIDEOS: int = 5000
+"""Videos kept in the index; least recently matched videos are evicted."""
+
+VIDEO_DEDUP_FRAMES_PER_SECOND: float = 1.0
+"""Frames sampled per second of the (trimmed) clip for perceptual hashing."""
+
+VIDEO_DEDUP_MAX_FRAME_DISTANCE: int = 10
+"""Max Hamming distance (of 64 bits) between two frame hashes to count as the same frame."""
+
+VIDEO_DEDUP_MIN_MATCH_RATIO: float = 0.6
+"""Share of frames that must match, in both videos, to treat them as the same footage."""
+
+
+def get_video_reuse_note(video_id: str, match_ratio: float) -> str:
+    """Note appended to the verdict when the Gemini analysis was reused from a near-duplicate."""
+    return (
+        f"\n\nNote: This video appears to be a reupload of a previously analyzed video ({video_id}); "
+        f"{match_ratio:.0%} of sampled frames match. Google Gemini's analysis of that video was reused."
+    )
+
 # -----------------------------------------------------------------------------
 # Semantic Video Analysis / Gemini API
 # -----------------------------------------------------------------------------
@@ -122,11 +274,219 @@ def get_transcription_url() -> Optional[str]:
 GEMINI_MODEL_VIDEO: str = "gemini-3-flash-preview"
 """Gemini model for video analysis with multimodal support."""
 
+GEMINI_INLINE_VIDEO_MAX_BYTES: int = 14 * 1024 * 1024
+"""Videos up to this size are sent inline in the generate_content request instead of
+through the Files API (upload, poll until processed, delete). Gemini caps a whole
+request at 20 MB and inline bytes are base64-encoded (+33%), hence the margin."""
+
+GEMINI_MEDIA_PROFILES: dict[str, dict] = {
+    # Send the clip as downloaded; Gemini samples 1 fps at default resolution
+    "original": {},
+    # Same sampling, lighter file: less to send, same tokens
+    "compact": {"fps": 1.0, "max_height": 360, "audio_bitrate_kbps": 48},
+    # Fewer video tokens per frame (~66 vs ~258), audio kept for speech cues
+    "low": {"fps": 1.0, "max_height": 240, "audio_bitrate_kbps": 32, "media_resolution": "MEDIA_RESOLUTION_LOW"},
+    # Half the frames at low resolution: cheapest, may miss fast cuts
+    "minimal": {"fps": 0.5, "max_height": 240, "audio_bitrate_kbps": 24, "media_resolution": "MEDIA_RESOLUTION_LOW"},
+}
+"""Media profile presets applied to clips before Gemini analysis (see utils/media.py).
+Keys: fps, max_height, audio_bitrate_kbps, media_resolution. Compare presets with
+tests/benchmark_media_profiles.py before changing GEMINI_MEDIA_PROFILE."""
+
+GEMINI_MEDIA_PROFILE: str = "original"
+"""Default media profile for semantic analysis (a key of GEMINI_MEDIA_PROFILES)."""
+
+GEMINI_PROMPT_CACHE_ENABLED: bool = True
+"""Serve the static semantic analysis prompt from Gemini context caching instead of
+re-sending it with every video. Falls back to the uncached prompt if caching fails."""
+
+GEMINI_PROMPT_CACHE_TTL_SECONDS: float = 3600.0
+"""TTL of the cached prompt. Cache storage is billed per hour, so keep it near traffic gaps."""
+
+GEMINI_PROMPT_CACHE_RENEW_BEFORE_SECONDS: float = 300.0
+"""Extend the cache TTL when a request finds less than this much time left."""
+
+GEMINI_PROMPT_CACHE_RETRY_SECONDS: float = 600.0
+"""After a transient cache creation failure (rate limit, server error), wait this long before
+retrying. Rejected requests (other 4xx) are not retried."""
+
+GEMINI_PROMPT_CACHE_MIN_TOKENS: int = 1024
+"""Gemini's minimum context cache size (Flash models; Pro needs more). Shorter prompts, such as
+SEMANTIC_ANALYSIS_QUICK_PROMPT, are sent uncached without trying. Estimated with count_tokens."""
+
+GEMINI_POLL_INITIAL_ESTIMATE_SECONDS: float = 2.0
+"""Starting guess for Files API processing time. The first status check waits about this
+long; the estimate then follows observed processing times."""
+
+GEMINI_POLL_MIN_DELAY_SECONDS: float = 0.25
+"""Shortest wait between processing status checks (after the first)."""
+
+GEMINI_POLL_MAX_DELAY_SECONDS: float = 2.0
+"""Longest wait between processing status checks."""
+
+GEMINI_POLL_BACKOFF: float = 1.5
+"""Multiplier applied to the wait after each check that is still PROCESSING."""
+
+GEMINI_PROCESSING_TIMEOUT_SECONDS: float = 120.0
+"""Give up on an uploaded video that is still PROCESSING after this long."""
+
+GEMINI_FILE_DISPLAY_NAME_PREFIX: str = "short-detective-"
+"""Display name prefix for our uploads, so the janitor can recognize orphans."""
+
+GEMINI_FILE_JANITOR_INTERVAL_SECONDS: float = 10.0
+"""How often the background janitor deletes queued uploads."""
+
+GEMINI_FILE_ORPHAN_SWEEP_INTERVAL_SECONDS: float = 600.0
+"""How often the janitor lists our uploads to sweep orphans (also once at startup). Listing
+pages through every file in the project, so this is much longer than the delete interval."""
+
+GEMINI_FILE_ORPHAN_MAX_AGE_SECONDS: float = 3600.0
+"""Uploads older than this are swept as orphans (left by crashes). Must be well above
+the longest analysis so in-flight files of other workers aren't deleted."""
+
+SEMANTIC_MODE: str = "auto"
+"""How summarize_videos runs semantic analysis: "video" (full video to Gemini), "keyframes"
+(scene-change images + transcript through call_llm, cheaper and faster) or "auto"
+(keyframes under load or for low-risk channels, full video otherwise)."""
+
+SEMANTIC_KEYFRAMES_MAX: int = 6
+"""Maximum keyframes sent in keyframe mode."""
+
+SEMANTIC_KEYFRAMES_SAMPLE_FPS: float = 2.0
+"""Rate at which candidate frames are sampled when looking for scene changes."""
+
+SEMANTIC_KEYFRAMES_PROVIDER: str = "google"
+"""call_llm organization for keyframe mode ("openai", "anthropic" or "google")."""
+
+SEMANTIC_KEYFRAMES_MODEL: str = GEMINI_MODEL_VIDEO
+"""Model for keyframe mode (must accept images)."""
+
+SEMANTIC_KEYFRAMES_LOAD_THRESHOLD: int = 8
+"""In "auto" mode, switch to keyframes while this many full-video analyses are already running."""
+
+SEMANTIC_KEYFRAMES_LOW_RISK_CHANNELS: list[str] = []
+"""Channel URLs or names (case-insensitive) that get keyframe mode in "auto" mode."""
+
+SEMANTIC_KEYFRAMES_TRANSCRIPT_WAIT_SECONDS: float = 15.0
+"""How long keyframe mode waits for the transcript before analyzing without it."""
+
+
+def get_keyframe_analysis_preface(num_keyframes: int, transcript: Optional[str]) -> str:
+    """Explains to the model that it sees keyframes + transcript instead of the video."""
+    transcript_text = transcript.strip() if transcript and transcript.strip() else "Not available"
+    return f"""
+# Input Format
+
+You are NOT given the video itself. You are given {num_keyframes} keyframes taken at scene
+changes, in time order, plus the audio transcript below. Wherever the prompt asks about
+motion, audio, lip-sync or timing, use what the frames and transcript show, and say
+when something cannot be assessed from still images.
+
+**Audio Transcript:**
+{transcript_text}
+
+---
+
+"""
+
+
+SEMANTIC_TRIAGE_ENABLED: bool = True
+"""Route each video to the quick or full semantic prompt from cheap signals (transcript
+keywords, channel context, speech presence). Off: always use the full prompt."""
+
+SEMANTIC_TRIAGE_FULL_THRESHOLD: float = 1.0
+"""Triage score at which a video gets the full forensic prompt (see utils/triage.py)."""
+
+SEMANTIC_TRIAGE_TRANSCRIPT_WAIT_SECONDS: float = 1.5
+"""How long triage waits for the transcript before deciding on channel context alone (a missing
+transcript leans towards the full prompt). The wait delays the semantic branch, which must
+finish within VIDEO_STAGE_TIMEOUT_SECONDS or synthesis uses its partial analysis, so keep it
+short; the Gemini upload runs in the background meanwhile."""
+
+SEMANTIC_TRIAGE_RISK_KEYWORDS: dict[str, list[str]] = {
+    "health": [
+        "cure", "cures", "cancer", "vaccine", "vaccines", "doctors don't", "detox", "miracle",
+        "big pharma", "supplement", "weight loss", "diabetes", "autism", "immune system",
+    ],
+    "politics": [
+        "election", "president", "congress", "government", "democrats", "republicans",
+        "trump", "biden", "vote", "voting", "immigrants", "war",
+    ],
+    "conspiracy": [
+        "they don't want you to know", "cover up", "cover-up", "wake up", "mainstream media",
+        "the truth about", "hoax", "agenda", "depopulation", "secret",
+    ],
+    "finance": [
+        "guaranteed", "passive income", "crypto", "bitcoin", "get rich", "investment",
+        "stock market", "100x", "financial freedom",
+    ],
+    "breaking news": [
+        "breaking", "just happened", "shooting", "arrested", "died", "dead", "killed",
+        "hospitalized", "explosion", "attack",
+    ],
+}
+"""Transcript phrases by risk category; each category present adds 1.0 to the triage score."""
+
+SEMANTIC_TRIAGE_AI_DISCLOSURE_KEYWORDS: list[str] = [
+    "ai-generated", "ai generated", "ai-created", "ai created", "generated by ai",
+    "made with ai", "made using ai", "created with ai", "created using ai", "synthetic media",
+    "made with sora", "created with sora", "generated with sora",
+    "made with veo", "created with veo", "generated with veo",
+    "made with midjourney", "created with midjourney",
+]
+"""Channel description/keyword phrases saying the channel's own content is AI-made (adds 1.0 in
+triage, 2.0 in the channel rules). Bare terms like "ai", "sora" or "synthetic" are left out on
+purpose: they also match channels that review AI tools or words like "Sora street food"."""
+
 CHANNEL_CONTEXT_MAX_VIDEOS: int = 5
 """Maximum number of recent video/short titles to fetch for channel context in semantic analysis.
 Higher values provide more pattern detection (e.g., sensationalized titles) but take slightly longer.
 Recommended: 5-10 for balance between speed (~2-3s) and context quality."""
 
+CHANNEL_CONTEXT_TIMEOUT_SECONDS: float = 5.0
+"""How long the lightweight channel context waits for the about page and a tab with titles.
+The scrapes keep running for the full channel profile; a context missing parts is not cached."""
+
+CHANNEL_SCRAPE_SHORT_TIMEOUT_SECONDS: float = 15.0
+"""Timeout for the yt-dlp lookup of a short's channel, which every channel step waits on."""
+
+CHANNEL_SCRAPE_ABOUT_TIMEOUT_SECONDS: float = 10.0
+"""Socket timeout for the channel about-page fetch in the full channel scrape."""
+
+CHANNEL_SCRAPE_TAB_TIMEOUT_SECONDS: float = 15.0
+"""Timeout for each yt-dlp listing of the channel's videos/shorts tab. The about page and
+both tabs are scraped concurrently; a call that fails or times out is left out of the result."""
+
+CHANNEL_RULES_ENABLED: bool = True
+"""Score the scraped channel with deterministic rules (AI disclosure, sensational titles,
+subscriber/video counts, account age, link domains) and only ask the LLM for a trust
+summary when the score is ambiguous."""
+
+CHANNEL_RISK_LOW_THRESHOLD: float = -1.0
+"""Rule score at or below which a channel is clearly low risk (no LLM call)."""
+
+CHANNEL_RISK_HIGH_THRESHOLD: float = 2.0
+"""Rule score at or above which a channel is clearly high risk (no LLM call)."""
+
+CHANNEL_SUSPICIOUS_LINK_DOMAINS: list[str] = [
+    "bit.ly", "tinyurl.com", "t.me", "telegram.me", "linktr.ee", "cutt.ly", "shorturl.at",
+    "onlyfans.com", "cash.app", "binance.com",
+]
+"""External link domains (including subdomains) that add to a channel's rule score."""
+
+CHANNEL_CACHE_ENABLED: bool = True
+"""Cache channel context and the channel trust summary per channel_id, so consecutive shorts
+from the same channel skip the about-page/tab scrapes and the LLM call."""
+
+CHANNEL_CACHE_PATH: Path = _PROJECT_ROOT / ".cache" / "channels.sqlite3"
+"""SQLite file for the persistent channel cache."""
+
+CHANNEL_CACHE_TTL_SECONDS: float = 6 * 3600
+"""Entries older than this are still served, but refreshed in the background (stale-while-revalidate)."""
+
+CHANNEL_CACHE_MAX_STALE_SECONDS: float = 7 * 24 * 3600
+"""Entries older than this are not served; the channel is scraped again before answering."""
+
 SEMANTIC_ANALYSIS_PROMPT: str = """
 # Short-Form Video Integrity Analysis Prompt (Evidence-Based & Bias-Constrained)
 
@@ -422,3 +782,35 @@ If there are NO verifiable claims (garbled, entertainment-only, etc.):
     "total_found": 0
 }}"""
 
+
+# -----------------------------------------------------------------------------
+# LLM input packing (token budgets instead of character slicing)
+# -----------------------------------------------------------------------------
+
+LLM_INPUT_TOKEN_ENCODING: str = "o200k_base"
+"""tiktoken encoding used to count input tokens (matches the GPT-5 models used for the
+channel summary and the synthesis)."""
+
+CHANNEL_SUMMARY_INPUT_MAX_TOKENS: int = 1500
+"""Token budget for the scraped channel profile sent to the channel trust summary
+(serialized as compact JSON, shrunk field by field rather than cut mid-JSON)."""
+
+SYNTHESIS_INPUT_MAX_TOKENS: int = 6000
+"""Total token budget for the web search, channel and Gemini inputs of the final synthesis."""
+
+SYNTHESIS_INPUT_PRIORITIES: dict[str, float] = {
+    "semantic_analysis": 3.0,
+    "transcription": 2.0,
+    "channel_page_info": 1.0,
+}
+"""Relative share of SYNTHESIS_INPUT_MAX_TOKENS per input; unused share goes to the others."""
+
+
+# -----------------------------------------------------------------------------
+# Per-video pipeline
+# -----------------------------------------------------------------------------
+
+VIDEO_STAGE_TIMEOUT_SECONDS: float = 40.0
+"""Budget for the transcription, channel and semantic branches of one video, measured from
+when they start. Synthesis begins at the deadline with whatever has finished; branches still
+running are left to finish in the background."""
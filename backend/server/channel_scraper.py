@@ -1,28 +1,136 @@
 import sys
 import os
 import json
-import re
 import subprocess
-import urllib.request
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
-from config import CHANNEL_CONTEXT_MAX_VIDEOS
+
+_backend_dir = str(Path(__file__).resolve().parent.parent)
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
+
+from utils import ChannelCache, assess_channel, fetch_initial_data, fit_json_to_tokens, format_channel_assessment
+from config import (
+    CHANNEL_CACHE_ENABLED,
+    CHANNEL_CACHE_MAX_STALE_SECONDS,
+    CHANNEL_CACHE_PATH,
+    CHANNEL_CACHE_TTL_SECONDS,
+    CHANNEL_CONTEXT_MAX_VIDEOS,
+    CHANNEL_CONTEXT_TIMEOUT_SECONDS,
+    CHANNEL_RISK_HIGH_THRESHOLD,
+    CHANNEL_RISK_LOW_THRESHOLD,
+    CHANNEL_RULES_ENABLED,
+    CHANNEL_SCRAPE_ABOUT_TIMEOUT_SECONDS,
+    CHANNEL_SCRAPE_SHORT_TIMEOUT_SECONDS,
+    CHANNEL_SUMMARY_INPUT_MAX_TOKENS,
+    CHANNEL_SUSPICIOUS_LINK_DOMAINS,
+    LLM_INPUT_TOKEN_ENCODING,
+    SEMANTIC_TRIAGE_AI_DISCLOSURE_KEYWORDS,
+    CHANNEL_SCRAPE_TAB_TIMEOUT_SECONDS,
+)
 
 # Load .env from root folder
 root_dir = Path(__file__).resolve().parent.parent.parent
 load_dotenv(root_dir / ".env")
 
+# Top-level ytInitialData keys read from the about page
+ABOUT_PAGE_KEYS = ("metadata", "onResponseReceivedEndpoints")
+
+# Shared across videos and requests; opened on first use
+_channel_cache = None
+_channel_cache_lock = threading.Lock()
+
+
+def _get_channel_cache() -> ChannelCache:
+    global _channel_cache
+    with _channel_cache_lock:
+        if _channel_cache is None:
+            _channel_cache = ChannelCache(
+                CHANNEL_CACHE_PATH,
+                ttl_seconds=CHANNEL_CACHE_TTL_SECONDS,
+                max_stale_seconds=CHANNEL_CACHE_MAX_STALE_SECONDS,
+            )
+    return _channel_cache
+
+
+def _cached_channel_data(channel_info: dict, kind: str, fetch, is_partial=lambda value: False):
+    """fetch() through the channel cache (stale entries are refreshed in the background).
+
+    Values for which is_partial() is true are returned but never stored (not even by a
+    background refresh), so they can't replace a good entry and the next short scrapes again."""
+    channel_id = channel_info.get("channel_id")
+    if not CHANNEL_CACHE_ENABLED or not channel_id:
+        return fetch()
+    return _get_channel_cache().get_or_fetch(channel_id, kind, fetch, is_partial=is_partial)
+
+
+class ChannelProfileFetch:
+    """
+    One channel lookup per video, shared by the channel-page and semantic branches.
+
+    Resolving the channel (yt-dlp on the short) and scraping its profile (about
+    page + tabs) each run at most once; the first caller does the work and
+    concurrent callers wait for its result (or its exception). The about page
+    and tabs are scraped in the background, so a caller that needs only some of
+    them (the lightweight context) doesn't wait for the rest.
+
+    Example:
+        channel = ChannelProfileFetch(short_url)
+        # from two threads:
+        check_channel_page(short_url, channel=channel)
+        get_lightweight_channel_context(short_url, channel=channel)
+    """
+
+    def __init__(self, short_url, video_limit=10):
+        self.short_url = short_url
+        self.video_limit = video_limit
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def _once(self, name, fn):
+        with self._lock:
+            future = self._futures.get(name)
+            owner = future is None
+            if owner:
+                future = self._futures[name] = Future()
+        if owner:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def channel_info(self) -> dict:
+        """get_channel_from_short() for the short."""
+        return self._once("channel_info", lambda: get_channel_from_short(self.short_url))
+
+    def scrapes(self) -> dict:
+        """Futures of the about page and tab scrapes, started on first call (does not wait for them)."""
+        def start():
+            calls = _profile_calls(self.channel_info()["channel_url"], self.video_limit)
+            executor = ThreadPoolExecutor(max_workers=len(calls))
+            futures = {name: executor.submit(call) for name, call in calls.items()}
+            executor.shutdown(wait=False)
+            return futures
+        return self._once("scrapes", start)
+
+    def profile(self) -> dict:
+        """scrape_channel_profile() for the short's channel."""
+        return self._once("profile", lambda: _assemble_profile(self.channel_info()["channel_url"], self.scrapes()))
+
 
-def get_channel_from_short(short_url):
+def get_channel_from_short(short_url, timeout=CHANNEL_SCRAPE_SHORT_TIMEOUT_SECONDS):
     """Extract channel URL and info from a YouTube Shorts URL using yt-dlp."""
     result = subprocess.run(
         ["yt-dlp", "--dump-json", "--no-download", "--no-cache-dir", short_url],
-        capture_output=True, text=True
+        capture_output=True, text=True, timeout=timeout
     )
     if result.returncode != 0:
-        print(f"Error fetching short info: {result.stderr.strip()}")
-        sys.exit(1)
+        raise RuntimeError(f"Could not fetch short info: {result.stderr.strip()}")
 
     data = json.loads(result.stdout)
     channel_info = {
@@ -36,64 +144,72 @@ def get_channel_from_short(short_url):
     return channel_info
 
 
-def get_lightweight_channel_context(short_url, max_recent_videos=CHANNEL_CONTEXT_MAX_VIDEOS):
+def _lightweight_context_from_scrapes(
+    channel_info: dict, scrapes: dict, max_recent_videos: int, timeout: float = CHANNEL_CONTEXT_TIMEOUT_SECONDS
+) -> dict:
+    """Description, keywords and a few recent titles for get_lightweight_channel_context().
+
+    Waits up to timeout in total for the scrapes it reads; parts that failed or aren't
+    done yet are listed under "scrape_errors"."""
+    deadline = time.monotonic() + timeout
+    errors = {}
+
+    def result(name):
+        try:
+            return scrapes[name].result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeoutError:
+            errors[name] = f"not done after {timeout:g}s"
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+        return None
+
+    about = result("about") or {}
+    description = about.get("description", "")
+    keywords = about.get("keywords", "")
+
+    # A few recent titles, from the first tab that has any
+    recent_titles = []
+    for tab in ["shorts", "videos"]:
+        recent_titles = [v.get("title") or "" for v in result(tab) or []]
+        if recent_titles:
+            break
+
+    print(f"[Lightweight Context] Fetched for {channel_info.get('channel_name')}: {len(description)} char description, {len(recent_titles)} titles")
+    context = {
+        "channel_name": channel_info.get("channel_name", ""),
+        "channel_url": channel_info["channel_url"],  # Include URL for verification
+        "channel_id": channel_info.get("channel_id", ""),
+        "description": description,
+        "keywords": keywords,
+        "recent_titles": recent_titles[:max_recent_videos],
+    }
+    if errors:
+        context["scrape_errors"] = errors
+    return context
+
+
+def get_lightweight_channel_context(short_url, max_recent_videos=CHANNEL_CONTEXT_MAX_VIDEOS, channel=None):
     """
-    Get minimal channel context for semantic analysis (fast, ~2-3 seconds).
+    Get minimal channel context for semantic analysis (instant when cached).
     Returns just the description and a few recent video titles.
+
+    Pass the video's ChannelProfileFetch as channel to share the scrape with check_channel_page().
+    Returns once the about page and a tab with titles are in (or after
+    CHANNEL_CONTEXT_TIMEOUT_SECONDS), without waiting for the rest of the profile.
     """
     try:
+        if channel is None:
+            channel = ChannelProfileFetch(short_url, video_limit=max(10, max_recent_videos))
         # Get channel URL from the short
-        channel_info = get_channel_from_short(short_url)
-        channel_url = channel_info["channel_url"]
-        
-        # Get channel description (fast - just metadata)
-        about_url = channel_url.rstrip("/") + "/about"
-        req = urllib.request.Request(about_url, headers={
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        })
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            html = resp.read().decode("utf-8")
-        
-        # Extract description
-        match = re.search(r"var ytInitialData\s*=\s*({.*?});\s*</script>", html)
-        description = ""
-        keywords = ""
-        if match:
-            yt_data = json.loads(match.group(1))
-            md = yt_data.get("metadata", {}).get("channelMetadataRenderer", {})
-            description = md.get("description", "")
-            keywords = md.get("keywords", "")
-        
-        # Get a few recent video/shorts titles (fast - flat playlist)
-        recent_titles = []
-        for tab in ["shorts", "videos"]:
-            try:
-                tab_url = channel_url.rstrip("/") + "/" + tab
-                result = subprocess.run(
-                    ["yt-dlp", "--dump-json", "--flat-playlist", "--no-cache-dir", "--playlist-end", str(max_recent_videos), tab_url],
-                    capture_output=True, text=True, timeout=5
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split("\n")[:max_recent_videos]:
-                        if line:
-                            entry = json.loads(line)
-                            recent_titles.append(entry.get("title", ""))
-                    break  # Just get from first available tab
-            except:
-                continue
-        
-        context = {
-            "channel_name": channel_info.get("channel_name", ""),
-            "channel_url": channel_url,  # Include URL for verification
-            "channel_id": channel_info.get("channel_id", ""),
-            "description": description,
-            "keywords": keywords,
-            "recent_titles": recent_titles[:max_recent_videos],
-            "short_url": short_url  # Add short_url for debugging
-        }
-        print(f"[Lightweight Context] Fetched for {channel_info.get('channel_name')}: {len(description)} char description, {len(recent_titles)} titles")
-        return context
+        channel_info = channel.channel_info()
+        context = _cached_channel_data(
+            channel_info,
+            f"context:{max_recent_videos}",
+            lambda: _lightweight_context_from_scrapes(channel_info, channel.scrapes(), max_recent_videos),
+            is_partial=lambda value: "scrape_errors" in value,
+        )
+        context = {k: v for k, v in context.items() if k != "scrape_errors"}
+        return {**context, "short_url": short_url}  # Add short_url for debugging
     except Exception as e:
         print(f"Warning: Could not fetch lightweight channel context for {short_url}: {e}")
         import traceback
@@ -101,24 +217,18 @@ def get_lightweight_channel_context(short_url, max_recent_videos=CHANNEL_CONTEXT
         return None
 
 
-def scrape_channel_about(channel_url):
+def scrape_channel_about(channel_url, timeout=CHANNEL_SCRAPE_ABOUT_TIMEOUT_SECONDS):
     """Scrape channel about page by parsing YouTube's embedded JSON data."""
     about_url = channel_url.rstrip("/") + "/about"
-    req = urllib.request.Request(about_url, headers={
+    # Extract the ytInitialData JSON blob embedded in the page, decoding only the parts used below
+    yt_data = fetch_initial_data(about_url, headers={
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept-Language": "en-US,en;q=0.9",
-    })
-    with urllib.request.urlopen(req) as resp:
-        html = resp.read().decode("utf-8")
-
-    # Extract the ytInitialData JSON blob embedded in the page
-    match = re.search(r"var ytInitialData\s*=\s*({.*?});\s*</script>", html)
-    if not match:
+    }, keys=ABOUT_PAGE_KEYS, timeout=timeout)
+    if yt_data is None:
         print("Warning: Could not find ytInitialData in channel page")
         return {}
 
-    yt_data = json.loads(match.group(1))
-
     meta = {}
 
     # Get channel name/description from top-level metadata
@@ -171,53 +281,77 @@ def scrape_channel_about(channel_url):
     return meta
 
 
-def scrape_channel_videos(channel_url, limit=10):
-    """Scrape video and shorts titles and URLs from a channel."""
-    all_content = []
-
-    # Try both /videos and /shorts tabs
-    for tab in ["videos", "shorts"]:
-        tab_url = channel_url.rstrip("/") + "/" + tab
+def scrape_channel_tab(channel_url, tab, limit=10, timeout=CHANNEL_SCRAPE_TAB_TIMEOUT_SECONDS):
+    """Scrape titles and URLs from one channel tab ("videos" or "shorts")."""
+    tab_url = channel_url.rstrip("/") + "/" + tab
+    result = subprocess.run(
+        [
+            "yt-dlp", "--dump-json", "--flat-playlist", "--no-cache-dir",
+            "--playlist-end", str(limit),
+            tab_url,
+        ],
+        capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not scrape {tab} tab: {result.stderr.strip()}")
 
-        result = subprocess.run(
-            [
-                "yt-dlp", "--dump-json", "--flat-playlist", "--no-cache-dir",
-                "--playlist-end", str(limit),
-                tab_url,
-            ],
-            capture_output=True, text=True
-        )
-        if result.returncode != 0:
-            print(f"Warning: Could not scrape {tab} tab: {result.stderr.strip()}")
+    content = []
+    for line in result.stdout.strip().split("\n"):
+        if not line:
             continue
+        entry = json.loads(line)
+        content.append({
+            "title": entry.get("title"),
+            "url": entry.get("url") or f"https://www.youtube.com/watch?v={entry.get('id')}",
+            "type": tab,
+        })
+    return content
 
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            entry = json.loads(line)
-            all_content.append({
-                "title": entry.get("title"),
-                "url": entry.get("url") or f"https://www.youtube.com/watch?v={entry.get('id')}",
-                "type": tab,
-            })
 
-    return all_content
+def scrape_channel_profile(channel_url, video_limit=10):
+    """
+    Scrape about metadata and recent videos of a channel. Returns a dict.
+
+    The about page and the videos/shorts tabs are fetched concurrently, each with
+    its own timeout. Calls that fail are left out and listed under "scrape_errors".
+    """
+    calls = _profile_calls(channel_url, video_limit)
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = {name: executor.submit(call) for name, call in calls.items()}
+        return _assemble_profile(channel_url, futures)
 
 
-def scrape_channel(short_url, video_limit=10):
-    """Scrape all channel info from a YouTube Shorts URL. Returns a dict."""
-    channel_info = get_channel_from_short(short_url)
-    channel_url = channel_info["channel_url"]
-    about = scrape_channel_about(channel_url)
-    videos = scrape_channel_videos(channel_url, limit=video_limit)
-    return {**about, "videos": videos}
+def _profile_calls(channel_url, video_limit) -> dict:
+    """The scrapes making up a channel profile, by name."""
+    return {
+        "about": lambda: scrape_channel_about(channel_url),
+        "videos": lambda: scrape_channel_tab(channel_url, "videos", limit=video_limit),
+        "shorts": lambda: scrape_channel_tab(channel_url, "shorts", limit=video_limit),
+    }
 
 
-### Takes around 20s ish for 3k character dictionary
-def check_channel_page(short_url: str) -> str:
-    channel_info = scrape_channel(short_url)
+def _assemble_profile(channel_url, futures: dict) -> dict:
+    """Wait for the _profile_calls() futures and merge them into a profile dict."""
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"Warning: channel scrape of {name} failed for {channel_url}: {e}")
+            errors[name] = f"{type(e).__name__}: {e}"
 
+    profile = {**results.get("about", {}), "videos": results.get("videos", []) + results.get("shorts", [])}
+    if errors:
+        profile["scrape_errors"] = errors
+    return profile
+
+
+def summarize_channel_trust(channel_profile: dict) -> str:
+    """Short LLM summary of a channel's trustworthiness from scrape_channel_profile() output."""
     client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    # Compact JSON shrunk to the token budget (never cut mid-structure)
+    channel_json = fit_json_to_tokens(channel_profile, CHANNEL_SUMMARY_INPUT_MAX_TOKENS, LLM_INPUT_TOKEN_ENCODING)
     system_prompt = """
     You are a helpful assistant that analyzes YouTube channel information for signs of 
     misinformation, scams, or suspicious activity. Be BRIEF and CONCISE. User input may be truncated. 
@@ -227,13 +361,51 @@ def check_channel_page(short_url: str) -> str:
         model="gpt-5-mini-2025-08-07",
         messages=[
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Analyze this YouTube channel and give a short summary of its trustworthiness:\n\n{json.dumps(channel_info, indent=2)[:5000]}"}
+            {"role": "user", "content": f"Analyze this YouTube channel and give a short summary of its trustworthiness:\n\n{channel_json}"}
         ]
     )
     
     return response.choices[0].message.content
 
 
+### Slowest call bounds the scrape (about page and tabs run concurrently); instant when the channel is cached
+def check_channel_page(short_url: str, channel=None) -> str:
+    """
+    Summary of the trustworthiness of the short's channel: rule-based when the
+    channel is clearly low/high risk, otherwise from the LLM.
+
+    Pass the video's ChannelProfileFetch as channel to share the scrape with
+    get_lightweight_channel_context().
+    """
+    if channel is None:
+        channel = ChannelProfileFetch(short_url)
+    channel_info = channel.channel_info()
+
+    def fetch():
+        profile = channel.profile()
+        if CHANNEL_RULES_ENABLED:
+            assessment = assess_channel(
+                profile,
+                ai_disclosure_keywords=SEMANTIC_TRIAGE_AI_DISCLOSURE_KEYWORDS,
+                suspicious_link_domains=CHANNEL_SUSPICIOUS_LINK_DOMAINS,
+                low_threshold=CHANNEL_RISK_LOW_THRESHOLD,
+                high_threshold=CHANNEL_RISK_HIGH_THRESHOLD,
+            )
+            print(
+                f"[Channel Rules] {channel_info.get('channel_name')}: {assessment.verdict} "
+                f"(score {assessment.score:+.1f}: {'; '.join(assessment.reasons)})"
+            )
+            if assessment.verdict != "ambiguous":
+                summary = format_channel_assessment(assessment, channel_name=channel_info.get("channel_name") or "")
+                return {"profile": profile, "summary": summary}
+        return {"profile": profile, "summary": summarize_channel_trust(profile)}
+
+    entry = _cached_channel_data(
+        channel_info, "trust_summary", fetch, is_partial=lambda value: "scrape_errors" in value["profile"]
+    )
+    return entry["summary"]
+
+
 if __name__ == "__main__":
     import time
     start_time = time.perf_counter()
@@ -0,0 +1,283 @@
+"""
+Local stand-in for the Voxtral vLLM transcription server, for load testing on CPU.
+
+Implements the endpoints our client code uses from the Modal deployment in
+voice_to_text_real.serve(), with no model behind them:
+
+  POST /v1/audio/transcriptions   multipart upload, returns {"text": ...}
+  GET  /health                    503 while "starting up", then 200
+  GET  /v1/models                 empty list while loading, then the Voxtral model id
+  GET  /stats                     per-batch history (for benchmarks)
+  POST /stats/reset               clear the history
+
+Latency model (all configurable, see LatencyModel / --help):
+  - Batch window: the first request opens a batch; requests arriving within
+    batch_window_ms (up to max_batch_size) join it. This mimics vLLM grouping
+    requests that arrive close together.
+  - Batch cost: base_latency + per_audio_second * longest audio in the batch,
+    plus batch_overhead per extra request (batched inference is not free).
+  - Queueing: only gpu_slots batches run at once; later batches wait.
+  - Failure injection: failure_rate returns HTTP 500, hang_rate stalls the
+    request for hang_seconds (to exercise client timeouts).
+  - Cold start: startup_delay seconds before /health and /v1/models report ready.
+
+Run:
+    cd backend/server
+    python dummy_transcription_server.py --port 8001 --batch-window-ms 50
+
+Then point the client at it:
+    TRANSCRIPTION_URL=http://localhost:8001
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import time
+from dataclasses import dataclass, field, asdict
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+import config
+
+DEFAULT_PORT = 8001
+
+
+@dataclass
+class LatencyModel:
+    """Knobs for the stand-in server's simulated inference latency and failures."""
+    base_latency: float = 0.4
+    """Fixed cost of running one batch, in seconds."""
+    per_audio_second: float = 0.02
+    """Extra seconds per second of (the longest) audio in the batch."""
+    batch_overhead: float = 0.03
+    """Fractional slowdown per extra request in a batch (0.03 = +3% each)."""
+    batch_window_ms: float = 50.0
+    """How long a batch stays open for more requests after the first arrives."""
+    max_batch_size: int = 32
+    """Requests per batch; a full batch starts immediately."""
+    gpu_slots: int = 1
+    """Batches that can run at the same time. Extra batches queue."""
+    failure_rate: float = 0.0
+    """Probability a request fails with HTTP 500."""
+    hang_rate: float = 0.0
+    """Probability a request stalls for hang_seconds before answering."""
+    hang_seconds: float = 600.0
+    startup_delay: float = 0.0
+    """Seconds after launch before /health and /v1/models report ready."""
+    seed: Optional[int] = None
+
+
+@dataclass
+class _PendingRequest:
+    audio_seconds: float
+    arrived: float
+    future: asyncio.Future
+
+
+@dataclass
+class _BatchRecord:
+    batch_id: int
+    size: int
+    opened: float
+    started: float
+    finished: float
+    audio_seconds: list[float] = field(default_factory=list)
+
+
+class BatchScheduler:
+    """Groups requests into batches by arrival window and runs them on simulated GPU slots."""
+
+    def __init__(self, model: LatencyModel):
+        self.model = model
+        self.history: list[_BatchRecord] = []
+        self._pending: list[_PendingRequest] = []
+        self._opened: float = 0.0
+        self._window_task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._next_batch_id = 0
+
+    async def submit(self, audio_seconds: float) -> dict:
+        """Queue one request; resolves with its batch info once the batch has 'run'."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.model.gpu_slots)
+
+        request = _PendingRequest(audio_seconds, time.perf_counter(), loop.create_future())
+        if not self._pending:
+            self._opened = request.arrived
+            self._window_task = loop.create_task(self._close_after_window())
+        self._pending.append(request)
+
+        if len(self._pending) >= self.model.max_batch_size:
+            self._window_task.cancel()
+            self._dispatch()
+        return await request.future
+
+    async def _close_after_window(self):
+        await asyncio.sleep(self.model.batch_window_ms / 1000.0)
+        self._dispatch()
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch, self._opened))
+
+    async def _run_batch(self, batch: list[_PendingRequest], opened: float):
+        batch_id = self._next_batch_id
+        self._next_batch_id += 1
+
+        async with self._slots:
+            started = time.perf_counter()
+            longest = max(r.audio_seconds for r in batch)
+            cost = (self.model.base_latency + self.model.per_audio_second * longest) * (
+                1.0 + self.model.batch_overhead * (len(batch) - 1)
+            )
+            await asyncio.sleep(cost)
+            finished = time.perf_counter()
+
+        self.history.append(_BatchRecord(
+            batch_id=batch_id,
+            size=len(batch),
+            opened=opened,
+            started=started,
+            finished=finished,
+            audio_seconds=[r.audio_seconds for r in batch],
+        ))
+        for r in batch:
+            if not r.future.done():
+                r.future.set_result({
+                    "batch_id": batch_id,
+                    "batch_size": len(batch),
+                    "queue_seconds": started - r.arrived,
+                })
+
+
+def _parse_multipart(body: bytes, content_type: str) -> dict[str, tuple[Optional[str], bytes]]:
+    """Parse a multipart/form-data body into {field: (filename, payload)} without python-multipart."""
+    message = BytesParser(policy=default_policy).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def _audio_duration(audio_bytes: bytes) -> float:
+    """Duration of the uploaded audio in seconds (estimated from size if it can't be decoded)."""
+    try:
+        import soundfile as sf
+        with sf.SoundFile(io.BytesIO(audio_bytes)) as f:
+            return f.frames / f.samplerate
+    except Exception:
+        # ~128 kbps compressed audio
+        return len(audio_bytes) / 16000.0
+
+
+def create_app(model: Optional[LatencyModel] = None) -> FastAPI:
+    """Build the stand-in FastAPI app for the given latency model."""
+    model = model or LatencyModel()
+    rng = random.Random(model.seed)
+    scheduler = BatchScheduler(model)
+    launched = time.perf_counter()
+
+    app = FastAPI()
+
+    def is_ready() -> bool:
+        return time.perf_counter() - launched >= model.startup_delay
+
+    @app.get("/health")
+    def health():
+        if not is_ready():
+            return JSONResponse({"status": "starting"}, status_code=503)
+        return {"status": "ok"}
+
+    @app.get("/v1/models")
+    def models():
+        data = []
+        if is_ready():
+            data = [{"id": config.VOXTRAL_MODEL_ID, "object": "model", "owned_by": "stand-in"}]
+        return {"object": "list", "data": data}
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        if not is_ready():
+            return JSONResponse({"error": {"message": "Server is starting up"}}, status_code=503)
+
+        fields = _parse_multipart(await request.body(), request.headers.get("content-type", ""))
+        filename, audio_bytes = fields.get("file", (None, b""))
+        if not audio_bytes:
+            return JSONResponse({"error": {"message": "No audio file in request"}}, status_code=400)
+        audio_seconds = _audio_duration(audio_bytes)
+
+        if rng.random() < model.hang_rate:
+            await asyncio.sleep(model.hang_seconds)
+        if rng.random() < model.failure_rate:
+            return JSONResponse({"error": {"message": "Injected failure"}}, status_code=500)
+
+        info = await scheduler.submit(audio_seconds)
+        return JSONResponse(
+            {"text": f"Stand-in transcript of {filename or 'audio'} ({audio_seconds:.1f}s of audio)."},
+            headers={
+                "X-Batch-Id": str(info["batch_id"]),
+                "X-Batch-Size": str(info["batch_size"]),
+                "X-Queue-Seconds": f"{info['queue_seconds']:.4f}",
+            },
+        )
+
+    @app.get("/stats")
+    def stats():
+        return {
+            "latency_model": asdict(model),
+            "batches": [asdict(b) for b in scheduler.history],
+        }
+
+    @app.post("/stats/reset", status_code=204)
+    def reset_stats():
+        scheduler.history.clear()
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in transcription server for load testing")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    defaults = LatencyModel()
+    parser.add_argument("--base-latency", type=float, default=defaults.base_latency)
+    parser.add_argument("--per-audio-second", type=float, default=defaults.per_audio_second)
+    parser.add_argument("--batch-overhead", type=float, default=defaults.batch_overhead)
+    parser.add_argument("--batch-window-ms", type=float, default=defaults.batch_window_ms)
+    parser.add_argument("--max-batch-size", type=int, default=defaults.max_batch_size)
+    parser.add_argument("--gpu-slots", type=int, default=defaults.gpu_slots)
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate)
+    parser.add_argument("--hang-rate", type=float, default=defaults.hang_rate)
+    parser.add_argument("--hang-seconds", type=float, default=defaults.hang_seconds)
+    parser.add_argument("--startup-delay", type=float, default=defaults.startup_delay)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    latency_model = LatencyModel(
+        base_latency=args.base_latency,
+        per_audio_second=args.per_audio_second,
+        batch_overhead=args.batch_overhead,
+        batch_window_ms=args.batch_window_ms,
+        max_batch_size=args.max_batch_size,
+        gpu_slots=args.gpu_slots,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        startup_delay=args.startup_delay,
+        seed=args.seed,
+    )
+    print(f"Stand-in transcription server on port {args.port}: {latency_model}")
+    uvicorn.run(create_app(latency_model), host=args.host, port=args.port)
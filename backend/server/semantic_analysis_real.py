@@ -4,23 +4,69 @@ Provides detailed analysis of video content with focus on detecting misinformati
 propaganda, and agenda-pushing content.
 """
 
+import hashlib
+import math
+import mimetypes
 import os
+import sys
+import threading
 import time
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
-import time
+from typing import Callable, Iterator, Optional
 
 from google import genai
+from google.genai import errors, types
+
+_backend_dir = str(Path(__file__).resolve().parent.parent)
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
 
+from utils import LlmRequest, call_llm, count_tokens
+from utils.keyframes import extract_keyframes
+from utils.media import MediaProfile, apply_media_profile
 from config import (
+    GEMINI_INLINE_VIDEO_MAX_BYTES,
+    GEMINI_MEDIA_PROFILE,
+    GEMINI_MEDIA_PROFILES,
     GEMINI_MODEL_VIDEO,
+    GEMINI_FILE_DISPLAY_NAME_PREFIX,
+    GEMINI_FILE_JANITOR_INTERVAL_SECONDS,
+    GEMINI_FILE_ORPHAN_MAX_AGE_SECONDS,
+    GEMINI_FILE_ORPHAN_SWEEP_INTERVAL_SECONDS,
+    GEMINI_POLL_BACKOFF,
+    GEMINI_POLL_INITIAL_ESTIMATE_SECONDS,
+    GEMINI_POLL_MAX_DELAY_SECONDS,
+    GEMINI_POLL_MIN_DELAY_SECONDS,
+    GEMINI_PROMPT_CACHE_ENABLED,
+    GEMINI_PROMPT_CACHE_MIN_TOKENS,
+    GEMINI_PROMPT_CACHE_RENEW_BEFORE_SECONDS,
+    GEMINI_PROMPT_CACHE_RETRY_SECONDS,
+    GEMINI_PROMPT_CACHE_TTL_SECONDS,
+    GEMINI_PROCESSING_TIMEOUT_SECONDS,
     SEMANTIC_ANALYSIS_PROMPT,
     SEMANTIC_ANALYSIS_QUICK_PROMPT,
+    SEMANTIC_KEYFRAMES_MAX,
+    SEMANTIC_KEYFRAMES_MODEL,
+    SEMANTIC_KEYFRAMES_PROVIDER,
+    SEMANTIC_KEYFRAMES_SAMPLE_FPS,
+    get_keyframe_analysis_preface,
 )
 
 # Cache for Gemini client instances (keyed by API key)
 _client_cache: dict[str, genai.Client] = {}
 
+# Running estimate of Files API processing time (seconds), learned from uploads
+_processing_estimate = GEMINI_POLL_INITIAL_ESTIMATE_SECONDS
+_processing_estimate_lock = threading.Lock()
+
+# Background deleters for uploaded files (keyed by client; clients are cached per API key)
+_janitor_cache: dict[int, "GeminiFileJanitor"] = {}
+_janitor_lock = threading.Lock()
+
 def get_formatted_result(analysis: str, video_file: Path, video_path: str, model_name: str) -> str:
     return f"""
 {'='*80}
@@ -37,12 +83,539 @@ Model: {model_name}
 End of Analysis
 """
 
+def _observe_processing_time(seconds: float):
+    global _processing_estimate
+    with _processing_estimate_lock:
+        _processing_estimate = 0.8 * _processing_estimate + 0.2 * seconds
+
+
+def _poll_delays():
+    """
+    Sleep schedule for the PROCESSING poll loop.
+
+    The first check lands just before the learned processing time (most files are
+    ready by then), after that the delay grows exponentially from the minimum.
+    """
+    with _processing_estimate_lock:
+        first = _processing_estimate * 0.9
+    yield max(GEMINI_POLL_MIN_DELAY_SECONDS, min(first, GEMINI_POLL_MAX_DELAY_SECONDS * 4))
+    delay = GEMINI_POLL_MIN_DELAY_SECONDS
+    while True:
+        yield delay
+        delay = min(delay * GEMINI_POLL_BACKOFF, GEMINI_POLL_MAX_DELAY_SECONDS)
+
+
+def _upload_video(client: genai.Client, video_file: Path):
+    """Upload through the Files API and wait until Gemini has processed the video."""
+    start = time.time()
+    print(f"Uploading video: {video_file.name}...")
+    video_file_obj = client.files.upload(
+        file=str(video_file),
+        config={"display_name": f"{GEMINI_FILE_DISPLAY_NAME_PREFIX}{video_file.name}"},
+    )
+    end = time.time()
+    print(f"Video uploaded in {end - start} seconds")
+
+    print("Processing video...")
+    processing_start = time.time()
+    delays = _poll_delays()
+    try:
+        while video_file_obj.state.name == "PROCESSING":
+            if time.time() - processing_start > GEMINI_PROCESSING_TIMEOUT_SECONDS:
+                raise TimeoutError(f"Video still processing after {GEMINI_PROCESSING_TIMEOUT_SECONDS}s")
+            time.sleep(next(delays))
+            video_file_obj = client.files.get(name=video_file_obj.name)
+
+        if video_file_obj.state.name == "FAILED":
+            raise Exception(f"Video processing failed: {video_file_obj.state}")
+    except Exception:
+        get_file_janitor(client).schedule(video_file_obj.name)
+        raise
+
+    processing_seconds = time.time() - processing_start
+    _observe_processing_time(processing_seconds)
+    print(f"Video processed in {processing_seconds:.2f} seconds")
+    return video_file_obj
+
+
+class GeminiFileJanitor:
+    """
+    Deletes uploaded Gemini files in the background, off the request path.
+
+    Files scheduled for deletion are collected and removed in batches every
+    interval. At startup and then every orphan_sweep_interval it also sweeps
+    orphans: files we uploaded (display name starts with
+    GEMINI_FILE_DISPLAY_NAME_PREFIX) that are older than orphan_max_age, e.g.
+    left behind by a crash between upload and delete.
+
+    Example:
+        >>> janitor = get_file_janitor(client)
+        >>> janitor.schedule(uploaded_file.name)
+    """
+
+    def __init__(
+        self,
+        client: genai.Client,
+        interval: float = GEMINI_FILE_JANITOR_INTERVAL_SECONDS,
+        orphan_max_age: float = GEMINI_FILE_ORPHAN_MAX_AGE_SECONDS,
+        orphan_sweep_interval: float = GEMINI_FILE_ORPHAN_SWEEP_INTERVAL_SECONDS,
+        max_workers: int = 8,
+    ):
+        self.client = client
+        self.interval = interval
+        self.orphan_max_age = orphan_max_age
+        self.orphan_sweep_interval = orphan_sweep_interval
+        self._last_sweep = float("-inf")
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gemini-file-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Delete whatever is still pending, then stop the background thread."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def schedule(self, name: str):
+        """Queue an uploaded file for deletion on the next pass."""
+        with self._lock:
+            self._pending.add(name)
+
+    def _run(self):
+        # First pass right away: clean up after a previous crash
+        self.sweep_orphans()
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+            # Listing files is far more expensive than deleting a batch: sweep rarely
+            if not self._stopped.is_set() and time.monotonic() - self._last_sweep >= self.orphan_sweep_interval:
+                self.sweep_orphans()
+        self.flush()
+
+    def flush(self) -> int:
+        """Delete all pending files now. Returns how many were deleted."""
+        with self._lock:
+            batch, self._pending = list(self._pending), set()
+        if not batch:
+            return 0
+        deleted = sum(self._executor.map(self._delete, batch))
+        print(f"[Gemini Janitor] Deleted {deleted}/{len(batch)} uploaded files")
+        return deleted
+
+    def sweep_orphans(self) -> int:
+        """Delete our uploads older than orphan_max_age. Returns how many were deleted."""
+        self._last_sweep = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.orphan_max_age)
+        try:
+            orphans = [
+                f.name for f in self.client.files.list()
+                if (f.display_name or "").startswith(GEMINI_FILE_DISPLAY_NAME_PREFIX)
+                and f.create_time is not None and f.create_time < cutoff
+            ]
+        except Exception as e:
+            print(f"[Gemini Janitor] Could not list files: {e}")
+            return 0
+        if not orphans:
+            return 0
+        deleted = sum(self._executor.map(self._delete, orphans))
+        print(f"[Gemini Janitor] Swept {deleted}/{len(orphans)} orphaned files")
+        return deleted
+
+    def _delete(self, name: str) -> bool:
+        try:
+            self.client.files.delete(name=name)
+            return True
+        except Exception as e:
+            print(f"[Gemini Janitor] Warning: Could not delete {name}: {e}")
+            return False
+
+
+def get_file_janitor(client: genai.Client) -> GeminiFileJanitor:
+    """Shared, started janitor for a Gemini client."""
+    with _janitor_lock:
+        janitor = _janitor_cache.get(id(client))
+        if janitor is None:
+            janitor = GeminiFileJanitor(client)
+            janitor.start()
+            _janitor_cache[id(client)] = janitor
+        return janitor
+
+
+def _video_metadata(profile: MediaProfile) -> Optional[types.VideoMetadata]:
+    return types.VideoMetadata(fps=profile.fps) if profile.fps is not None else None
+
+
+def _inline_video_part(video_file: Path, profile: MediaProfile) -> types.Part:
+    """Video bytes sent directly in the generate_content request (no upload/poll/delete)."""
+    mime_type = mimetypes.guess_type(video_file.name)[0] or "video/mp4"
+    print(f"Sending video inline: {video_file.name} ({video_file.stat().st_size / 1024:.0f} KB)")
+    return types.Part(
+        inline_data=types.Blob(data=video_file.read_bytes(), mime_type=mime_type),
+        video_metadata=_video_metadata(profile),
+    )
+
+
+def _uploaded_video_part(uploaded_file, profile: MediaProfile):
+    if profile.fps is None:
+        return uploaded_file
+    return types.Part(
+        file_data=types.FileData(file_uri=uploaded_file.uri, mime_type=uploaded_file.mime_type),
+        video_metadata=_video_metadata(profile),
+    )
+
+
+def get_media_profile(name: Optional[str] = None) -> MediaProfile:
+    """
+    Look up a media profile preset from config.
+
+    Args:
+        name: Key in GEMINI_MEDIA_PROFILES. If None, uses GEMINI_MEDIA_PROFILE.
+
+    Raises:
+        ValueError: If there is no preset with that name.
+    """
+    name = name if name is not None else GEMINI_MEDIA_PROFILE
+    if name not in GEMINI_MEDIA_PROFILES:
+        raise ValueError(f"Unknown media profile {name!r}; expected one of {sorted(GEMINI_MEDIA_PROFILES)}")
+    return MediaProfile(name=name, **GEMINI_MEDIA_PROFILES[name])
+
+
+@dataclass
+class AnalysisResult:
+    """Analysis text plus the cost/latency numbers behind it (for benchmarks and logging)."""
+    text: str
+    media_profile: str
+    bytes_sent: int
+    prepare_seconds: float
+    """Applying the media profile (0 when cached or not transcoding)."""
+    upload_seconds: float
+    """Files API upload + processing (0 for inline clips)."""
+    generate_seconds: float
+    ttft_seconds: Optional[float]
+    """Time from sending the request to the first streamed chunk."""
+    prompt_tokens: Optional[int]
+    cached_tokens: Optional[int]
+    """Part of prompt_tokens served from the provider-side prompt cache."""
+    total_tokens: Optional[int]
+
+
+@dataclass
+class _CachedPrompt:
+    name: Optional[str] = None
+    expires_at: float = 0.0
+    failed_until: float = 0.0
+    in_flight: Optional[Future] = None
+    """Set while one caller creates or renews the entry; resolves to the cache name (or None)."""
+
+
+class GeminiPromptCache:
+    """
+    Provider-side cached content for static prompt prefixes (Gemini context caching).
+
+    The first request for a (client, model, prompt) creates a cache entry with a
+    TTL; later requests reference it by name, so the prompt's tokens aren't
+    processed again. Entries close to expiry get their TTL extended. Prompts under
+    min_tokens are never cached (Gemini would reject them). If creation fails,
+    requests go uncached; transient errors are retried after retry_after_seconds,
+    rejected requests are not retried.
+
+    Example:
+        >>> cache_name = get_prompt_cache().get(client, model_name, SEMANTIC_ANALYSIS_PROMPT)
+        >>> config = types.GenerateContentConfig(cached_content=cache_name) if cache_name else None
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = GEMINI_PROMPT_CACHE_TTL_SECONDS,
+        renew_before_seconds: float = GEMINI_PROMPT_CACHE_RENEW_BEFORE_SECONDS,
+        retry_after_seconds: float = GEMINI_PROMPT_CACHE_RETRY_SECONDS,
+        min_tokens: int = GEMINI_PROMPT_CACHE_MIN_TOKENS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.renew_before_seconds = renew_before_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.min_tokens = min_tokens
+        self._entries: dict[tuple, _CachedPrompt] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(client: genai.Client, model: str, prompt: str) -> tuple:
+        return id(client), model, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, client: genai.Client, model: str, prompt: str) -> Optional[str]:
+        """Name of a live cache entry holding `prompt` for `model`, or None to send it uncached.
+
+        The create/update calls run outside the lock, so other prompts aren't held up.
+        One caller per entry makes them; concurrent callers use the current entry while
+        it is still alive, or wait for that caller's result."""
+        with self._lock:
+            key = self._key(client, model, prompt)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CachedPrompt()
+                if count_tokens(prompt) < self.min_tokens:
+                    print(f"[Prompt Cache] Prompt is under {self.min_tokens} tokens, sending it uncached")
+                    entry.failed_until = math.inf
+            now = time.time()
+            if entry.failed_until > now:
+                return None
+            if entry.name is not None and entry.expires_at - now > self.renew_before_seconds:
+                return entry.name
+            live_name = entry.name if entry.name is not None and entry.expires_at > now else None
+            in_flight = entry.in_flight
+            if in_flight is None:
+                in_flight = entry.in_flight = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Being renewed: the current entry is still usable. Being created: wait for it.
+            return live_name if live_name is not None else in_flight.result()
+
+        name, expires_at, failed_until = None, 0.0, 0.0
+        try:
+            name, expires_at, failed_until = self._create_or_renew(client, model, prompt, live_name)
+        finally:
+            with self._lock:
+                entry.name, entry.expires_at, entry.failed_until = name, expires_at, failed_until
+                entry.in_flight = None
+            in_flight.set_result(name)
+        return name
+
+    def _create_or_renew(
+        self, client: genai.Client, model: str, prompt: str, live_name: Optional[str]
+    ) -> tuple[Optional[str], float, float]:
+        """Network part of get(). Returns the entry's new (name, expires_at, failed_until)."""
+        now = time.time()
+        ttl = f"{int(self.ttl_seconds)}s"
+        if live_name is not None:
+            try:
+                client.caches.update(name=live_name, config=types.UpdateCachedContentConfig(ttl=ttl))
+                print(f"[Prompt Cache] Renewed {live_name} for {ttl}")
+                return live_name, now + self.ttl_seconds, 0.0
+            except Exception as e:
+                print(f"[Prompt Cache] Could not renew {live_name}, creating a new one: {e}")
+
+        try:
+            cached = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    contents=[prompt],
+                    ttl=ttl,
+                    display_name=f"{GEMINI_FILE_DISPLAY_NAME_PREFIX}prompt",
+                ),
+            )
+        except Exception as e:
+            # Rejected requests (bad size, model without caching, auth) fail the same way every time
+            permanent = isinstance(e, errors.ClientError) and e.code != 429
+            retry = "not retrying" if permanent else f"retrying in {self.retry_after_seconds:.0f}s"
+            print(f"[Prompt Cache] Could not create cache for {model}, sending prompt uncached ({retry}): {e}")
+            return None, 0.0, math.inf if permanent else now + self.retry_after_seconds
+        print(f"[Prompt Cache] Created {cached.name} for {model} ({ttl})")
+        return cached.name, now + self.ttl_seconds, 0.0
+
+    def invalidate(self, client: genai.Client, model: str, prompt: str):
+        """Forget an entry (e.g. it expired server-side); the next get() recreates it."""
+        with self._lock:
+            self._entries.pop(self._key(client, model, prompt), None)
+
+
+_prompt_cache = GeminiPromptCache()
+
+
+def get_prompt_cache() -> GeminiPromptCache:
+    return _prompt_cache
+
+
+def _generate_streamed(
+    client: genai.Client,
+    model_name: str,
+    contents: list,
+    config,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> tuple[str, object, Optional[float]]:
+    """Stream a generation and return (text, usage metadata, seconds to first chunk).
+
+    on_chunk, if given, is called with each text chunk as it arrives."""
+    start = time.time()
+    ttft = None
+    texts = []
+    usage = None
+    for chunk in client.models.generate_content_stream(model=model_name, contents=contents, config=config):
+        if ttft is None:
+            ttft = time.time() - start
+        if chunk.text:
+            texts.append(chunk.text)
+            if on_chunk is not None:
+                on_chunk(chunk.text)
+        if chunk.usage_metadata is not None:
+            usage = chunk.usage_metadata
+    return "".join(texts), usage, ttft
+
+
+def build_channel_context_preamble(channel_context: Optional[dict]) -> str:
+    """Channel context section for the analysis prompt ("" without context).
+
+    Placed after the video in full-video mode (so the static prompt can be cached) and
+    before the keyframes preface in keyframe mode, so it doesn't refer to either position."""
+    if not channel_context:
+        return ""
+    print(f"[Semantic Analysis] Using channel context for: {channel_context.get('channel_name')} ({channel_context.get('channel_url')})")
+    return f"""
+# Channel Context (for AI Detection & Pattern Analysis)
+
+Take this information about the channel that posted the video into account:
+
+**Channel Name:** {channel_context.get('channel_name', 'Unknown')}
+**Channel URL:** {channel_context.get('channel_url', 'Unknown')}
+
+**Channel Description:**
+{channel_context.get('description', 'Not available')}
+
+**Keywords:** {channel_context.get('keywords', 'Not available')}
+
+**Recent Video/Short Titles:**
+{chr(10).join(f"- {title}" for title in channel_context.get('recent_titles', [])[:5]) or 'Not available'}
+
+---
+
+**IMPORTANT for AI-Generated Content Detection:**
+- If the channel description explicitly mentions "AI", "AI-generated", "synthetic media", or "artificial intelligence" in the context of content creation, this is a STRONG indicator the video may be AI-generated
+- If recent video titles show patterns of sensationalized or fabricated news (e.g., "fake shooting", "fake hospitalization", clickbait about celebrities), this indicates untrustworthiness
+- When channel context suggests AI generation, look MORE CAREFULLY for subtle visual artifacts:
+  * Unnatural lighting or harsh shadows
+  * Lip-sync issues or exaggerated mouth movements
+  * Slightly unnatural body movements or gestures
+  * Synthetic-looking skin textures or backgrounds
+  * Overly smooth or plasticky facial features
+
+---
+
+Apply this channel context to your analysis of the video.
+
+"""
+
+
+def _get_client(api_key: Optional[str]) -> genai.Client:
+    """Cached Gemini client for api_key (GEMINI_API_KEY if None)."""
+    if api_key is None:
+        api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "GEMINI_API_KEY not found. Please provide api_key parameter or set GEMINI_API_KEY environment variable"
+        )
+    if api_key not in _client_cache:
+        _client_cache[api_key] = genai.Client(api_key=api_key)
+    return _client_cache[api_key]
+
+
+@dataclass
+class PreparedVideo:
+    """A clip ready to be referenced in a request: media profile applied, uploaded if too big to inline."""
+    video_file: Path
+    """The original clip (the one the report is about)."""
+    client: genai.Client
+    profile: MediaProfile
+    part: object
+    """Content part for generate_content (inline bytes or the processed upload)."""
+    uploaded_file: object
+    """Files API handle, None for inline clips."""
+    bytes_sent: int
+    prepare_seconds: float
+    upload_seconds: float
+
+    def release(self):
+        """Schedule deletion of the uploaded file, if any. Safe to call more than once."""
+        if self.uploaded_file is not None:
+            # Deleting is off the critical path; the janitor batches it in the background
+            get_file_janitor(self.client).schedule(self.uploaded_file.name)
+            self.uploaded_file = None
+
+
+def prepare_video(
+    video_path: str,
+    api_key: Optional[str] = None,
+    media_profile: Optional[str] = None,
+) -> PreparedVideo:
+    """
+    Apply the media profile and upload the clip if needed, without generating anything.
+
+    Lets callers start the upload and Gemini's server-side processing while they
+    collect the rest of the request (e.g. channel context), then pass the result
+    to analyze_video(prepared=...). Call release() if it ends up unused.
+
+    Args:
+        video_path: Path to the video file
+        api_key: Google AI API key (optional, reads from env)
+        media_profile: GEMINI_MEDIA_PROFILES preset. If None, uses GEMINI_MEDIA_PROFILE
+
+    Raises:
+        FileNotFoundError: If video file doesn't exist
+        ValueError: If API key is not provided or found in environment
+    """
+    # Validate video file exists
+    video_file = Path(video_path)
+    if not video_file.exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    client = _get_client(api_key)
+    
+    # Downscale / drop frames first: fewer bytes to send and fewer video tokens
+    profile = get_media_profile(media_profile)
+    start = time.time()
+    try:
+        send_file = Path(apply_media_profile(str(video_file), profile, output_dir=str(video_file.parent / "media_profiles")))
+    except Exception as e:
+        # Fail open: the original clip still works, it's just bigger
+        print(f"Warning: could not apply media profile {profile.name}, sending original: {e}")
+        send_file = video_file
+    prepare_seconds = time.time() - start
+    bytes_sent = send_file.stat().st_size
+    if profile.transcodes:
+        print(f"[Semantic Analysis] Media profile {profile.name}: {video_file.stat().st_size / 1024:.0f} KB -> {bytes_sent / 1024:.0f} KB in {prepare_seconds:.2f}s")
+
+    # Small clips go inline in the request; larger ones need the Files API
+    uploaded_file = None
+    upload_seconds = 0.0
+    if bytes_sent <= GEMINI_INLINE_VIDEO_MAX_BYTES:
+        video_part = _inline_video_part(send_file, profile)
+    else:
+        start = time.time()
+        uploaded_file = _upload_video(client, send_file)
+        upload_seconds = time.time() - start
+        video_part = _uploaded_video_part(uploaded_file, profile)
+    return PreparedVideo(
+        video_file=video_file,
+        client=client,
+        profile=profile,
+        part=video_part,
+        uploaded_file=uploaded_file,
+        bytes_sent=bytes_sent,
+        prepare_seconds=prepare_seconds,
+        upload_seconds=upload_seconds,
+    )
+
+
 def analyze_video(
     video_path: str,
     api_key: Optional[str] = None,
     model_name: Optional[str] = None,
     custom_prompt: Optional[str] = None,
     channel_context: Optional[dict] = None,
+    media_profile: Optional[str] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    prepared: Optional[PreparedVideo] = None,
 ) -> str:
     """
     Analyze a video file using Google Gemini API with focus on detecting concerning content.
@@ -60,6 +633,12 @@ def analyze_video(
         model_name: Gemini model to use. If None, uses GEMINI_MODEL_VIDEO from config
         custom_prompt: Optional custom prompt for analysis. If None, uses SEMANTIC_ANALYSIS_PROMPT
         channel_context: Optional dict with channel info (name, description, keywords, recent_titles)
+        media_profile: Name of a GEMINI_MEDIA_PROFILES preset applied before sending.
+            If None, uses GEMINI_MEDIA_PROFILE from config
+        on_chunk: Called with each chunk of the raw analysis text as Gemini generates it,
+            for consumers that want partial results (see analyze_video_stream)
+        prepared: Output of prepare_video(), to start the upload before the rest of the
+            request is known. If None, the video is prepared here
         
     Returns:
         Formatted string containing detailed video analysis with risk assessment
@@ -69,119 +648,245 @@ def analyze_video(
         ValueError: If API key is not provided or found in environment
         Exception: For API errors during upload or generation
     """
+    return analyze_video_detailed(
+        video_path,
+        api_key=api_key,
+        model_name=model_name,
+        custom_prompt=custom_prompt,
+        channel_context=channel_context,
+        media_profile=media_profile,
+        on_chunk=on_chunk,
+        prepared=prepared,
+    ).text
+
+
+def analyze_video_detailed(
+    video_path: str,
+    api_key: Optional[str] = None,
+    model_name: Optional[str] = None,
+    custom_prompt: Optional[str] = None,
+    channel_context: Optional[dict] = None,
+    media_profile: Optional[str] = None,
+    use_prompt_cache: Optional[bool] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    prepared: Optional[PreparedVideo] = None,
+) -> AnalysisResult:
+    """
+    Same as analyze_video(), but also returns sizes, timings and token usage.
+
+    Args:
+        use_prompt_cache: Reference the static prompt through Gemini context caching.
+            If None, uses GEMINI_PROMPT_CACHE_ENABLED from config
+        on_chunk: Called with each raw analysis chunk as it is generated
+        prepared: Output of prepare_video() for this clip (media_profile is then ignored);
+            released once the analysis is generated
+
+    Returns:
+        AnalysisResult whose text is what analyze_video() returns
+    """
     # Use default model from config if not specified
     if model_name is None:
         model_name = GEMINI_MODEL_VIDEO
-    # Validate video file exists
-    video_file = Path(video_path)
-    if not video_file.exists():
-        raise FileNotFoundError(f"Video file not found: {video_path}")
-    
-    # Get API key
-    if api_key is None:
-        api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError(
-            "GEMINI_API_KEY not found. Please provide api_key parameter or set GEMINI_API_KEY environment variable"
-        )
-    
-    # Get or create cached Gemini client
-    if api_key not in _client_cache:
-        _client_cache[api_key] = genai.Client(api_key=api_key)
-    client = _client_cache[api_key]
-    
-    # Upload video file
-    start = time.time()
-    print(f"Uploading video: {video_file.name}...")
-    video_file_obj = client.files.upload(file=str(video_file))
-    end = time.time()
-    print(f"Video uploaded in {end - start} seconds")
-
-    print("Processing video...")
-    while video_file_obj.state.name == "PROCESSING":
-        time.sleep(2)
-        video_file_obj = client.files.get(name=video_file_obj.name)
-    
-    if video_file_obj.state.name == "FAILED":
-        raise Exception(f"Video processing failed: {video_file_obj.state}")
+    if prepared is None:
+        prepared = prepare_video(video_path, api_key=api_key, media_profile=media_profile)
+    video_file = prepared.video_file
+    client = prepared.client
+    profile = prepared.profile
+    video_part = prepared.part
     
     print("Video ready for analysis...")
     
     # Use default prompt from config if not specified
     base_prompt = custom_prompt if custom_prompt is not None else SEMANTIC_ANALYSIS_PROMPT
     
-    # Add channel context to prompt if provided
-    if channel_context:
-        print(f"[Semantic Analysis] Using channel context for: {channel_context.get('channel_name')} ({channel_context.get('channel_url')})")
-        channel_context_text = f"""
-# Channel Context (for AI Detection & Pattern Analysis)
-
-Before analyzing the video, consider this channel information:
-
-**Channel Name:** {channel_context.get('channel_name', 'Unknown')}
-**Channel URL:** {channel_context.get('channel_url', 'Unknown')}
-
-**Channel Description:**
-{channel_context.get('description', 'Not available')}
-
-**Keywords:** {channel_context.get('keywords', 'Not available')}
-
-**Recent Video/Short Titles:**
-{chr(10).join(f"- {title}" for title in channel_context.get('recent_titles', [])[:5]) or 'Not available'}
+    # Static prompt first so it can be served from the provider-side cache; the
+    # per-channel context and the video come after it
+    per_video_contents = [video_part]
+    preamble = build_channel_context_preamble(channel_context)
+    if preamble:
+        per_video_contents.append(preamble)
 
----
+    if use_prompt_cache is None:
+        use_prompt_cache = GEMINI_PROMPT_CACHE_ENABLED
+    cache_name = get_prompt_cache().get(client, model_name, base_prompt) if use_prompt_cache else None
 
-**IMPORTANT for AI-Generated Content Detection:**
-- If the channel description explicitly mentions "AI", "AI-generated", "synthetic media", or "artificial intelligence" in the context of content creation, this is a STRONG indicator the video may be AI-generated
-- If recent video titles show patterns of sensationalized or fabricated news (e.g., "fake shooting", "fake hospitalization", clickbait about celebrities), this indicates untrustworthiness
-- When channel context suggests AI generation, look MORE CAREFULLY for subtle visual artifacts:
-  * Unnatural lighting or harsh shadows
-  * Lip-sync issues or exaggerated mouth movements
-  * Slightly unnatural body movements or gestures
-  * Synthetic-looking skin textures or backgrounds
-  * Overly smooth or plasticky facial features
+    chunks_sent = 0
 
----
+    def publish(text: str):
+        nonlocal chunks_sent
+        chunks_sent += 1
+        if on_chunk is not None:
+            on_chunk(text)
 
-Now analyze the video with this context in mind:
+    def generate(cached_content: Optional[str]):
+        config = types.GenerateContentConfig(
+            cached_content=cached_content,
+            media_resolution=profile.media_resolution,
+        )
+        contents = per_video_contents if cached_content else [base_prompt] + per_video_contents
+        return _generate_streamed(client, model_name, contents, config, on_chunk=publish)
 
-"""
-        prompt = channel_context_text + base_prompt
-    else:
-        prompt = base_prompt
-    
     # Generate analysis
     print("Generating analysis...")
     start = time.time()
-    response = client.models.generate_content(
-        model=model_name,
-        contents=[video_file_obj, prompt]
-    )
+    try:
+        try:
+            analysis, usage, ttft = generate(cache_name)
+        except errors.ClientError as e:
+            # Can't take back chunks already handed to on_chunk, so only retry a request that never started
+            if cache_name is None or chunks_sent:
+                raise
+            # Most likely the cache expired or was deleted server-side: go uncached, recreate next time
+            print(f"[Prompt Cache] Request with {cache_name} failed, retrying without cache: {e}")
+            get_prompt_cache().invalidate(client, model_name, base_prompt)
+            analysis, usage, ttft = generate(None)
+    finally:
+        prepared.release()
     end = time.time()
-    print(f"Analysis generated in {end - start} seconds")
-    # Format the result
-    analysis = response.text
+    print(f"Analysis generated in {end - start} seconds (first token after {ttft if ttft is not None else float('nan'):.2f}s)")
+    if usage is not None:
+        print(
+            f"[Semantic Analysis] Tokens: {usage.prompt_token_count} prompt "
+            f"({usage.cached_content_token_count or 0} cached), {usage.total_token_count} total"
+        )
     
     # Add metadata header
     formatted_result = get_formatted_result(analysis, video_file, video_path, model_name)
     
-    # Clean up uploaded file
-    try:
-        client.files.delete(name=video_file_obj.name)
-        print("Cleaned up uploaded file from Gemini servers")
-    except Exception as e:
-        print(f"Warning: Could not delete uploaded file: {e}")
-    
-    return formatted_result.strip()
+    return AnalysisResult(
+        text=formatted_result.strip(),
+        media_profile=profile.name,
+        bytes_sent=prepared.bytes_sent,
+        prepare_seconds=prepared.prepare_seconds,
+        upload_seconds=prepared.upload_seconds,
+        generate_seconds=end - start,
+        ttft_seconds=ttft,
+        prompt_tokens=usage.prompt_token_count if usage is not None else None,
+        cached_tokens=(usage.cached_content_token_count or 0) if usage is not None else None,
+        total_tokens=usage.total_token_count if usage is not None else None,
+    )
+
+
+def analyze_video_stream(
+    video_path: str,
+    api_key: Optional[str] = None,
+    channel_context: Optional[dict] = None,
+    custom_prompt: Optional[str] = None,
+    media_profile: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of analyze_video(): yields raw analysis chunks as Gemini generates them.
+
+    The analysis runs in a background thread; errors are re-raised from the
+    generator. The chunks are the model output only, without the report header
+    that analyze_video() adds.
+
+    Example:
+        for chunk in analyze_video_stream("videos/abc.mp4"):
+            print(chunk, end="", flush=True)
+    """
+    chunks: queue.Queue = queue.Queue()
+    done = object()
+    failure = []
+
+    def run():
+        try:
+            analyze_video(
+                video_path,
+                api_key=api_key,
+                custom_prompt=custom_prompt,
+                channel_context=channel_context,
+                media_profile=media_profile,
+                on_chunk=chunks.put,
+            )
+        except Exception as e:
+            failure.append(e)
+        finally:
+            chunks.put(done)
 
+    threading.Thread(target=run, daemon=True).start()
+    while (chunk := chunks.get()) is not done:
+        yield chunk
+    if failure:
+        raise failure[0]
 
-def analyze_video_quick(video_path: str, api_key: Optional[str] = None) -> str:
+
+def analyze_keyframes(
+    video_path: str,
+    transcript: Optional[str] = None,
+    channel_context: Optional[dict] = None,
+    custom_prompt: Optional[str] = None,
+    max_keyframes: int = SEMANTIC_KEYFRAMES_MAX,
+) -> str:
+    """
+    Cheaper, faster semantic analysis from scene-change keyframes instead of the full video.
+
+    Extracts up to max_keyframes JPEGs at scene changes and sends them through
+    call_llm with the semantic prompt and the audio transcript. Loses motion and
+    lip-sync cues, so use it under load or for low-risk channels.
+
+    Args:
+        video_path: Path to the video file
+        transcript: Audio transcript, if available
+        channel_context: Optional dict with channel info (see analyze_video)
+        custom_prompt: Optional custom prompt. If None, uses SEMANTIC_ANALYSIS_PROMPT
+        max_keyframes: Maximum number of images sent
+
+    Returns:
+        Formatted analysis string, same layout as analyze_video()
+
+    Raises:
+        FileNotFoundError: If video file doesn't exist
+        RuntimeError: If no keyframes could be extracted
+    """
+    video_file = Path(video_path)
+    if not video_file.exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+
+    start = time.time()
+    keyframes = extract_keyframes(
+        str(video_file),
+        output_dir=str(video_file.parent / "keyframes"),
+        max_keyframes=max_keyframes,
+        sample_fps=SEMANTIC_KEYFRAMES_SAMPLE_FPS,
+    )
+    if not keyframes:
+        raise RuntimeError(f"No keyframes extracted from {video_path}")
+    print(f"[Semantic Analysis] Extracted {len(keyframes)} keyframes in {time.time() - start:.2f} seconds")
+
+    base_prompt = custom_prompt if custom_prompt is not None else SEMANTIC_ANALYSIS_PROMPT
+    instructions = (
+        build_channel_context_preamble(channel_context)
+        + get_keyframe_analysis_preface(len(keyframes), transcript)
+        + base_prompt
+    )
+
+    start = time.time()
+    analysis = call_llm(LlmRequest(
+        organization=SEMANTIC_KEYFRAMES_PROVIDER,
+        model=SEMANTIC_KEYFRAMES_MODEL,
+        system_prompt="You are a forensic analyst of short-form videos, working from keyframes and a transcript.",
+        instructions=instructions,
+        images=keyframes,
+    ))
+    print(f"Keyframe analysis generated in {time.time() - start} seconds")
+
+    model_name = f"{SEMANTIC_KEYFRAMES_MODEL} (keyframes)"
+    return get_formatted_result(analysis, video_file, video_path, model_name).strip()
+
+
+def analyze_video_quick(
+    video_path: str,
+    api_key: Optional[str] = None,
+    channel_context: Optional[dict] = None,
+) -> str:
     """
     Quick video analysis focused on identifying red flags and risk level.
     
     Args:
         video_path: Path to the MP4 video file
         api_key: Google AI API key (optional, reads from env)
+        channel_context: Optional dict with channel info (see analyze_video)
         
     Returns:
         Concise video analysis string with risk assessment
@@ -190,6 +895,7 @@ def analyze_video_quick(video_path: str, api_key: Optional[str] = None) -> str:
         video_path=video_path,
         api_key=api_key,
         custom_prompt=SEMANTIC_ANALYSIS_QUICK_PROMPT,
+        channel_context=channel_context,
     )
 
 
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from download_video import download_videos_batch, video_id_from_url
 from summarize_videos import summarize_videos
+from voice_to_text_real import get_readiness_manager
 import argparse
 import json
 import os
@@ -23,6 +24,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def warm_transcription_server():
+    """Start probing / keeping warm the transcription server before the first video arrives."""
+    if os.environ.get("TRANSCRIPTION_URL"):
+        get_readiness_manager(os.environ["TRANSCRIPTION_URL"])
+
+
 global USE_CACHE
 USE_CACHE = False
 
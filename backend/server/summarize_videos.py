@@ -5,72 +5,369 @@ _backend_dir = str(Path(__file__).resolve().parent.parent)
 if _backend_dir not in sys.path:
     sys.path.insert(0, _backend_dir)
 
-from utils import LlmRequest, call_llm
-from channel_scraper import check_channel_page, get_lightweight_channel_context
-from semantic_analysis_real import analyze_video as semantic_analysis
-from voice_to_text_real import voice_to_text
+import threading
+import time
+
+from utils import (
+    FingerprintIndex,
+    InputSource,
+    LlmRequest,
+    VideoDedupIndex,
+    audio_fingerprints,
+    call_llm,
+    load_audio_samples,
+    pack_inputs,
+    speech_ratio,
+    triage_video,
+    video_phashes,
+)
+from channel_scraper import ChannelProfileFetch, check_channel_page, get_lightweight_channel_context
+from semantic_analysis_real import analyze_keyframes, analyze_video as semantic_analysis, prepare_video
+from voice_to_text_real import get_cached_transcript, get_coalescer, get_readiness_manager
 from extract_audio import extract_audio
-from config import CHANNEL_CONTEXT_MAX_VIDEOS
+from config import (
+    CHANNEL_CONTEXT_MAX_VIDEOS,
+    FINGERPRINT_ENABLED,
+    FINGERPRINT_INDEX_PATH,
+    FINGERPRINT_MAX_CLIPS,
+    FINGERPRINT_MIN_MATCHES,
+    FINGERPRINT_MIN_MATCH_RATIO,
+    LLM_INPUT_TOKEN_ENCODING,
+    SEMANTIC_ANALYSIS_QUICK_PROMPT,
+    SEMANTIC_KEYFRAMES_LOAD_THRESHOLD,
+    SEMANTIC_KEYFRAMES_LOW_RISK_CHANNELS,
+    SEMANTIC_KEYFRAMES_TRANSCRIPT_WAIT_SECONDS,
+    SEMANTIC_MODE,
+    SEMANTIC_TRIAGE_AI_DISCLOSURE_KEYWORDS,
+    SEMANTIC_TRIAGE_ENABLED,
+    SEMANTIC_TRIAGE_FULL_THRESHOLD,
+    SEMANTIC_TRIAGE_RISK_KEYWORDS,
+    SEMANTIC_TRIAGE_TRANSCRIPT_WAIT_SECONDS,
+    SYNTHESIS_INPUT_MAX_TOKENS,
+    SYNTHESIS_INPUT_PRIORITIES,
+    VAD_ENABLED,
+    VAD_FRAME_MS,
+    VAD_MIN_SPEECH_RATIO,
+    VAD_SAMPLE_RATE,
+    TRANSCRIPTION_READY_WAIT_SECONDS,
+    VIDEO_STAGE_TIMEOUT_SECONDS,
+    VIDEO_DEDUP_ENABLED,
+    VIDEO_DEDUP_FRAMES_PER_SECOND,
+    VIDEO_DEDUP_INDEX_PATH,
+    VIDEO_DEDUP_MAX_FRAME_DISTANCE,
+    VIDEO_DEDUP_MAX_VIDEOS,
+    VIDEO_DEDUP_MIN_MATCH_RATIO,
+    get_no_speech_result,
+    get_video_reuse_note,
+)
 from openai import OpenAI
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
 from web_search_real import search_web_from_transcript_str
 # Load .env from root folder
 root_dir = Path(__file__).resolve().parent.parent.parent
 load_dotenv(root_dir / ".env")
 
+# Shared across videos and requests; opened on first use
+_fingerprint_index = None
+_fingerprint_index_lock = threading.Lock()
+_video_dedup_index = None
+_video_dedup_index_lock = threading.Lock()
+
+# Gemini uploads/processing started ahead of channel-context collection (one per video in flight)
+_prepare_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-prepare")
+
+# Full-video Gemini analyses in flight, counted from the mode decision (drives "auto" semantic mode)
+_video_analyses_in_flight = 0
+_video_analyses_lock = threading.Lock()
+
+
+def _get_fingerprint_index() -> FingerprintIndex:
+    global _fingerprint_index
+    with _fingerprint_index_lock:
+        if _fingerprint_index is None:
+            _fingerprint_index = FingerprintIndex(
+                FINGERPRINT_INDEX_PATH,
+                max_clips=FINGERPRINT_MAX_CLIPS,
+                min_matches=FINGERPRINT_MIN_MATCHES,
+                min_match_ratio=FINGERPRINT_MIN_MATCH_RATIO,
+            )
+    return _fingerprint_index
+
+
+def _get_video_dedup_index() -> VideoDedupIndex:
+    global _video_dedup_index
+    with _video_dedup_index_lock:
+        if _video_dedup_index is None:
+            _video_dedup_index = VideoDedupIndex(
+                VIDEO_DEDUP_INDEX_PATH,
+                max_videos=VIDEO_DEDUP_MAX_VIDEOS,
+                max_frame_distance=VIDEO_DEDUP_MAX_FRAME_DISTANCE,
+                min_match_ratio=VIDEO_DEDUP_MIN_MATCH_RATIO,
+            )
+    return _video_dedup_index
+
+
+def _choose_semantic_mode(channel: ChannelProfileFetch) -> tuple[str, str]:
+    """Pick "video" or "keyframes" semantic analysis before anything is uploaded. Returns (mode, reason).
+
+    A "video" decision counts towards _video_analyses_in_flight right away, so videos
+    arriving in a burst see each other; release it with _release_video_analysis()."""
+    global _video_analyses_in_flight
+    if SEMANTIC_MODE == "auto" and SEMANTIC_KEYFRAMES_LOW_RISK_CHANNELS:
+        try:
+            channel_info = channel.channel_info()
+        except Exception:
+            channel_info = {}
+        low_risk = {c.lower() for c in SEMANTIC_KEYFRAMES_LOW_RISK_CHANNELS}
+        names = {str(channel_info.get(k, "")).lower() for k in ("channel_url", "channel_name")}
+        if names & low_risk:
+            return "keyframes", "low-risk channel"
+    with _video_analyses_lock:
+        if SEMANTIC_MODE != "auto":
+            mode, reason = SEMANTIC_MODE, "configured"
+        elif _video_analyses_in_flight >= SEMANTIC_KEYFRAMES_LOAD_THRESHOLD:
+            mode, reason = "keyframes", f"{_video_analyses_in_flight} video analyses in flight"
+        else:
+            mode, reason = "video", "default"
+        if mode == "video":
+            _video_analyses_in_flight += 1
+    return mode, reason
+
+
+def _release_video_analysis():
+    global _video_analyses_in_flight
+    with _video_analyses_lock:
+        _video_analyses_in_flight -= 1
+
 
 def _process_single_video(path: str, url: str, storage_dict: dict) -> tuple[str, str]:
     """Process a single video with parallelized subtasks."""
 
+    # Published by audio_and_transcription for triage and keyframe mode: (transcript, has_speech),
+    # either may be None when unknown
+    transcript_future: Future = Future()
+
     def audio_and_transcription():
+        try:
+            return transcribe_and_search()
+        finally:
+            if not transcript_future.done():
+                transcript_future.set_result((None, None))
+
+    def transcribe_and_search():
         audio_path = extract_audio(path)
-        x = voice_to_text(audio_path, os.environ["TRANSCRIPTION_URL"])
-        return search_web_from_transcript_str(x)
+        samples = None
+        if VAD_ENABLED or FINGERPRINT_ENABLED:
+            try:
+                samples = load_audio_samples(audio_path, sample_rate=VAD_SAMPLE_RATE)
+            except Exception as e:
+                # Fail open: transcribe anyway if the audio can't be decoded locally
+                print(f"Warning: could not decode {audio_path}, skipping VAD/fingerprinting: {e}")
+
+        if VAD_ENABLED and samples is not None:
+            # Skip Voxtral + Perplexity for music-only / ambient shorts
+            ratio = speech_ratio(samples, sample_rate=VAD_SAMPLE_RATE, frame_ms=VAD_FRAME_MS)
+            print(f"[VAD] {audio_path}: speech ratio {ratio:.2f} over {len(samples) / VAD_SAMPLE_RATE:.1f}s")
+            if ratio < VAD_MIN_SPEECH_RATIO:
+                transcript_future.set_result((None, False))
+                return get_no_speech_result(ratio)
+
+        fingerprints = None
+        if FINGERPRINT_ENABLED and samples is not None:
+            # Trending sounds / reused voice-overs: reuse the earlier transcript + web search
+            try:
+                fingerprints = audio_fingerprints(samples, sample_rate=VAD_SAMPLE_RATE)
+                match = _get_fingerprint_index().lookup(fingerprints, sample_rate=VAD_SAMPLE_RATE)
+                if match is not None:
+                    print(
+                        f"[Fingerprint] {audio_path} matches {match.clip_id} "
+                        f"({match.matched_hashes} hashes, ratio {match.match_ratio:.2f}, "
+                        f"offset {match.offset_seconds:+.1f}s), reusing transcript and web search"
+                    )
+                    transcript_future.set_result((match.transcript, True))
+                    return match.search_result
+            except Exception as e:
+                print(f"Warning: fingerprint lookup failed for {audio_path}: {e}")
+                fingerprints = None
+
+        # Already transcribed audio needs no server, even a cold one
+        x = get_cached_transcript(audio_path)
+        if x is None:
+            # Don't send into a cold start that would blow the stage timeout
+            readiness = get_readiness_manager(os.environ["TRANSCRIPTION_URL"])
+            if not readiness.wait_until_ready(timeout=TRANSCRIPTION_READY_WAIT_SECONDS):
+                return f"Transcription unavailable: transcription server is {readiness.state} (cold start in progress).\nTotal Sources Found: 0"
+            # Shared coalescer: transcriptions from videos finishing close together reach vLLM as one batch
+            x = get_coalescer(os.environ["TRANSCRIPTION_URL"]).submit(audio_path).result()
+        transcript_future.set_result((x, True))
+        search_result = search_web_from_transcript_str(x)
+        if fingerprints:
+            try:
+                _get_fingerprint_index().add(path, fingerprints, transcript=x, search_result=search_result)
+            except Exception as e:
+                print(f"Warning: could not index fingerprints for {audio_path}: {e}")
+        return search_result
+
+    # One channel resolution + scrape per video, shared by the channel and semantic branches
+    channel = ChannelProfileFetch(url)
 
     def channel_info():
-        return check_channel_page(url)
+        return check_channel_page(url, channel=channel)
+
+    video_id = Path(path).stem
+    reused_from = {}
+    # Analysis text streamed so far, used by synthesis if the semantic branch misses the deadline
+    semantic_chunks: list[str] = []
 
     def semantic_info():
+        frame_hashes = None
+        if VIDEO_DEDUP_ENABLED:
+            # Reuploads of the same footage under a new video id: reuse the earlier Gemini analysis
+            try:
+                frame_hashes = video_phashes(path, frames_per_second=VIDEO_DEDUP_FRAMES_PER_SECOND)
+                match = _get_video_dedup_index().lookup(frame_hashes)
+                if match is not None:
+                    print(
+                        f"[Video Dedup] {path} matches {match.video_id} "
+                        f"(ratio {match.match_ratio:.2f}, mean distance {match.mean_distance:.1f}), reusing analysis"
+                    )
+                    if match.video_id != video_id:
+                        reused_from.update(video_id=match.video_id, match_ratio=match.match_ratio)
+                    semantic_chunks.append(match.analysis)
+                    return match.analysis
+            except Exception as e:
+                print(f"Warning: near-duplicate lookup failed for {path}: {e}")
+                frame_hashes = None
+        # Decide the mode first so keyframe (text-only) analyses never pay for an upload
+        mode, reason = _choose_semantic_mode(channel)
+        print(f"[Semantic Mode] {path}: {mode} ({reason})")
+        # Upload and server-side processing don't depend on the channel context; run them while it is scraped
+        prepared_future = None
+        if mode == "video":
+            prepared_future = _prepare_executor.submit(prepare_video, path, os.environ["GOOGLE_API_KEY"])
         try:
             # Fetch lightweight channel context for AI detection
-            channel_ctx = get_lightweight_channel_context(url, max_recent_videos=CHANNEL_CONTEXT_MAX_VIDEOS)
-            return semantic_analysis(
-                path, 
-                os.environ["GOOGLE_API_KEY"],
-                channel_context=channel_ctx
+            channel_ctx = get_lightweight_channel_context(
+                url, max_recent_videos=CHANNEL_CONTEXT_MAX_VIDEOS, channel=channel
             )
-        except Exception as e:
-            print(e)
-            return "None"
-
-    # Run 3 subtasks in parallel
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        transcription_future = executor.submit(audio_and_transcription)
-        channel_future = executor.submit(channel_info)
-        semantic_future = executor.submit(semantic_info)
 
-        # Wait for all subtasks to complete (60s timeout each)
-        try:
-            transcription = transcription_future.result(timeout=40)
-        except Exception as e:
-            print(e)
-            transcription = "Transcription timed out"
-
-        try:
-            channel_page_info = channel_future.result(timeout=40)
-        except Exception as e:
-            print(e)
-            channel_page_info = "Channel info timed out"
-
-        try:
-            semantic_analysis_info = semantic_future.result(timeout=40)
+            transcript, has_speech = None, None
+            tier = "full"
+            if SEMANTIC_TRIAGE_ENABLED:
+                wait_start = time.perf_counter()
+                try:
+                    transcript, has_speech = transcript_future.result(timeout=SEMANTIC_TRIAGE_TRANSCRIPT_WAIT_SECONDS)
+                except TimeoutError:
+                    pass
+                decision = triage_video(
+                    channel_ctx,
+                    transcript,
+                    has_speech,
+                    risk_keywords=SEMANTIC_TRIAGE_RISK_KEYWORDS,
+                    ai_disclosure_keywords=SEMANTIC_TRIAGE_AI_DISCLOSURE_KEYWORDS,
+                    full_threshold=SEMANTIC_TRIAGE_FULL_THRESHOLD,
+                )
+                tier = decision.tier
+                print(
+                    f"[Triage] {path}: {tier} (score {decision.score:.1f}: {'; '.join(decision.reasons)}), "
+                    f"waited {time.perf_counter() - wait_start:.2f}s for signals"
+                )
+            custom_prompt = SEMANTIC_ANALYSIS_QUICK_PROMPT if tier == "quick" else None
+
+            analysis_start = time.perf_counter()
+            if mode == "keyframes":
+                if transcript is None:
+                    # Triage's short wait may have missed it; keyframes are much better with it
+                    try:
+                        transcript, _ = transcript_future.result(timeout=SEMANTIC_KEYFRAMES_TRANSCRIPT_WAIT_SECONDS)
+                    except TimeoutError:
+                        transcript = None
+                analysis = analyze_keyframes(
+                    path, transcript=transcript, channel_context=channel_ctx, custom_prompt=custom_prompt
+                )
+                semantic_chunks.append(analysis)
+            else:
+                prepared = prepared_future.result() if prepared_future is not None else None
+                prepared_future = None
+                analysis = semantic_analysis(
+                    path, 
+                    os.environ["GOOGLE_API_KEY"],
+                    channel_context=channel_ctx,
+                    custom_prompt=custom_prompt,
+                    on_chunk=semantic_chunks.append,
+                    prepared=prepared,
+                )
+            print(f"[Triage] {path}: {tier} {mode} analysis took {time.perf_counter() - analysis_start:.2f}s")
         except Exception as e:
             print(e)
+            return "None"
+        finally:
+            if mode == "video":
+                _release_video_analysis()
+            if prepared_future is not None:
+                # Not used (an earlier failure): delete the upload once it finishes
+                prepared_future.add_done_callback(
+                    lambda f: f.result().release() if f.exception() is None else None
+                )
+        # Only full-video, full-prompt analyses stand in for reuploads
+        if frame_hashes and mode == "video" and tier == "full":
+            try:
+                _get_video_dedup_index().add(video_id, frame_hashes, analysis)
+            except Exception as e:
+                print(f"Warning: could not index frames for {path}: {e}")
+        return analysis
+
+    # Run 3 subtasks in parallel under one shared deadline. No context manager: its exit would
+    # wait for every branch, so synthesis leaves late branches to finish in the background.
+    executor = ThreadPoolExecutor(max_workers=3)
+    transcription_future = executor.submit(audio_and_transcription)
+    channel_future = executor.submit(channel_info)
+    semantic_future = executor.submit(semantic_info)
+    executor.shutdown(wait=False)
+    deadline = time.perf_counter() + VIDEO_STAGE_TIMEOUT_SECONDS
+
+    def remaining() -> float:
+        return max(0.0, deadline - time.perf_counter())
+
+    try:
+        transcription = transcription_future.result(timeout=remaining())
+    except Exception as e:
+        print(e)
+        transcription = "Transcription timed out"
+
+    try:
+        channel_page_info = channel_future.result(timeout=remaining())
+    except Exception as e:
+        print(e)
+        channel_page_info = "Channel info timed out"
+
+    try:
+        semantic_analysis_info = semantic_future.result(timeout=remaining())
+    except Exception as e:
+        print(e)
+        # Gemini may still be generating: synthesize from what it has streamed so far
+        partial = "".join(semantic_chunks)
+        if partial:
+            print(f"[Semantic] {path}: timed out, using {len(partial)} chars of partial analysis")
+            semantic_analysis_info = f"{partial}\n[Semantic analysis timed out; the analysis above is incomplete]"
+        else:
             semantic_analysis_info = "Semantic analysis timed out"
 
+    # Share one token budget between the inputs instead of slicing each one by characters
+    inputs = {
+        "transcription": transcription,
+        "channel_page_info": channel_page_info,
+        "semantic_analysis": semantic_analysis_info,
+    }
+    packed = pack_inputs(
+        [InputSource(name, text, priority=SYNTHESIS_INPUT_PRIORITIES.get(name, 1.0)) for name, text in inputs.items()],
+        total_tokens=SYNTHESIS_INPUT_MAX_TOKENS,
+        encoding_name=LLM_INPUT_TOKEN_ENCODING,
+    )
+
     system_prompt = """
     You are an assistant that provides facts and findings.  Give a view on the trustworthiness of the video,
     including any potential misrepresentations. Your inputs may be truncated. Do not talk down to the user; 
@@ -85,9 +382,9 @@ def _process_single_video(path: str, url: str, storage_dict: dict) -> tuple[str,
     Consider internal analyses as statements that are highly likely to be true. Refer to semantic analysis as Google Gemini's analysis, 
     and channel page info as the information found on the channel page. Do not refer to ambigious internal 
     terms, and only use the above terms when referring to the internal analyses. 
-    Perplexity Results: {transcription[:10000]}
-    Channel page info: {channel_page_info[:10000]}
-    Semantic analysis from Google Gemini: {semantic_analysis_info[:10000]}
+    Perplexity Results: {packed['transcription']}
+    Channel page info: {packed['channel_page_info']}
+    Semantic analysis from Google Gemini: {packed['semantic_analysis']}
     
     CRITICAL: You MUST provide a complete response following the FULL format below, even if Perplexity returned no sources. 
     Use the semantic analysis from Google Gemini, and the channel page info to assess the video regardless of whether external sources are available.
@@ -128,6 +425,8 @@ def _process_single_video(path: str, url: str, storage_dict: dict) -> tuple[str,
         delta = chunk.choices[0].delta
         if delta.content:
             chunks.append(delta.content)
+    if reused_from:
+        chunks.append(get_video_reuse_note(reused_from["video_id"], reused_from["match_ratio"]))
     
     return path, "".join(chunks)
 
@@ -11,5 +11,48 @@ Then::
 """
 
 from .llm_caller import LlmRequest, call_llm
+from .audio import load_audio_samples
+from .channel_cache import ChannelCache
+from .channel_features import ChannelFeatures, ChannelRiskAssessment, assess_channel, format_channel_assessment
+from .vad import SpeechDetectionResult, detect_speech, speech_ratio
+from .fingerprint import FingerprintIndex, FingerprintMatch, audio_fingerprints
+from .keyframes import extract_keyframes
+from .media import MediaProfile, apply_media_profile
+from .token_budget import InputSource, compact_json, count_tokens, fit_json_to_tokens, pack_inputs, truncate_to_tokens
+from .triage import TriageDecision, triage_video
+from .video_hash import VideoDedupIndex, VideoMatch, video_phashes
+from .yt_initial_data import InitialDataScanner, extract_initial_data, fetch_initial_data
 
-__all__ = ["LlmRequest", "call_llm"]
+__all__ = [
+    "LlmRequest",
+    "call_llm",
+    "load_audio_samples",
+    "ChannelCache",
+    "ChannelFeatures",
+    "ChannelRiskAssessment",
+    "assess_channel",
+    "format_channel_assessment",
+    "SpeechDetectionResult",
+    "detect_speech",
+    "speech_ratio",
+    "FingerprintIndex",
+    "FingerprintMatch",
+    "audio_fingerprints",
+    "extract_keyframes",
+    "MediaProfile",
+    "apply_media_profile",
+    "InputSource",
+    "compact_json",
+    "count_tokens",
+    "fit_json_to_tokens",
+    "pack_inputs",
+    "truncate_to_tokens",
+    "TriageDecision",
+    "triage_video",
+    "VideoDedupIndex",
+    "VideoMatch",
+    "video_phashes",
+    "InitialDataScanner",
+    "extract_initial_data",
+    "fetch_initial_data",
+]
@@ -0,0 +1,57 @@
+"""
+Audio decoding helpers shared by the transcription client and the server pipeline.
+
+Decodes anything ffmpeg can read (mp3, m4a, mp4, wav, ...) into mono float32 PCM
+so the local signal-processing stages can work on plain NumPy arrays.
+"""
+
+import hashlib
+import subprocess
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 16000
+
+
+def load_audio_samples(audio_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio (or video) file to mono float32 samples in [-1, 1].
+
+    Args:
+        audio_path: Path to any file ffmpeg can decode.
+        sample_rate: Target sample rate in Hz (default 16 kHz, what Voxtral expects).
+
+    Returns:
+        1-D float32 NumPy array of samples.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file.
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", audio_path,
+            "-f", "s16le", "-ac", "1", "-ar", str(sample_rate),
+            "-",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"Could not decode audio {audio_path}: {stderr}")
+
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def audio_content_hash(samples: np.ndarray, sample_rate: int) -> str:
+    """
+    SHA-256 of decoded audio content, independent of container/file name.
+
+    Samples are quantized to 16-bit first so tiny float differences between
+    decoders don't change the hash.
+    """
+    quantized = np.clip(np.round(np.asarray(samples, dtype=np.float32) * 32767.0), -32768, 32767).astype("<i2")
+    digest = hashlib.sha256()
+    digest.update(str(int(sample_rate)).encode("ascii"))
+    digest.update(quantized.tobytes())
+    return digest.hexdigest()
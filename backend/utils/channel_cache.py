@@ -0,0 +1,152 @@
+"""
+Persistent per-channel cache with a TTL and stale-while-revalidate, backed by SQLite (stdlib only).
+
+Consecutive shorts often come from the same channel, and channel data (about page,
+recent titles, an LLM trust summary) changes slowly. Entries are keyed by
+(channel_id, kind) and hold JSON values:
+
+  - fresh (younger than ttl_seconds): returned as is
+  - stale (up to max_stale_seconds): returned immediately, refreshed in the background
+  - missing or older: fetched synchronously
+
+Only one background refresh runs per key at a time; a failed refresh, or one
+that returns a partial value (see get_or_fetch's is_partial), keeps the stale value.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ChannelCache:
+    """SQLite-backed JSON cache keyed by (channel_id, kind), refreshed in the background once stale."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_stale_seconds: float, refresh_workers: int = 2):
+        """
+        Args:
+            path: SQLite file to use (created with its parent directory if missing).
+            ttl_seconds: Age after which an entry is refreshed in the background.
+            max_stale_seconds: Age after which an entry is no longer served and is refetched synchronously.
+            refresh_workers: Threads for background refreshes.
+        """
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS channels ("
+            " channel_id TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (channel_id, kind))"
+        )
+        self._conn.commit()
+        self._refreshing: set[tuple[str, str]] = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="channel-cache")
+
+    def get(self, channel_id: str, kind: str) -> Optional[tuple[Any, float]]:
+        """Return (value, age in seconds) regardless of freshness, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fetched_at FROM channels WHERE channel_id = ? AND kind = ?", (channel_id, kind)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), max(0.0, time.time() - row[1])
+
+    def set(self, channel_id: str, kind: str, value: Any):
+        """Store a JSON-serializable value fetched now."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO channels (channel_id, kind, value, fetched_at) VALUES (?, ?, ?, ?)",
+                (channel_id, kind, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def get_or_fetch(
+        self,
+        channel_id: str,
+        kind: str,
+        fetch: Callable[[], Any],
+        is_partial: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Cached value for (channel_id, kind), calling fetch() when missing or stale.
+
+        Args:
+            channel_id: YouTube channel id.
+            kind: What is stored (e.g. "context", "trust_summary").
+            fetch: Produces a fresh JSON-serializable value. Exceptions propagate
+                only when there is no servable value; None results are not cached.
+            is_partial: Returns True for values that are incomplete (e.g. some scrapes
+                failed). Those are returned from a synchronous fetch but never stored, so
+                they can't replace a good entry and the next call fetches again.
+
+        Example:
+            about = cache.get_or_fetch(channel_id, "about", lambda: scrape_channel_about(channel_url))
+        """
+        cached = self.get(channel_id, kind)
+        if cached is not None:
+            value, age = cached
+            if age < self.ttl_seconds:
+                return value
+            if age < self.max_stale_seconds:
+                self._refresh_in_background(channel_id, kind, fetch, is_partial)
+                return value
+        value = fetch()
+        if self._should_store(value, is_partial):
+            self.set(channel_id, kind, value)
+        return value
+
+    @staticmethod
+    def _should_store(value: Any, is_partial: Optional[Callable[[Any], bool]]) -> bool:
+        return value is not None and not (is_partial is not None and is_partial(value))
+
+    def _refresh_in_background(
+        self,
+        channel_id: str,
+        kind: str,
+        fetch: Callable[[], Any],
+        is_partial: Optional[Callable[[Any], bool]] = None,
+    ):
+        key = (channel_id, kind)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if self._should_store(value, is_partial):
+                    self.set(channel_id, kind, value)
+                elif value is not None:
+                    print(f"[Channel Cache] Background refresh of {kind} for {channel_id} was partial, keeping stale entry")
+            except Exception as e:
+                print(f"[Channel Cache] Background refresh of {kind} for {channel_id} failed, keeping stale entry: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def delete(self, channel_id: str, kind: Optional[str] = None):
+        """Drop one kind of entry for a channel, or all of them."""
+        with self._lock:
+            if kind is None:
+                self._conn.execute("DELETE FROM channels WHERE channel_id = ?", (channel_id,))
+            else:
+                self._conn.execute("DELETE FROM channels WHERE channel_id = ? AND kind = ?", (channel_id, kind))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
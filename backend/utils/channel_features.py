@@ -0,0 +1,243 @@
+"""
+Deterministic channel features and a rule-based risk score, so clear cases skip the LLM channel summary.
+
+Features are computed from scrape_channel_profile() output (about page + recent videos):
+
+  - AI-disclosure phrases in the description/keywords
+  - share of sensational recent titles ("SHOCKING", "you won't believe", "!!!", ...)
+  - subscriber and video counts, account age (from "Joined Mar 5, 2021")
+  - domains of the channel's external links, and which of them look suspicious
+
+Each signal adds to (risk) or subtracts from (established channel) a score. At or
+below low_threshold the channel is "low" risk, at or above high_threshold "high"
+but only if at least two different risk signals fired, so one matching phrase or
+one odd statistic can't condemn a channel on its own. Anything else, or a profile
+missing its about data, is "ambiguous" and worth an LLM look.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+SENSATIONAL_TITLE = re.compile(r"\b(shocking|exposed|breaking|you won't believe|banned|leaked|truth about)\b|!{2,}")
+
+_COUNT = re.compile(r"([\d.,]+)\s*([KMB])?", re.I)
+_COUNT_SUFFIX = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def keyword_hits(text: str, keywords: list[str]) -> list[str]:
+    """Keywords (lower-case phrases) found in lower-cased text as whole words/phrases."""
+    return [k for k in keywords if re.search(rf"\b{re.escape(k)}\b", text)]
+
+
+def sensational_titles(titles: list[str]) -> list[str]:
+    """Titles matching SENSATIONAL_TITLE (case-insensitive)."""
+    return [t for t in titles if SENSATIONAL_TITLE.search(t.lower())]
+
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    """'1.2M subscribers' -> 1200000, '12,345 videos' -> 12345, 'No videos' -> 0, None if unparseable."""
+    if not text:
+        return None
+    if text.strip().lower().startswith("no "):
+        return 0
+    match = _COUNT.search(text)
+    if match is None:
+        return None
+    number = match.group(1).replace(",", "")
+    try:
+        value = float(number)
+    except ValueError:
+        return None
+    return int(value * _COUNT_SUFFIX.get((match.group(2) or "").upper(), 1))
+
+
+def parse_joined(text: Optional[str]) -> Optional[datetime]:
+    """'Joined Mar 5, 2021' -> datetime (UTC), None if unparseable."""
+    if not text:
+        return None
+    cleaned = re.sub(r"^\s*joined\s+", "", text, flags=re.I).strip()
+    for fmt in ("%b %d, %Y", "%B %d, %Y", "%d %b %Y"):
+        try:
+            return datetime.strptime(cleaned, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def link_domain(url: str) -> str:
+    """Bare domain of a (possibly scheme-less) link, e.g. 'www.instagram.com/x' -> 'instagram.com'."""
+    host = re.sub(r"^[a-z]+://", "", url.strip().lower()).split("/", 1)[0].split(":", 1)[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+@dataclass
+class ChannelFeatures:
+    """Signals extracted from a scraped channel profile (None: not available)."""
+    ai_disclosures: list[str]
+    sensational_titles: int
+    recent_titles: int
+    subscriber_count: Optional[int]
+    video_count: Optional[int]
+    account_age_days: Optional[int]
+    link_domains: list[str]
+    suspicious_domains: list[str]
+    about_missing: bool
+
+    @property
+    def sensational_ratio(self) -> float:
+        return self.sensational_titles / self.recent_titles if self.recent_titles else 0.0
+
+
+@dataclass
+class ChannelRiskAssessment:
+    """Rule-based channel risk: score, verdict ("low", "high" or "ambiguous") and why."""
+    score: float
+    verdict: str
+    features: ChannelFeatures
+    reasons: list[str] = field(default_factory=list)
+
+
+def extract_channel_features(
+    profile: dict,
+    ai_disclosure_keywords: list[str],
+    suspicious_link_domains: list[str],
+    now: Optional[datetime] = None,
+) -> ChannelFeatures:
+    """
+    Compute ChannelFeatures from scrape_channel_profile() output.
+
+    Args:
+        profile: About metadata plus "videos" (and "scrape_errors" if some calls failed).
+        ai_disclosure_keywords: Lower-case phrases that indicate AI-generated content.
+        suspicious_link_domains: Domains (or parent domains) of suspicious external links.
+        now: Reference time for the account age (default: current time).
+    """
+    about = f"{profile.get('description') or ''} {profile.get('keywords') or ''}".lower()
+    titles = [v.get("title") or "" for v in profile.get("videos", [])]
+    joined = parse_joined(profile.get("joined"))
+    now = now or datetime.now(timezone.utc)
+    domains = sorted({link_domain(l.get("url", "")) for l in profile.get("links", []) if l.get("url")})
+    suspicious = [
+        d for d in domains
+        if any(d == s or d.endswith("." + s) for s in suspicious_link_domains)
+    ]
+    return ChannelFeatures(
+        ai_disclosures=keyword_hits(about, ai_disclosure_keywords),
+        sensational_titles=len(sensational_titles(titles)),
+        recent_titles=len(titles),
+        subscriber_count=parse_count(profile.get("subscriber_count")),
+        video_count=parse_count(profile.get("video_count")),
+        account_age_days=(now - joined).days if joined is not None else None,
+        link_domains=domains,
+        suspicious_domains=suspicious,
+        about_missing="about" in profile.get("scrape_errors", {}),
+    )
+
+
+def assess_channel(
+    profile: dict,
+    ai_disclosure_keywords: list[str],
+    suspicious_link_domains: list[str],
+    low_threshold: float = -1.0,
+    high_threshold: float = 2.0,
+    now: Optional[datetime] = None,
+) -> ChannelRiskAssessment:
+    """
+    Score a scraped channel and decide whether it is clearly low/high risk.
+
+    Args:
+        profile: scrape_channel_profile() output.
+        ai_disclosure_keywords: See extract_channel_features().
+        suspicious_link_domains: See extract_channel_features().
+        low_threshold: Score at or below which the verdict is "low".
+        high_threshold: Score at or above which the verdict is "high" (with at least two risk signals).
+        now: Reference time for the account age.
+
+    Returns:
+        ChannelRiskAssessment; verdict "ambiguous" means the rules can't decide.
+
+    Example:
+        assessment = assess_channel(profile, ["ai generated"], ["bit.ly"])
+        if assessment.verdict == "ambiguous":
+            ...  # ask the LLM
+    """
+    f = extract_channel_features(profile, ai_disclosure_keywords, suspicious_link_domains, now=now)
+    score = 0.0
+    reasons = []
+    risk_signals = 0
+
+    if f.ai_disclosures:
+        score += 2.0
+        risk_signals += 1
+        reasons.append(f"description mentions AI generation ({', '.join(f.ai_disclosures[:3])})")
+    if f.recent_titles and f.sensational_ratio >= 0.4:
+        score += 1.5 if f.sensational_ratio >= 0.7 else 1.0
+        risk_signals += 1
+        reasons.append(f"{f.sensational_titles}/{f.recent_titles} recent titles are sensational")
+    if f.suspicious_domains:
+        score += 1.0
+        risk_signals += 1
+        reasons.append(f"suspicious links ({', '.join(f.suspicious_domains[:3])})")
+
+    if f.subscriber_count is not None:
+        if f.subscriber_count >= 1_000_000:
+            score -= 1.0
+            reasons.append(f"{f.subscriber_count:,} subscribers")
+        elif f.subscriber_count >= 100_000:
+            score -= 0.5
+            reasons.append(f"{f.subscriber_count:,} subscribers")
+        elif f.subscriber_count < 1_000:
+            score += 0.5
+            risk_signals += 1
+            reasons.append(f"only {f.subscriber_count:,} subscribers")
+
+    if f.account_age_days is not None:
+        if f.account_age_days < 90:
+            score += 1.0
+            risk_signals += 1
+            reasons.append(f"account is {f.account_age_days} days old")
+        elif f.account_age_days > 5 * 365:
+            score -= 0.5
+            reasons.append(f"account is {f.account_age_days // 365} years old")
+        if f.video_count is not None and f.account_age_days < 365 and f.video_count > 1000:
+            score += 0.5
+            risk_signals += 1
+            reasons.append(f"{f.video_count:,} videos in under a year")
+
+    if f.about_missing:
+        verdict = "ambiguous"
+        reasons.append("about page unavailable")
+    elif score <= low_threshold:
+        verdict = "low"
+    elif score >= high_threshold and risk_signals >= 2:
+        verdict = "high"
+    elif score >= high_threshold:
+        verdict = "ambiguous"
+        reasons.append("single risk signal, needs a closer look")
+    else:
+        verdict = "ambiguous"
+    return ChannelRiskAssessment(score=score, verdict=verdict, features=f, reasons=reasons or ["no notable signals"])
+
+
+def format_channel_assessment(assessment: ChannelRiskAssessment, channel_name: str = "") -> str:
+    """Plain-text trust summary for a clear (low/high) assessment, in place of the LLM one."""
+    f = assessment.features
+    counts = []
+    if f.subscriber_count is not None:
+        counts.append(f"{f.subscriber_count:,} subscribers")
+    if f.video_count is not None:
+        counts.append(f"{f.video_count:,} videos")
+    if f.account_age_days is not None:
+        counts.append(f"account age {f.account_age_days // 365} years {f.account_age_days % 365} days")
+    lines = [
+        f"Channel {channel_name or '(unknown)'}: {assessment.verdict} risk "
+        f"(automatic assessment from channel metadata, score {assessment.score:+.1f}).",
+        f"Signals: {'; '.join(assessment.reasons)}.",
+    ]
+    if counts:
+        lines.append(f"Stats: {', '.join(counts)}.")
+    if f.link_domains:
+        lines.append(f"External links: {', '.join(f.link_domains)}.")
+    return "\n".join(lines)
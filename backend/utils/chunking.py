@@ -0,0 +1,135 @@
+"""
+Helpers for chunked transcription of long audio.
+
+plan_audio_chunks() picks chunk boundaries at low-energy points (pauses between
+words/sentences) so chunks can be transcribed in parallel without cutting words,
+and adds a small overlap so nothing is lost at a boundary.
+stitch_transcripts() joins the per-chunk transcripts back together, removing
+the words that were transcribed twice in each overlap.
+"""
+
+import difflib
+import re
+
+import numpy as np
+
+_ENERGY_FRAME_MS = 20
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _frame_energy(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Mean-square energy per non-overlapping frame."""
+    n_frames = len(samples) // frame_length
+    frames = samples[: n_frames * frame_length].reshape(n_frames, frame_length)
+    return np.mean(frames ** 2, axis=1)
+
+
+def plan_audio_chunks(
+    samples: np.ndarray,
+    sample_rate: int,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float,
+) -> list[tuple[int, int]]:
+    """
+    Split a mono signal into overlapping chunks cut at low-energy points.
+
+    Each cut is placed at the quietest frame in the `search_seconds` before the
+    nominal chunk end. The next chunk starts `overlap_seconds` before that cut.
+
+    Args:
+        samples: 1-D mono samples.
+        sample_rate: Sample rate in Hz.
+        chunk_seconds: Nominal (maximum) chunk length in seconds.
+        overlap_seconds: Audio shared by consecutive chunks, in seconds.
+        search_seconds: How far back from the nominal end to look for a quiet cut point.
+
+    Returns:
+        List of (start_sample, end_sample) pairs covering the whole signal.
+        A signal shorter than one chunk yields a single (0, len) pair.
+    """
+    total = len(samples)
+    chunk_len = int(chunk_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    search = min(int(search_seconds * sample_rate), chunk_len - overlap - 1)
+    if total <= chunk_len or chunk_len <= overlap:
+        return [(0, total)]
+
+    frame_length = max(1, int(sample_rate * _ENERGY_FRAME_MS / 1000))
+    energy = _frame_energy(np.asarray(samples, dtype=np.float32), frame_length)
+
+    chunks = []
+    start = 0
+    while start + chunk_len < total:
+        nominal_end = start + chunk_len
+        first_frame = (nominal_end - search) // frame_length
+        last_frame = max(first_frame + 1, nominal_end // frame_length)
+        window = energy[first_frame:last_frame]
+        if len(window) == 0:
+            cut = nominal_end
+        else:
+            quietest = first_frame + int(np.argmin(window))
+            cut = quietest * frame_length + frame_length // 2
+        chunks.append((start, cut))
+        start = max(cut - overlap, start + 1)
+    chunks.append((start, total))
+    return chunks
+
+
+def _normalize(word: str) -> str:
+    return "".join(_WORD_RE.findall(word.lower()))
+
+
+def stitch_transcripts(
+    texts: list[str],
+    max_overlap_words: int = 20,
+    min_match_words: int = 2,
+    edge_slack_words: int = 3,
+) -> str:
+    """
+    Join chunk transcripts, dropping words duplicated by the chunk overlap.
+
+    For each consecutive pair, the tail of the text so far is aligned with the head
+    of the next chunk (case/punctuation-insensitive). If they share a run of at
+    least `min_match_words` words, the next chunk continues after that run.
+    ASR often garbles the very first/last word of a chunk, so the match may sit up
+    to `edge_slack_words` away from the edges (but no further, so common phrases
+    elsewhere in the chunks are not mistaken for the overlap).
+
+    Args:
+        texts: Transcripts of consecutive, overlapping chunks.
+        max_overlap_words: How many words at each edge to consider for the overlap.
+        min_match_words: Minimum shared run to treat as a duplicated overlap.
+        edge_slack_words: Max words between the shared run and the chunk edges.
+
+    Returns:
+        The stitched transcript.
+    """
+    words: list[str] = []
+    for text in texts:
+        new_words = text.split()
+        if not new_words:
+            continue
+        if not words:
+            words = new_words
+            continue
+
+        tail = words[-max_overlap_words:]
+        head = new_words[:max_overlap_words]
+        matcher = difflib.SequenceMatcher(
+            a=[_normalize(w) for w in tail],
+            b=[_normalize(w) for w in head],
+            autojunk=False,
+        )
+        match = matcher.find_longest_match(0, len(tail), 0, len(head))
+        near_edges = (
+            len(tail) - (match.a + match.size) <= edge_slack_words
+            and match.b <= edge_slack_words
+        )
+        if match.size >= min_match_words and near_edges:
+            # Keep our words up to the end of the shared run, continue the next chunk after it
+            keep = len(words) - len(tail) + match.a + match.size
+            words = words[:keep] + new_words[match.b + match.size:]
+        else:
+            words.extend(new_words)
+    return " ".join(words)
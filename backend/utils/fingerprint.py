@@ -0,0 +1,295 @@
+"""
+Acoustic fingerprinting for recognizing reused audio (trending songs, voice-overs).
+
+Landmark fingerprints built on NumPy only:
+
+  1. Magnitude spectrogram (Hann window, ~64 ms frames, ~32 ms hop).
+  2. Spectral peaks: points that are the maximum of their time/frequency
+     neighbourhood and clearly above the clip's median level. Peaks survive gain
+     changes, compression and moderate background noise.
+  3. Each peak (anchor) is paired with a few later peaks; the hash packs
+     (anchor bin, target bin, frame gap). Hashes carry the anchor's frame so
+     matches can be checked for a consistent time offset.
+
+A clip matches a stored clip when many hashes agree on the same offset and those
+hashes cover most of both clips in time (per ~1 s window; only about a third of
+individual hashes survive re-encoding, so hash counts alone can't tell "same
+audio" from "shares a stretch of audio"). A clip that only shares part of its
+audio, e.g. a trending sound with new speech after it, is not a match, because
+its transcript and claims differ.
+FingerprintIndex keeps fingerprints in SQLite next to the transcript and web
+search result they produced, so a repeat of the same sound can reuse them.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .audio import DEFAULT_SAMPLE_RATE
+
+# Tuning constants (see module docstring)
+_FFT_SIZE = 1024
+_HOP_LENGTH = 512
+_MAX_FREQ_HZ = 5000.0           # Peaks above this are mostly noise/codec artifacts
+_PEAK_TIME_FRAMES = 10          # Neighbourhood half-width for peak picking
+_PEAK_FREQ_BINS = 10
+_PEAK_MIN_ABOVE_MEDIAN_DB = 10.0
+_FAN_OUT = 5                    # Target peaks paired with each anchor
+_MAX_PAIR_FRAMES = 63           # ~2 s at the default rate; must fit in 10 bits
+_MAX_PAIR_BINS = 100
+_OFFSET_TOLERANCE_FRAMES = 1    # Hop quantization can shift a peak by one frame
+_COVERAGE_WINDOW_SECONDS = 1.0  # Time resolution of match coverage
+_SQL_BATCH = 500
+
+
+@dataclass
+class FingerprintMatch:
+    """A stored clip whose audio matches the query."""
+    clip_id: str
+    transcript: str
+    search_result: str
+    matched_hashes: int
+    match_ratio: float
+    """Share of ~1 s windows covered by agreeing hashes, the lower of the query's and the stored clip's."""
+    offset_seconds: float
+    """Where the query starts relative to the stored clip (negative: before it)."""
+
+
+def _max_filter(values: np.ndarray, half_width: int, axis: int) -> np.ndarray:
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (half_width, half_width)
+    padded = np.pad(values, pad, mode="constant", constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half_width + 1, axis=axis)
+    return windows.max(axis=-1)
+
+
+def spectral_peaks(samples: np.ndarray, sample_rate: int = DEFAULT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Find landmark peaks in the spectrogram of `samples`.
+
+    Returns:
+        Array of shape (n_peaks, 2) with (frame index, frequency bin), sorted by frame.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < _FFT_SIZE:
+        return np.empty((0, 2), dtype=np.int64)
+
+    n_frames = 1 + (len(samples) - _FFT_SIZE) // _HOP_LENGTH
+    frames = np.lib.stride_tricks.sliding_window_view(samples, _FFT_SIZE)[::_HOP_LENGTH][:n_frames]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(_FFT_SIZE).astype(np.float32), axis=1))
+    max_bin = min(spectrum.shape[1], int(_MAX_FREQ_HZ * _FFT_SIZE / sample_rate) + 1)
+    db = 20.0 * np.log10(spectrum[:, 1:max_bin] + 1e-10)
+
+    neighbourhood_max = _max_filter(_max_filter(db, _PEAK_TIME_FRAMES, 0), _PEAK_FREQ_BINS, 1)
+    is_peak = (db == neighbourhood_max) & (db > np.median(db) + _PEAK_MIN_ABOVE_MEDIAN_DB)
+    frame_idx, bin_idx = np.nonzero(is_peak)
+    return np.stack([frame_idx, bin_idx + 1], axis=1).astype(np.int64)
+
+
+def audio_fingerprints(samples: np.ndarray, sample_rate: int = DEFAULT_SAMPLE_RATE) -> list[tuple[int, int]]:
+    """
+    Compute landmark hashes for a clip.
+
+    Args:
+        samples: Mono float samples (e.g. from load_audio_samples).
+        sample_rate: Sample rate of `samples` in Hz. Use the same rate for every
+            clip in an index.
+
+    Returns:
+        List of (hash, anchor frame) pairs.
+    """
+    peaks = spectral_peaks(samples, sample_rate)
+    fingerprints = []
+    for i, (t1, f1) in enumerate(peaks):
+        paired = 0
+        for t2, f2 in peaks[i + 1:]:
+            dt = t2 - t1
+            if dt > _MAX_PAIR_FRAMES:
+                break
+            if dt == 0 or abs(f2 - f1) > _MAX_PAIR_BINS:
+                continue
+            fingerprints.append(((int(f1) << 20) | (int(f2) << 10) | int(dt), int(t1)))
+            paired += 1
+            if paired >= _FAN_OUT:
+                break
+    return fingerprints
+
+
+class FingerprintIndex:
+    """
+    SQLite-backed index from audio fingerprints to earlier transcripts and web search results.
+
+    Example:
+        >>> index = FingerprintIndex(".cache/fingerprints.sqlite3", max_clips=5000)
+        >>> fps = audio_fingerprints(samples)
+        >>> match = index.lookup(fps)
+        >>> if match is None:
+        ...     index.add("videos/abc.mp4", fps, transcript, search_result)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_clips: int,
+        min_matches: int = 20,
+        min_match_ratio: float = 0.8,
+    ):
+        """
+        Args:
+            path: SQLite file to use (created with its parent directory if missing).
+            max_clips: Clips kept in the index; least recently matched clips are evicted.
+            min_matches: Minimum hashes agreeing on one offset for a confident match.
+            min_match_ratio: Minimum share of each clip's duration (query and stored) that
+                agreeing hashes must cover.
+        """
+        self.path = str(path)
+        self.max_clips = max_clips
+        self.min_matches = min_matches
+        self.min_match_ratio = min_match_ratio
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS clips ("
+            " clip_id TEXT PRIMARY KEY,"
+            " transcript TEXT NOT NULL,"
+            " search_result TEXT NOT NULL,"
+            " last_access REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " hash INTEGER NOT NULL,"
+            " clip_id TEXT NOT NULL,"
+            " frame INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS hashes_hash ON hashes (hash);"
+            "CREATE INDEX IF NOT EXISTS hashes_clip ON hashes (clip_id);"
+        )
+        self._conn.commit()
+
+    def add(self, clip_id: str, fingerprints: list[tuple[int, int]], transcript: str, search_result: str):
+        """Store a clip's fingerprints with the results they produced (replaces an existing clip_id)."""
+        if not fingerprints:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM hashes WHERE clip_id = ?", (clip_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO clips (clip_id, transcript, search_result, last_access) VALUES (?, ?, ?, ?)",
+                (clip_id, transcript, search_result, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO hashes (hash, clip_id, frame) VALUES (?, ?, ?)",
+                [(h, clip_id, frame) for h, frame in fingerprints],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def lookup(
+        self,
+        fingerprints: list[tuple[int, int]],
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+    ) -> Optional[FingerprintMatch]:
+        """
+        Find the stored clip that best matches `fingerprints`, if the match is confident.
+
+        Args:
+            fingerprints: Output of audio_fingerprints() for the query clip.
+            sample_rate: Sample rate the fingerprints were computed at (for offset_seconds).
+
+        Returns:
+            FingerprintMatch, or None if no stored clip passes min_matches and min_match_ratio
+            (in both directions).
+        """
+        if not fingerprints:
+            return None
+        query_frames = defaultdict(list)
+        for h, frame in fingerprints:
+            query_frames[h].append(frame)
+        unique_hashes = list(query_frames)
+
+        with self._lock:
+            rows = []
+            for i in range(0, len(unique_hashes), _SQL_BATCH):
+                batch = unique_hashes[i: i + _SQL_BATCH]
+                rows.extend(self._conn.execute(
+                    f"SELECT hash, clip_id, frame FROM hashes WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall())
+
+        # Votes per (clip, offset); a real match piles up on one offset
+        votes = Counter()
+        for h, clip_id, frame in rows:
+            for query_frame in query_frames[h]:
+                votes[(clip_id, frame - query_frame)] += 1
+        if not votes:
+            return None
+
+        best_clip, best_offset, best_score = None, 0, 0
+        for (clip_id, offset) in votes:
+            score = sum(
+                votes.get((clip_id, offset + d), 0)
+                for d in range(-_OFFSET_TOLERANCE_FRAMES, _OFFSET_TOLERANCE_FRAMES + 1)
+            )
+            if score > best_score:
+                best_clip, best_offset, best_score = clip_id, offset, score
+
+        if best_score < self.min_matches:
+            return None
+
+        # Time coverage in both directions: the shared audio must be (nearly) all of each clip
+        window = max(1, round(_COVERAGE_WINDOW_SECONDS * sample_rate / _HOP_LENGTH))
+        matched_query, matched_stored = set(), set()
+        for h, clip_id, frame in rows:
+            if clip_id != best_clip:
+                continue
+            for query_frame in query_frames[h]:
+                if abs(frame - query_frame - best_offset) <= _OFFSET_TOLERANCE_FRAMES:
+                    matched_query.add(query_frame // window)
+                    matched_stored.add(frame // window)
+        with self._lock:
+            stored_frames = self._conn.execute(
+                "SELECT DISTINCT frame FROM hashes WHERE clip_id = ?", (best_clip,)
+            ).fetchall()
+        query_windows = {frame // window for _, frame in fingerprints}
+        stored_windows = {frame // window for (frame,) in stored_frames}
+        if not stored_windows:
+            return None
+        ratio = min(len(matched_query) / len(query_windows), len(matched_stored) / len(stored_windows))
+        if ratio < self.min_match_ratio:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcript, search_result FROM clips WHERE clip_id = ?", (best_clip,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE clips SET last_access = ? WHERE clip_id = ?", (time.time(), best_clip))
+            self._conn.commit()
+
+        return FingerprintMatch(
+            clip_id=best_clip,
+            transcript=row[0],
+            search_result=row[1],
+            matched_hashes=best_score,
+            match_ratio=ratio,
+            offset_seconds=best_offset * _HOP_LENGTH / sample_rate,
+        )
+
+    def _evict(self):
+        excess = self._conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0] - self.max_clips
+        if excess <= 0:
+            return
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT clip_id FROM clips ORDER BY last_access ASC LIMIT ?", (excess,)
+        )]
+        self._conn.executemany("DELETE FROM hashes WHERE clip_id = ?", [(c,) for c in stale])
+        self._conn.executemany("DELETE FROM clips WHERE clip_id = ?", [(c,) for c in stale])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
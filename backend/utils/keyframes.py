@@ -0,0 +1,120 @@
+"""
+Scene-change keyframe extraction, for analyzing a short from a few images instead of the full video.
+
+  1. Sample the clip at a low rate as tiny grayscale frames (see video_hash.sample_video_frames).
+  2. Score each frame by how much it differs from the previous one (mean absolute
+     pixel change plus grey-level histogram change), so cuts and big motion score high.
+  3. Keep the first frame plus the highest-scoring changes, at least min_gap
+     seconds apart, and fill up with evenly spaced frames for static clips.
+  4. Extract just those frames from the video as JPEGs in one ffmpeg pass.
+"""
+
+import os
+import subprocess
+
+import numpy as np
+
+from .video_hash import sample_video_frames
+
+
+def scene_change_scores(frames: np.ndarray) -> np.ndarray:
+    """
+    Per-frame change score in [0, 1] (the first frame scores 1.0).
+
+    Args:
+        frames: uint8 array of shape (n_frames, height, width).
+    """
+    if len(frames) == 0:
+        return np.empty(0)
+    pixels = frames.astype(np.float32) / 255.0
+    pixel_change = np.abs(np.diff(pixels, axis=0)).mean(axis=(1, 2))
+    histograms = np.stack([np.histogram(f, bins=16, range=(0, 1))[0] / f.size for f in pixels])
+    histogram_change = 0.5 * np.abs(np.diff(histograms, axis=0)).sum(axis=1)
+    scores = np.clip(0.5 * (pixel_change * 4.0) + 0.5 * histogram_change, 0.0, 1.0)
+    return np.concatenate([[1.0], scores])
+
+
+def select_keyframes(scores: np.ndarray, max_keyframes: int, min_gap: int, threshold: float = 0.15) -> list[int]:
+    """
+    Pick keyframe indices from change scores.
+
+    Args:
+        scores: Output of scene_change_scores().
+        max_keyframes: Upper bound on frames returned.
+        min_gap: Minimum distance (in sampled frames) between two keyframes.
+        threshold: Minimum score for a frame to count as a scene change.
+
+    Returns:
+        Sorted frame indices; always starts with 0 for a non-empty clip.
+    """
+    n = len(scores)
+    if n == 0 or max_keyframes <= 0:
+        return []
+    chosen = [0]
+    for i in np.argsort(-scores, kind="stable"):
+        if len(chosen) >= max_keyframes or scores[i] < threshold:
+            break
+        if all(abs(int(i) - c) >= min_gap for c in chosen):
+            chosen.append(int(i))
+
+    # Static clips have few cuts; spread the remaining budget evenly
+    for i in np.linspace(0, n - 1, max_keyframes).round().astype(int):
+        if len(chosen) >= max_keyframes:
+            break
+        if all(abs(int(i) - c) >= min_gap for c in chosen):
+            chosen.append(int(i))
+    return sorted(chosen)
+
+
+def extract_keyframes(
+    video_path: str,
+    output_dir: str,
+    max_keyframes: int = 6,
+    sample_fps: float = 2.0,
+    min_gap_seconds: float = 1.0,
+    max_height: int = 480,
+) -> list[str]:
+    """
+    Save scene-change keyframes of a video as JPEG files.
+
+    Args:
+        video_path: Video to extract from.
+        output_dir: Folder for the JPEGs (created if missing).
+        max_keyframes: Maximum number of images.
+        sample_fps: Rate at which candidate frames are sampled.
+        min_gap_seconds: Minimum time between two keyframes.
+        max_height: Downscale taller frames to this height.
+
+    Returns:
+        Paths of the JPEGs in time order.
+
+    Raises:
+        RuntimeError: If ffmpeg fails.
+    """
+    frames = sample_video_frames(video_path, frames_per_second=sample_fps, max_frames=100000)
+    indices = select_keyframes(
+        scene_change_scores(frames),
+        max_keyframes=max_keyframes,
+        min_gap=max(1, int(round(min_gap_seconds * sample_fps))),
+    )
+    if not indices:
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    pattern = os.path.join(output_dir, f"{stem}_keyframe_%02d.jpg")
+    select = "+".join(f"eq(n\\,{i})" for i in indices)
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", video_path,
+            "-vf", f"fps={sample_fps},select='{select}',scale=-2:'min({max_height},ih)'",
+            "-vsync", "vfr", "-q:v", "3",
+            pattern,
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"Could not extract keyframes from {video_path}: {stderr}")
+    return [pattern % (k + 1) for k in range(len(indices)) if os.path.exists(pattern % (k + 1))]
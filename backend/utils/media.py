@@ -0,0 +1,94 @@
+"""
+Video media profiles: re-encode a clip before sending it to a multimodal model.
+
+Bytes uploaded and video tokens billed scale with frame rate and resolution, so
+a profile can trade visual detail for latency and cost:
+
+  - fps:                 frames per second kept in the file (and sampled by the model)
+  - max_height:          downscale taller videos to this height (aspect ratio kept)
+  - audio_bitrate_kbps:  re-encode audio to mono AAC at this bitrate (0 drops audio)
+  - media_resolution:    model-side resolution hint (Gemini MEDIA_RESOLUTION_* name)
+
+Any field left as None keeps the source value / model default.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class MediaProfile:
+    """How to prepare a video before analysis. See module docstring for the fields."""
+    name: str
+    fps: Optional[float] = None
+    max_height: Optional[int] = None
+    audio_bitrate_kbps: Optional[int] = None
+    media_resolution: Optional[str] = None
+
+    @property
+    def transcodes(self) -> bool:
+        """Whether the file itself needs re-encoding (media_resolution is model-side only)."""
+        return self.fps is not None or self.max_height is not None or self.audio_bitrate_kbps is not None
+
+
+def apply_media_profile(video_path: str, profile: MediaProfile, output_dir: Optional[str] = None) -> str:
+    """
+    Re-encode a video according to `profile`.
+
+    The output is cached next to the source (or in output_dir) as
+    `<stem>.<profile name>.mp4`, so applying a profile twice is free.
+
+    Args:
+        video_path: Source video.
+        profile: Profile to apply.
+        output_dir: Where to write the re-encoded file (default: the source's folder).
+
+    Returns:
+        Path to the re-encoded file, or video_path unchanged if the profile
+        doesn't transcode.
+
+    Raises:
+        RuntimeError: If ffmpeg fails.
+    """
+    if not profile.transcodes:
+        return video_path
+
+    source = Path(video_path)
+    out_dir = Path(output_dir) if output_dir is not None else source.parent
+    os.makedirs(out_dir, exist_ok=True)
+    output_path = out_dir / f"{source.stem}.{profile.name}.mp4"
+    if output_path.exists() and output_path.stat().st_mtime >= source.stat().st_mtime:
+        return str(output_path)
+
+    filters = []
+    if profile.fps is not None:
+        filters.append(f"fps={profile.fps}")
+    if profile.max_height is not None:
+        # Only ever downscale; -2 keeps the width even for H.264
+        filters.append(f"scale=-2:'min({profile.max_height},ih)'")
+
+    cmd = ["ffmpeg", "-nostdin", "-v", "error", "-y", "-i", str(source)]
+    if filters:
+        cmd += ["-vf", ",".join(filters), "-c:v", "libx264", "-preset", "veryfast", "-crf", "28"]
+    else:
+        cmd += ["-c:v", "copy"]
+    if profile.audio_bitrate_kbps == 0:
+        cmd += ["-an"]
+    elif profile.audio_bitrate_kbps is not None:
+        cmd += ["-c:a", "aac", "-ac", "1", "-b:a", f"{profile.audio_bitrate_kbps}k"]
+    else:
+        cmd += ["-c:a", "copy"]
+    # Write to a temporary name so a failed encode is never picked up as cached
+    partial_path = output_path.with_name(output_path.name + ".partial")
+    cmd += ["-movflags", "+faststart", "-f", "mp4", str(partial_path)]
+
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        partial_path.unlink(missing_ok=True)
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"Could not apply media profile {profile.name} to {video_path}: {stderr}")
+    os.replace(partial_path, output_path)
+    return str(output_path)
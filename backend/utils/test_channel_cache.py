@@ -0,0 +1,93 @@
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.channel_cache import ChannelCache
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fresh_entry_is_served_without_fetching():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChannelCache(Path(tmp) / "channels.sqlite3", ttl_seconds=60, max_stale_seconds=600)
+        calls = []
+        fetch = lambda: calls.append(1) or {"description": "pets"}
+        assert cache.get_or_fetch("UC1", "context", fetch) == {"description": "pets"}
+        assert cache.get_or_fetch("UC1", "context", fetch) == {"description": "pets"}
+        assert len(calls) == 1
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChannelCache(Path(tmp) / "channels.sqlite3", ttl_seconds=0, max_stale_seconds=600)
+        cache.set("UC1", "context", "old")
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(2)
+            return "new"
+
+        start = time.time()
+        assert cache.get_or_fetch("UC1", "context", slow_fetch) == "old"
+        assert time.time() - start < 0.5
+        release.set()
+        assert _wait_until(lambda: cache.get("UC1", "context")[0] == "new")
+
+
+def test_failed_refresh_keeps_stale_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChannelCache(Path(tmp) / "channels.sqlite3", ttl_seconds=0, max_stale_seconds=600)
+        cache.set("UC1", "trust_summary", "old")
+
+        def failing_fetch():
+            raise RuntimeError("scrape failed")
+
+        assert cache.get_or_fetch("UC1", "trust_summary", failing_fetch) == "old"
+        assert _wait_until(lambda: not cache._refreshing)
+        assert cache.get("UC1", "trust_summary")[0] == "old"
+
+
+def test_partial_refresh_keeps_stale_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChannelCache(Path(tmp) / "channels.sqlite3", ttl_seconds=0, max_stale_seconds=600)
+        cache.set("UC1", "context", {"description": "pets"})
+        is_partial = lambda value: "scrape_errors" in value
+        partial_fetch = lambda: {"scrape_errors": {"about": "timed out"}}
+
+        assert cache.get_or_fetch("UC1", "context", partial_fetch, is_partial=is_partial) == {"description": "pets"}
+        assert _wait_until(lambda: not cache._refreshing)
+        assert cache.get("UC1", "context")[0] == {"description": "pets"}
+
+        cache.delete("UC1")
+        assert cache.get_or_fetch("UC1", "context", partial_fetch, is_partial=is_partial) == partial_fetch()
+        assert cache.get("UC1", "context") is None
+
+
+def test_too_old_entry_is_fetched_synchronously():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChannelCache(Path(tmp) / "channels.sqlite3", ttl_seconds=0, max_stale_seconds=0)
+        cache.set("UC1", "context", "old")
+        assert cache.get_or_fetch("UC1", "context", lambda: "new") == "new"
+
+
+if __name__ == "__main__":
+    test_fresh_entry_is_served_without_fetching()
+    test_stale_entry_is_served_and_refreshed_in_background()
+    test_failed_refresh_keeps_stale_entry()
+    test_partial_refresh_keeps_stale_entry()
+    test_too_old_entry_is_fetched_synchronously()
+    print("All channel cache tests passed!")
@@ -0,0 +1,78 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.channel_features import assess_channel, format_channel_assessment, link_domain, parse_count, parse_joined
+
+AI_KEYWORDS = ["ai generated", "made with ai", "created with sora"]
+SUSPICIOUS = ["bit.ly", "t.me"]
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _assess(profile):
+    return assess_channel(profile, AI_KEYWORDS, SUSPICIOUS, now=NOW)
+
+
+def test_parsers():
+    assert parse_count("1.2M subscribers") == 1_200_000
+    assert parse_count("12,345 videos") == 12345
+    assert parse_count("No videos") == 0
+    assert parse_count("") is None
+    assert parse_joined("Joined Mar 5, 2021") == datetime(2021, 3, 5, tzinfo=timezone.utc)
+    assert link_domain("https://www.Instagram.com/someone") == "instagram.com"
+    assert link_domain("t.me/channel") == "t.me"
+
+
+def test_established_channel_is_low_risk():
+    assessment = _assess({
+        "description": "Science explainers every week",
+        "subscriber_count": "2.4M subscribers",
+        "video_count": "410 videos",
+        "joined": "Joined Jan 3, 2014",
+        "links": [{"title": "Site", "url": "example.org"}],
+        "videos": [{"title": "How rainbows form"}, {"title": "Why the sky is blue"}],
+    })
+    assert assessment.verdict == "low"
+    assert "low risk" in format_channel_assessment(assessment, "Sci")
+
+
+def test_new_ai_channel_with_sensational_titles_is_high_risk():
+    assessment = _assess({
+        "description": "All content is AI generated",
+        "subscriber_count": "312 subscribers",
+        "joined": "Joined Nov 20, 2025",
+        "links": [{"title": "Join", "url": "https://t.me/deals"}],
+        "videos": [{"title": "SHOCKING arrest!!"}, {"title": "Leaked footage"}, {"title": "Cat"}],
+    })
+    assert assessment.verdict == "high"
+    assert assessment.features.suspicious_domains == ["t.me"]
+    assert assessment.features.account_age_days == 42
+
+
+def test_single_risk_signal_is_not_high_risk():
+    disclosed = _assess({"description": "Every clip is made with AI", "videos": [{"title": "Cat"}]})
+    assert disclosed.score >= 2.0 and disclosed.verdict == "ambiguous"
+    street_food = _assess({"description": "Sora street food tours", "subscriber_count": "500 subscribers"})
+    assert street_food.features.ai_disclosures == [] and street_food.verdict != "high"
+    reviews = _assess({"description": "We review the latest AI tools"})
+    assert reviews.features.ai_disclosures == []
+
+
+def test_mixed_signals_and_missing_about_are_ambiguous():
+    assert _assess({"subscriber_count": "5K subscribers", "videos": [{"title": "Vlog"}]}).verdict == "ambiguous"
+    profile = {"videos": [{"title": "Vlog"}], "scrape_errors": {"about": "TimeoutError: timed out"}}
+    assert _assess(profile).verdict == "ambiguous"
+
+
+if __name__ == "__main__":
+    test_parsers()
+    test_established_channel_is_low_risk()
+    test_new_ai_channel_with_sensational_titles_is_high_risk()
+    test_single_risk_signal_is_not_high_risk()
+    test_mixed_signals_and_missing_about_are_ambiguous()
+    print("All channel feature tests passed!")
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.chunking import plan_audio_chunks, stitch_transcripts
+
+SAMPLE_RATE = 16000
+
+
+def test_short_audio_is_one_chunk():
+    samples = np.zeros(SAMPLE_RATE * 10, dtype=np.float32)
+    assert plan_audio_chunks(samples, SAMPLE_RATE, 30, 2, 5) == [(0, len(samples))]
+
+
+def test_chunks_cut_at_quiet_points_and_overlap():
+    samples = np.random.default_rng(0).normal(0, 0.1, SAMPLE_RATE * 95).astype(np.float32)
+    samples[27 * SAMPLE_RATE: int(27.3 * SAMPLE_RATE)] = 0.0  # pause inside the first search window
+    chunks = plan_audio_chunks(samples, SAMPLE_RATE, 30, 2, 5)
+
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == len(samples)
+    assert 27 * SAMPLE_RATE <= chunks[0][1] <= int(27.3 * SAMPLE_RATE)
+    for (_, prev_end), (start, end) in zip(chunks, chunks[1:]):
+        assert prev_end - start == 2 * SAMPLE_RATE
+        assert end - start <= 30 * SAMPLE_RATE
+
+
+def test_stitch_removes_overlap():
+    texts = ["Hello there my friend, how are", "friend how are you doing today. It is", "it is sunny."]
+    assert stitch_transcripts(texts) == "Hello there my friend, how are you doing today. It is sunny."
+
+
+def test_stitch_keeps_repeated_phrases_away_from_edges():
+    texts = ["of the people and then we", "went to the store of the people"]
+    assert stitch_transcripts(texts) == "of the people and then we went to the store of the people"
+
+
+def test_stitch_tolerates_garbled_edge_words():
+    texts = ["the cat sat on the mat and", "n the mat and then left", ""]
+    assert stitch_transcripts(texts) == "the cat sat on the mat and then left"
+
+
+if __name__ == "__main__":
+    test_short_audio_is_one_chunk()
+    test_chunks_cut_at_quiet_points_and_overlap()
+    test_stitch_removes_overlap()
+    test_stitch_keeps_repeated_phrases_away_from_edges()
+    test_stitch_tolerates_garbled_edge_words()
+    print("All chunking tests passed!")
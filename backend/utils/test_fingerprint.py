@@ -0,0 +1,88 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.fingerprint import FingerprintIndex, audio_fingerprints
+
+SAMPLE_RATE = 16000
+
+
+def _melody(seed: int, seconds: int = 30) -> np.ndarray:
+    """Synthetic 'song': a random sequence of quarter-second notes with harmonics."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(SAMPLE_RATE // 4) / SAMPLE_RATE
+    notes = []
+    for _ in range(seconds * 4):
+        f = rng.choice([220, 247, 262, 294, 330, 349, 392, 440, 494, 523, 587, 659]) * rng.choice([1, 2])
+        note = 0.3 * np.sin(2 * np.pi * f * t) + 0.15 * np.sin(4 * np.pi * f * t)
+        note += 0.1 * np.sin(2 * np.pi * rng.uniform(800, 3000) * t)
+        notes.append(note * np.hanning(len(t)))
+    return np.concatenate(notes).astype(np.float32)
+
+
+def _index_with(tmp: str, **songs) -> FingerprintIndex:
+    index = FingerprintIndex(Path(tmp) / "fingerprints.sqlite3", max_clips=10)
+    for clip_id, samples in songs.items():
+        index.add(clip_id, audio_fingerprints(samples), f"transcript {clip_id}", f"search {clip_id}")
+    return index
+
+
+def test_matches_reencoded_copy():
+    song = _melody(1, seconds=20)
+    rng = np.random.default_rng(5)
+    # Same audio, not on a frame boundary, quieter and noisier
+    query = song[123:] * 0.6
+    query = (query + rng.normal(0, 0.02, len(query))).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        match = _index_with(tmp, song=song, other=_melody(2)).lookup(audio_fingerprints(query))
+        assert match is not None
+        assert match.clip_id == "song"
+        assert match.transcript == "transcript song" and match.search_result == "search song"
+        assert match.match_ratio >= 0.8
+        assert abs(match.offset_seconds) < 0.1
+
+
+def test_partly_shared_audio_does_not_match():
+    song = _melody(1, seconds=20)
+    # First half of the known sound, then something new (e.g. new speech): transcript differs
+    continued = np.concatenate([song[: 10 * SAMPLE_RATE], _melody(7, seconds=10)])
+    # Excerpt of the known sound: covers the query but only part of the stored clip
+    excerpt = song[int(7.3 * SAMPLE_RATE) + 123: 15 * SAMPLE_RATE] * 0.6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = _index_with(tmp, song=song)
+        assert index.lookup(audio_fingerprints(continued)) is None
+        assert index.lookup(audio_fingerprints(excerpt.astype(np.float32))) is None
+
+
+def test_unrelated_audio_does_not_match():
+    noise = np.random.default_rng(3).normal(0, 0.1, 20 * SAMPLE_RATE).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = _index_with(tmp, song=_melody(1), other=_melody(2))
+        assert index.lookup(audio_fingerprints(_melody(3))) is None
+        assert index.lookup(audio_fingerprints(noise)) is None
+
+
+def test_index_evicts_least_recently_used_clips():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = FingerprintIndex(Path(tmp) / "fingerprints.sqlite3", max_clips=2)
+        for seed in range(3):
+            index.add(f"clip{seed}", audio_fingerprints(_melody(seed, seconds=5)), "", "")
+        assert len(index) == 2
+        assert index.lookup(audio_fingerprints(_melody(0, seconds=5))) is None
+
+
+if __name__ == "__main__":
+    test_matches_reencoded_copy()
+    test_partly_shared_audio_does_not_match()
+    test_unrelated_audio_does_not_match()
+    test_index_evicts_least_recently_used_clips()
+    print("All fingerprint tests passed!")
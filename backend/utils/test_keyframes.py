@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.keyframes import scene_change_scores, select_keyframes
+
+
+def _scenes(lengths: list[int], seed: int = 0) -> np.ndarray:
+    """Consecutive 'shots' of near-static frames with a hard cut between them."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for length in lengths:
+        shot = rng.uniform(0, 255, (32, 32))
+        frames.extend(np.clip(shot + rng.normal(0, 2, (32, 32)), 0, 255) for _ in range(length))
+    return np.array(frames, dtype=np.uint8)
+
+
+def test_keyframes_land_on_cuts():
+    frames = _scenes([10, 6, 14])
+    scores = scene_change_scores(frames)
+    assert select_keyframes(scores, max_keyframes=3, min_gap=2) == [0, 10, 16]
+
+
+def test_static_clip_falls_back_to_even_spacing():
+    scores = scene_change_scores(_scenes([20]))
+    assert select_keyframes(scores, max_keyframes=4, min_gap=2) == [0, 6, 13, 19]
+
+
+def test_min_gap_and_budget_respected():
+    frames = _scenes([2] * 10)  # a cut every 2 frames
+    chosen = select_keyframes(scene_change_scores(frames), max_keyframes=5, min_gap=4)
+    assert len(chosen) <= 5
+    assert all(b - a >= 4 for a, b in zip(chosen, chosen[1:]))
+
+
+if __name__ == "__main__":
+    test_keyframes_land_on_cuts()
+    test_static_clip_falls_back_to_even_spacing()
+    test_min_gap_and_budget_respected()
+    print("All keyframe tests passed!")
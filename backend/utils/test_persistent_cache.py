@@ -0,0 +1,47 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.audio import audio_content_hash
+from utils.persistent_cache import PersistentLRUCache
+
+
+def test_cache_persists_across_instances():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.sqlite3"
+        PersistentLRUCache(path, max_bytes=1000).set("a", "hello")
+        cache = PersistentLRUCache(path, max_bytes=1000)
+        assert cache.get("a") == "hello"
+        assert cache.get("missing") is None
+
+
+def test_cache_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PersistentLRUCache(Path(tmp) / "cache.sqlite3", max_bytes=10)
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", "zzzz")
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert cache.total_bytes() <= 10
+
+
+def test_audio_hash_depends_only_on_content():
+    samples = np.random.default_rng(0).uniform(-0.5, 0.5, 16000).astype(np.float32)
+    assert audio_content_hash(samples, 16000) == audio_content_hash(samples.astype(np.float64), 16000)
+    assert audio_content_hash(samples, 16000) != audio_content_hash(samples, 8000)
+    assert audio_content_hash(samples, 16000) != audio_content_hash(samples[1:], 16000)
+
+
+if __name__ == "__main__":
+    test_cache_persists_across_instances()
+    test_cache_evicts_least_recently_used()
+    test_audio_hash_depends_only_on_content()
+    print("All persistent cache tests passed!")
@@ -0,0 +1,60 @@
+import json
+import sys
+from pathlib import Path
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.token_budget import InputSource, compact_json, count_tokens, fit_json_to_tokens, pack_inputs, truncate_to_tokens
+
+PROFILE = {
+    "channel": "Daily Facts",
+    "description": "We post surprising facts every day. " * 60,
+    "links": [],
+    "country": None,
+    "videos": [{"title": f"Fact number {i}", "url": f"https://www.youtube.com/watch?v={i:011d}"} for i in range(40)],
+}
+
+
+def test_compact_json_drops_whitespace_and_empty_fields():
+    text = compact_json(PROFILE)
+    assert "links" not in text and "country" not in text
+    assert ": " not in text and "\n" not in text
+    assert count_tokens(text) < count_tokens(json.dumps(PROFILE, indent=2))
+
+
+def test_fit_json_stays_valid_and_within_budget():
+    text = fit_json_to_tokens(PROFILE, 300)
+    assert count_tokens(text) <= 300
+    data = json.loads(text)
+    assert data["channel"] == "Daily Facts"
+    assert 0 < len(data["videos"]) < 40
+
+
+def test_truncate_marks_cut_text():
+    long_text = "word " * 2000
+    cut = truncate_to_tokens(long_text, 50)
+    assert cut.endswith("[truncated]") and count_tokens(cut) <= 55
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_pack_inputs_shares_budget_by_priority():
+    packed = pack_inputs([
+        InputSource("semantic", "analysis " * 5000, priority=3),
+        InputSource("search", "result " * 5000, priority=1),
+        InputSource("channel", "Small channel summary.", priority=1),
+    ], total_tokens=2000)
+    assert packed["channel"] == "Small channel summary."
+    semantic, search = count_tokens(packed["semantic"]), count_tokens(packed["search"])
+    assert semantic > 2 * search
+    assert sum(count_tokens(v) for v in packed.values()) <= 2000 + 10
+
+
+if __name__ == "__main__":
+    test_compact_json_drops_whitespace_and_empty_fields()
+    test_fit_json_stays_valid_and_within_budget()
+    test_truncate_marks_cut_text()
+    test_pack_inputs_shares_budget_by_priority()
+    print("All token budget tests passed!")
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.triage import triage_video
+
+RISK_KEYWORDS = {
+    "health": ["cure", "doctors hate"],
+    "politics": ["election"],
+}
+AI_DISCLOSURE_KEYWORDS = ["ai generated", "made with ai"]
+
+CHANNEL = {
+    "description": "Daily pet videos from our farm",
+    "keywords": "dogs cats funny",
+    "recent_titles": ["Puppy meets goat", "Cat vs cucumber", "Morning chores"],
+}
+
+
+def _triage(channel=CHANNEL, transcript=None, has_speech=True):
+    return triage_video(channel, transcript, has_speech, RISK_KEYWORDS, AI_DISCLOSURE_KEYWORDS)
+
+
+def test_benign_entertainment_is_quick():
+    decision = _triage(transcript="Look at him jump into the pile of leaves!")
+    assert decision.tier == "quick"
+    assert decision.reasons == ["no risk signals"]
+
+
+def test_health_claim_in_transcript_is_full():
+    decision = _triage(transcript="This tea will cure your diabetes in a week")
+    assert decision.tier == "full"
+    assert any("health" in r for r in decision.reasons)
+
+
+def test_ai_disclosure_channel_is_full():
+    channel = dict(CHANNEL, description="All videos are AI generated for fun")
+    assert _triage(channel=channel, transcript="Look at him go").tier == "full"
+
+
+def test_no_speech_is_quick():
+    assert _triage(transcript=None, has_speech=False).tier == "quick"
+
+
+def test_missing_transcript_and_channel_is_full():
+    assert _triage(channel=None, transcript=None, has_speech=None).tier == "full"
+
+
+def test_keywords_match_whole_words():
+    assert _triage(transcript="Keep your accounts secure").tier == "quick"
+
+
+if __name__ == "__main__":
+    test_benign_entertainment_is_quick()
+    test_health_claim_in_transcript_is_full()
+    test_ai_disclosure_channel_is_full()
+    test_no_speech_is_quick()
+    test_missing_transcript_and_channel_is_full()
+    test_keywords_match_whole_words()
+    print("All triage tests passed!")
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils import speech_ratio
+
+SAMPLE_RATE = 16000
+_t = np.arange(SAMPLE_RATE * 5) / SAMPLE_RATE
+_rng = np.random.default_rng(0)
+_hiss = _rng.normal(0, 1e-4, len(_t))
+
+
+def _synthetic_speech():
+    """Harmonic 'voice' at 150 Hz, switched on/off at a syllable rate of 4 Hz."""
+    voice = sum(np.sin(2 * np.pi * 150 * k * _t) / k for k in range(1, 15))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * _t), 0, None)
+    return 0.2 * voice * syllables + _hiss
+
+
+def _synthetic_music():
+    """Sustained chord."""
+    return 0.1 * sum(np.sin(2 * np.pi * f * _t) for f in [220, 277, 330, 440]) + _hiss
+
+
+def test_silence_has_no_speech():
+    assert speech_ratio(_hiss.astype(np.float32), SAMPLE_RATE) == 0.0
+
+
+def test_noise_and_music_have_no_speech():
+    noise = 0.1 * _rng.normal(0, 1, len(_t))
+    assert speech_ratio(noise.astype(np.float32), SAMPLE_RATE) < 0.05
+    assert speech_ratio(_synthetic_music().astype(np.float32), SAMPLE_RATE) < 0.05
+
+
+def test_speech_detected_with_and_without_background_music():
+    speech = _synthetic_speech()
+    assert speech_ratio(speech.astype(np.float32), SAMPLE_RATE) > 0.3
+    mixed = speech + 0.3 * _synthetic_music()
+    assert speech_ratio(mixed.astype(np.float32), SAMPLE_RATE) > 0.3
+
+
+def test_empty_audio():
+    assert speech_ratio(np.zeros(0, dtype=np.float32), SAMPLE_RATE) == 0.0
+
+
+if __name__ == "__main__":
+    test_silence_has_no_speech()
+    test_noise_and_music_have_no_speech()
+    test_speech_detected_with_and_without_background_music()
+    test_empty_audio()
+    print("All VAD tests passed!")
@@ -0,0 +1,89 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.video_hash import BKTree, VideoDedupIndex, hamming_distance, perceptual_hash
+
+
+def _frames(seed: int, n: int = 20) -> list[np.ndarray]:
+    """Smooth random 32x32 'scenes' (blurred noise looks more like footage than raw noise)."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(n):
+        coarse = rng.uniform(0, 255, (4, 4))
+        frames.append(np.kron(coarse, np.ones((8, 8))) + rng.normal(0, 5, (32, 32)))
+    return frames
+
+
+def _reencode(frame: np.ndarray, rng) -> np.ndarray:
+    """Brightness/contrast shift plus noise, as a reupload would get."""
+    return np.clip(frame * 0.9 + 15 + rng.normal(0, 4, frame.shape), 0, 255)
+
+
+def test_phash_survives_reencoding():
+    rng = np.random.default_rng(0)
+    original, other = _frames(1, 1)[0], _frames(2, 1)[0]
+    assert hamming_distance(perceptual_hash(original), perceptual_hash(_reencode(original, rng))) <= 6
+    assert hamming_distance(perceptual_hash(original), perceptual_hash(other)) > 16
+
+
+def test_bktree_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    keys = [int(k) for k in rng.integers(0, 2**63, 500, dtype=np.int64)]
+    tree = BKTree()
+    for i, k in enumerate(keys):
+        tree.add(k, i)
+    query = keys[42] ^ 0b1011
+    expected = sorted(i for i, k in enumerate(keys) if hamming_distance(k, query) <= 20)
+    assert sorted(value for _, value in tree.search(query, 20)) == expected
+
+
+def test_index_finds_reupload_and_ignores_other_videos():
+    rng = np.random.default_rng(0)
+    video = [perceptual_hash(f) for f in _frames(1)]
+    reupload = [perceptual_hash(_reencode(f, rng)) for f in _frames(1)[2:]]  # also trimmed
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VideoDedupIndex(Path(tmp) / "video_hashes.sqlite3", max_videos=10)
+        index.add("original", video, "analysis of original")
+        index.add("other", [perceptual_hash(f) for f in _frames(2)], "analysis of other")
+
+        match = index.lookup(reupload)
+        assert match is not None and match.video_id == "original"
+        assert match.analysis == "analysis of original"
+        assert index.lookup([perceptual_hash(f) for f in _frames(3)]) is None
+
+        # Survives a restart
+        reopened = VideoDedupIndex(Path(tmp) / "video_hashes.sqlite3", max_videos=10)
+        assert reopened.lookup(reupload).video_id == "original"
+
+
+def test_index_evicts_in_batches_and_replaces_without_stale_matches():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VideoDedupIndex(Path(tmp) / "video_hashes.sqlite3", max_videos=10)
+        videos = {seed: [perceptual_hash(f) for f in _frames(seed, n=5)] for seed in range(11)}
+        for seed in range(10):
+            index.add(f"v{seed}", videos[seed], f"analysis {seed}")
+        index.add("v10", videos[10], "analysis 10")
+        assert len(index) == 9  # 10% dropped at once, not one per add
+        assert index.lookup(videos[0]) is None and index.lookup(videos[1]) is None
+        assert index.lookup(videos[10]).video_id == "v10"
+
+        # Re-adding with other frames: the old frames no longer match
+        index.add("v10", videos[0], "new analysis")
+        assert index.lookup(videos[10]) is None
+        assert index.lookup(videos[0]).analysis == "new analysis"
+
+
+if __name__ == "__main__":
+    test_phash_survives_reencoding()
+    test_bktree_search_matches_brute_force()
+    test_index_finds_reupload_and_ignores_other_videos()
+    test_index_evicts_in_batches_and_replaces_without_stale_matches()
+    print("All video hash tests passed!")
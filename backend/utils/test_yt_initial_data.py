@@ -0,0 +1,61 @@
+import json
+import sys
+from pathlib import Path
+
+# Allow importing utils from backend when run from any folder
+_backend_dir = Path(__file__).resolve().parent.parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.yt_initial_data import InitialDataScanner, extract_initial_data
+
+DATA = {
+    "responseContext": {"note": 'braces } { and quotes \" in strings, trailing backslash \\'},
+    "contents": {"tabs": [{"title": "Home"}, {"title": "Shorts"}]},
+    "metadata": {"channelMetadataRenderer": {"title": "Café Clips", "description": "Daily {news}"}},
+    "onResponseReceivedEndpoints": [{"showEngagementPanelEndpoint": {}}],
+    "trackingParams": "abc",
+}
+PAGE = (
+    b'<html><script>window["ytInitialData"] = null;</script>'
+    b"<script>var ytInitialData = " + json.dumps(DATA, ensure_ascii=False).encode("utf-8") + b";</script>"
+    + b"<div>" + b"x" * 10000 + b"</div></html>"
+)
+
+
+def _chunks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_extracts_object_across_any_chunk_boundaries():
+    for size in (1, 3, 64, 4096):
+        assert extract_initial_data(_chunks(PAGE, size)) == DATA
+
+
+def test_decodes_only_requested_top_level_keys():
+    data = extract_initial_data(_chunks(PAGE, 64), keys=("metadata", "onResponseReceivedEndpoints"))
+    assert data == {"metadata": DATA["metadata"], "onResponseReceivedEndpoints": DATA["onResponseReceivedEndpoints"]}
+
+
+def test_stops_reading_once_object_closes():
+    scanner = InitialDataScanner()
+    read = 0
+    for chunk in _chunks(PAGE, 256):
+        read += len(chunk)
+        if scanner.feed(chunk):
+            break
+    assert read < len(PAGE) - 9000
+    assert scanner.raw.endswith(b"}")
+
+
+def test_missing_or_truncated_object_returns_none():
+    assert extract_initial_data(_chunks(b"<html>no data here</html>", 8)) is None
+    assert extract_initial_data([PAGE[:PAGE.index(b"trackingParams")]]) is None
+
+
+if __name__ == "__main__":
+    test_extracts_object_across_any_chunk_boundaries()
+    test_decodes_only_requested_top_level_keys()
+    test_stops_reading_once_object_closes()
+    test_missing_or_truncated_object_returns_none()
+    print("All ytInitialData tests passed!")
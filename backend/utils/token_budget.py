@@ -0,0 +1,202 @@
+"""
+Token-budgeted packing of LLM inputs: count with tiktoken, serialize compactly, share a budget by priority.
+
+Character slicing wastes budget on whitespace, cuts JSON in half and doesn't
+match what the model is billed for. Instead:
+
+  - compact_json() drops indentation and empty fields.
+  - fit_json_to_tokens() shrinks structured data until it fits, trimming the
+    longest lists and strings first, so the result is always valid JSON.
+  - truncate_to_tokens() cuts text on a token boundary with a visible marker.
+  - pack_inputs() splits a total budget between several sources in proportion
+    to their priority; sources that need less than their share give the rest
+    to the others.
+
+If the tiktoken encoding can't be loaded (it is downloaded on first use), token
+counts fall back to an estimate of 4 characters per token.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Union
+
+TRUNCATION_MARKER = " …[truncated]"
+_CHARS_PER_TOKEN = 4
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _get_encoding(encoding_name: str):
+    """tiktoken encoding, or None if unavailable (then lengths are estimated)."""
+    with _encodings_lock:
+        if encoding_name not in _encodings:
+            try:
+                import tiktoken
+                _encodings[encoding_name] = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                print(f"Warning: tiktoken encoding {encoding_name} unavailable, estimating token counts: {e}")
+                _encodings[encoding_name] = None
+        return _encodings[encoding_name]
+
+
+def count_tokens(text: str, encoding_name: str = "o200k_base") -> int:
+    """Number of tokens in text (estimated if tiktoken is unavailable)."""
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = "o200k_base") -> str:
+    """Cut text to at most max_tokens tokens, ending with TRUNCATION_MARKER when cut."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        if len(text) <= max_tokens * _CHARS_PER_TOKEN:
+            return text
+        keep = max(0, max_tokens * _CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+        return text[:keep] + TRUNCATION_MARKER
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - len(encoding.encode(TRUNCATION_MARKER)))
+    return encoding.decode(tokens[:keep]) + TRUNCATION_MARKER
+
+
+def _drop_empty(data: Any) -> Any:
+    if isinstance(data, dict):
+        cleaned = {k: _drop_empty(v) for k, v in data.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, "", [], {})}
+    if isinstance(data, list):
+        return [_drop_empty(v) for v in data if v not in (None, "", [], {})]
+    return data
+
+
+def compact_json(data: Any) -> str:
+    """JSON without indentation or whitespace, with None/empty fields removed."""
+    return json.dumps(_drop_empty(data), ensure_ascii=False, separators=(",", ":"))
+
+
+def _largest(data: Any, path=()):
+    """((size, path) of the biggest shrinkable list, (size, path) of the longest string) in data."""
+    best_list, best_str = (0, None), (0, None)
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        if len(data) > 1:
+            best_list = (len(json.dumps(data, ensure_ascii=False)), path)
+        items = enumerate(data)
+    else:
+        if isinstance(data, str) and len(data) > 40:
+            best_str = (len(data), path)
+        return best_list, best_str
+    for key, value in items:
+        child_list, child_str = _largest(value, path + (key,))
+        best_list = max(best_list, child_list, key=lambda b: b[0])
+        best_str = max(best_str, child_str, key=lambda b: b[0])
+    return best_list, best_str
+
+
+def _get(data: Any, path: tuple) -> Any:
+    for key in path:
+        data = data[key]
+    return data
+
+
+def fit_json_to_tokens(data: Any, max_tokens: int, encoding_name: str = "o200k_base", max_steps: int = 200) -> str:
+    """
+    Compact JSON of data that fits in max_tokens, shrinking the data rather than cutting the text.
+
+    Repeatedly drops the last item of the biggest list or halves the longest string
+    (whichever is larger) until the serialization fits. Falls back to plain token
+    truncation if that isn't enough after max_steps.
+
+    Example:
+        prompt_part = fit_json_to_tokens(channel_profile, 1500)
+    """
+    data = _drop_empty(json.loads(json.dumps(data, ensure_ascii=False)))  # Private copy we can shrink
+    text = compact_json(data)
+    for _ in range(max_steps):
+        if count_tokens(text, encoding_name) <= max_tokens:
+            return text
+        (list_size, list_path), (str_size, str_path) = _largest(data)
+        if list_path is not None and list_size >= str_size:
+            _get(data, list_path).pop()
+        elif str_path is not None:
+            parent, key = _get(data, str_path[:-1]), str_path[-1]
+            value = parent[key]
+            parent[key] = value[: len(value) // 2].rstrip() + "…"
+        else:
+            break
+        text = compact_json(data)
+    return truncate_to_tokens(text, max_tokens, encoding_name)
+
+
+@dataclass
+class InputSource:
+    """One input to pack into a prompt."""
+    name: str
+    content: Union[str, dict, list]
+    """Text, or structured data (serialized with fit_json_to_tokens)."""
+    priority: float = 1.0
+    """Relative share of the budget (> 0); a source with priority 2 gets twice the share of one with 1."""
+
+
+def _render(source: InputSource, max_tokens: int, encoding_name: str) -> str:
+    if isinstance(source.content, str):
+        return truncate_to_tokens(source.content, max_tokens, encoding_name)
+    return fit_json_to_tokens(source.content, max_tokens, encoding_name)
+
+
+def pack_inputs(sources: list[InputSource], total_tokens: int, encoding_name: str = "o200k_base") -> dict[str, str]:
+    """
+    Fit several inputs into a shared token budget, split by priority.
+
+    Each round, every source that still needs tokens gets a share of what's left in
+    proportion to its priority; sources that need less than their share take only
+    what they need and the rest is shared again.
+
+    Args:
+        sources: Inputs to pack (names must be unique).
+        total_tokens: Budget for all inputs together.
+        encoding_name: tiktoken encoding of the target model.
+
+    Returns:
+        {name: text that fits its allocation}
+
+    Example:
+        packed = pack_inputs([
+            InputSource("semantic", analysis, priority=3),
+            InputSource("channel", channel_summary, priority=1),
+        ], total_tokens=6000)
+    """
+    full = {
+        s.name: s.content if isinstance(s.content, str) else compact_json(s.content)
+        for s in sources
+    }
+    needs = {s.name: count_tokens(full[s.name], encoding_name) for s in sources}
+    budgets = {s.name: 0 for s in sources}
+    remaining = total_tokens
+    open_sources = [s for s in sources if needs[s.name] > 0]
+    while open_sources and remaining > 0:
+        total_priority = sum(s.priority for s in open_sources)
+        shares = {s.name: int(remaining * s.priority / total_priority) for s in open_sources}
+        satisfied = [s for s in open_sources if needs[s.name] - budgets[s.name] <= shares[s.name]]
+        if not satisfied:
+            # Nobody fits: everyone gets their share and the budget is used up
+            for s in open_sources:
+                budgets[s.name] += shares[s.name]
+            break
+        for s in satisfied:
+            remaining -= needs[s.name] - budgets[s.name]
+            budgets[s.name] = needs[s.name]
+        satisfied_names = {s.name for s in satisfied}
+        open_sources = [s for s in open_sources if s.name not in satisfied_names]
+
+    return {
+        s.name: full[s.name] if budgets[s.name] >= needs[s.name] else _render(s, budgets[s.name], encoding_name)
+        for s in sources
+    }
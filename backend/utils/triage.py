@@ -0,0 +1,88 @@
+"""
+Cheap triage of a short before semantic analysis: does it need the full forensic prompt?
+
+Scores a video from signals that are already available before Gemini runs:
+
+  - transcript keywords in risk categories (health claims, politics, conspiracy
+    phrasing, finance promises, breaking news)
+  - channel context: AI-generation disclosure, sensational recent titles, or no
+    channel information at all
+  - speech presence (no speech = no spoken claims to check)
+
+Videos scoring at or above the threshold get the "full" tier, everything else the
+"quick" tier. Keywords match whole words/phrases, case-insensitively.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .channel_features import keyword_hits, sensational_titles
+
+
+@dataclass
+class TriageDecision:
+    """Routing decision for one video."""
+    tier: str
+    """Either "full" or "quick"."""
+    score: float
+    reasons: list[str] = field(default_factory=list)
+
+
+def triage_video(
+    channel_context: Optional[dict],
+    transcript: Optional[str],
+    has_speech: Optional[bool],
+    risk_keywords: dict[str, list[str]],
+    ai_disclosure_keywords: list[str],
+    full_threshold: float = 1.0,
+) -> TriageDecision:
+    """
+    Decide between the quick and full semantic analysis tier.
+
+    Args:
+        channel_context: Output of get_lightweight_channel_context() (None if unavailable).
+        transcript: Audio transcript (None if unknown or not ready in time).
+        has_speech: Whether VAD found speech (None if unknown).
+        risk_keywords: {category: [lower-case phrases]}; each category that appears in the
+            transcript adds 1.0 to the score.
+        ai_disclosure_keywords: Phrases in the channel description/keywords that indicate
+            AI-generated content (adds 1.0).
+        full_threshold: Score at which the full tier is used.
+
+    Returns:
+        TriageDecision with the tier, score and human-readable reasons.
+    """
+    score = 0.0
+    reasons = []
+
+    if transcript:
+        text = transcript.lower()
+        for category, keywords in risk_keywords.items():
+            hits = keyword_hits(text, keywords)
+            if hits:
+                score += 1.0
+                reasons.append(f"{category} keywords: {', '.join(hits[:3])}")
+    elif has_speech is False:
+        reasons.append("no speech")
+    else:
+        # Speech (or unknown) but no transcript in time: can't rule out spoken claims
+        score += 0.5
+        reasons.append("transcript unavailable")
+
+    if not channel_context:
+        score += 0.5
+        reasons.append("no channel context")
+    else:
+        about = f"{channel_context.get('description') or ''} {channel_context.get('keywords') or ''}".lower()
+        disclosures = keyword_hits(about, ai_disclosure_keywords)
+        if disclosures:
+            score += 1.0
+            reasons.append(f"channel mentions AI generation: {', '.join(disclosures[:3])}")
+        titles = channel_context.get("recent_titles") or []
+        sensational = sensational_titles(titles)
+        if titles and len(sensational) / len(titles) >= 0.4:
+            score += 0.5
+            reasons.append(f"{len(sensational)}/{len(titles)} sensational recent titles")
+
+    tier = "full" if score >= full_threshold else "quick"
+    return TriageDecision(tier=tier, score=score, reasons=reasons or ["no risk signals"])
@@ -0,0 +1,135 @@
+"""
+Lightweight, CPU-only voice activity detection.
+
+Used as a gate before transcription: shorts that are only music or ambient sound
+don't need a Voxtral call, and a Perplexity search on their (garbage) transcript
+is wasted money. This is a heuristic detector built on NumPy only:
+
+  1. Frame the signal (~30 ms) and compute per-frame energy, the share of energy
+     in the speech band (100-4000 Hz) and spectral flatness.
+  2. A frame is "speech-like" when it is clearly above the noise floor, most of
+     its energy is in the speech band, and it is tonal rather than noisy.
+  3. Speech has syllabic energy modulation (pauses every few hundred ms), music
+     and ambience are mostly sustained. Speech-like frames only count when the
+     surrounding ~1 s window shows enough energy variation.
+
+The speech ratio is the fraction of frames that pass all checks.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .audio import DEFAULT_SAMPLE_RATE, load_audio_samples
+
+# Tuning constants (empirical; see module docstring)
+_SPEECH_BAND_HZ = (100.0, 4000.0)
+_MIN_FRAME_DBFS = -50.0          # Anything quieter is silence
+_NOISE_FLOOR_MARGIN_DB = 6.0     # Frames must be this far above the noise floor
+_MIN_SPEECH_BAND_RATIO = 0.5     # Share of frame energy inside the speech band
+_MAX_SPECTRAL_FLATNESS = 0.5     # 1.0 = white noise, ~0 = pure tone
+_MODULATION_WINDOW_S = 1.0       # Window for the syllabic-modulation check
+_MIN_MODULATION_DB = 3.0         # Std-dev of frame energy inside the window
+
+
+@dataclass
+class SpeechDetectionResult:
+    """Outcome of running VAD on one audio file."""
+    has_speech: bool
+    speech_ratio: float
+    duration_seconds: float
+
+
+def _frame_signal(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Split samples into non-overlapping frames (drops the trailing partial frame)."""
+    n_frames = len(samples) // frame_length
+    return samples[: n_frames * frame_length].reshape(n_frames, frame_length)
+
+
+def speech_frame_mask(
+    samples: np.ndarray,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    frame_ms: int = 30,
+) -> np.ndarray:
+    """
+    Classify each frame of a mono signal as speech (True) or non-speech (False).
+
+    Args:
+        samples: 1-D float array of mono samples in [-1, 1].
+        sample_rate: Sample rate of `samples` in Hz.
+        frame_ms: Frame length in milliseconds.
+
+    Returns:
+        Boolean array with one entry per frame.
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frames = _frame_signal(np.asarray(samples, dtype=np.float32), frame_length)
+    if len(frames) == 0:
+        return np.zeros(0, dtype=bool)
+
+    # Per-frame energy in dBFS and adaptive noise floor
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    energy_db = 20.0 * np.log10(rms + 1e-12)
+    noise_floor_db = np.percentile(energy_db, 10)
+    loud = (energy_db > _MIN_FRAME_DBFS) & (energy_db > noise_floor_db + _NOISE_FLOOR_MARGIN_DB)
+
+    # Spectral features
+    window = np.hanning(frame_length).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2 + 1e-12
+    freqs = np.fft.rfftfreq(frame_length, d=1.0 / sample_rate)
+    in_band = (freqs >= _SPEECH_BAND_HZ[0]) & (freqs <= _SPEECH_BAND_HZ[1])
+    band_ratio = power[:, in_band].sum(axis=1) / power.sum(axis=1)
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+    speech_like = loud & (band_ratio >= _MIN_SPEECH_BAND_RATIO) & (flatness <= _MAX_SPECTRAL_FLATNESS)
+
+    # Syllabic modulation: rolling std-dev of frame energy over ~1 s
+    half_window = max(1, int(_MODULATION_WINDOW_S * 1000 / frame_ms) // 2)
+    modulated = np.zeros(len(frames), dtype=bool)
+    for i in np.flatnonzero(speech_like):
+        lo, hi = max(0, i - half_window), min(len(frames), i + half_window + 1)
+        modulated[i] = np.std(energy_db[lo:hi]) >= _MIN_MODULATION_DB
+
+    return speech_like & modulated
+
+
+def speech_ratio(
+    samples: np.ndarray,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    frame_ms: int = 30,
+) -> float:
+    """Fraction of frames in `samples` classified as speech (0.0 - 1.0)."""
+    mask = speech_frame_mask(samples, sample_rate=sample_rate, frame_ms=frame_ms)
+    if len(mask) == 0:
+        return 0.0
+    return float(mask.mean())
+
+
+def detect_speech(
+    audio_path: str,
+    min_speech_ratio: float,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    frame_ms: int = 30,
+) -> SpeechDetectionResult:
+    """
+    Decode an audio file and decide whether it contains enough speech to transcribe.
+
+    Args:
+        audio_path: Path to the audio file (anything ffmpeg can decode).
+        min_speech_ratio: Minimum fraction of speech frames to count as "has speech".
+        sample_rate: Decode sample rate in Hz.
+        frame_ms: Frame length in milliseconds.
+
+    Returns:
+        SpeechDetectionResult with the decision, speech ratio and audio duration.
+
+    Raises:
+        RuntimeError: If the audio cannot be decoded.
+    """
+    samples = load_audio_samples(audio_path, sample_rate=sample_rate)
+    ratio = speech_ratio(samples, sample_rate=sample_rate, frame_ms=frame_ms)
+    return SpeechDetectionResult(
+        has_speech=ratio >= min_speech_ratio,
+        speech_ratio=ratio,
+        duration_seconds=len(samples) / sample_rate,
+    )
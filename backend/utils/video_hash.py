@@ -0,0 +1,294 @@
+"""
+Perceptual video hashing for spotting reuploads of the same short.
+
+Each clip is reduced to a handful of frames (ffmpeg, ~1 fps, 32x32 grayscale)
+and every frame to a 64-bit DCT perceptual hash (pHash). pHashes survive
+re-encoding, resizing, small crops/overlays and brightness changes, so copies of
+one video reuploaded under new video ids land within a few bits of each other.
+
+VideoDedupIndex keeps the frame hashes of analyzed videos in SQLite (with the
+analysis text) and searches them through an in-memory BK-tree, so a lookup only
+visits hashes that can be within the Hamming distance limit.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+_FRAME_SIZE = 32
+_HASH_SIZE = 8
+_MIN_FRAME_STD = 4.0   # Near-uniform frames (black intro/outro) match everything; skip them
+_EVICT_FRACTION = 0.1  # Share of max_videos dropped at once when the index is full
+
+# Orthonormal DCT-II basis for the frame size
+_n = np.arange(_FRAME_SIZE)
+_DCT = np.cos(np.pi * (2 * _n[None, :] + 1) * _n[:, None] / (2 * _FRAME_SIZE))
+_DCT[0] *= 1 / np.sqrt(2)
+_DCT *= np.sqrt(2 / _FRAME_SIZE)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def sample_video_frames(video_path: str, frames_per_second: float = 1.0, max_frames: int = 60) -> np.ndarray:
+    """
+    Decode evenly spaced frames of a video as 32x32 grayscale images.
+
+    Args:
+        video_path: Path to any file ffmpeg can decode.
+        frames_per_second: Sampling rate.
+        max_frames: Stop after this many frames.
+
+    Returns:
+        uint8 array of shape (n_frames, 32, 32).
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file.
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", video_path,
+            "-vf", f"fps={frames_per_second},scale={_FRAME_SIZE}:{_FRAME_SIZE}:flags=area,format=gray",
+            "-frames:v", str(max_frames),
+            "-f", "rawvideo", "-pix_fmt", "gray",
+            "-",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"Could not decode video {video_path}: {stderr}")
+
+    frame_bytes = _FRAME_SIZE * _FRAME_SIZE
+    n_frames = len(result.stdout) // frame_bytes
+    return np.frombuffer(result.stdout[: n_frames * frame_bytes], dtype=np.uint8).reshape(
+        n_frames, _FRAME_SIZE, _FRAME_SIZE
+    )
+
+
+def perceptual_hash(frame: np.ndarray) -> int:
+    """64-bit pHash of a 32x32 grayscale frame: low-frequency DCT coefficients vs their median."""
+    pixels = np.asarray(frame, dtype=np.float64)
+    coefficients = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    # The DC term only carries overall brightness, keep it out of the threshold
+    bits = coefficients > np.median(coefficients[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def video_phashes(video_path: str, frames_per_second: float = 1.0, max_frames: int = 60) -> list[int]:
+    """
+    Perceptual hashes of the sampled frames of a video, skipping near-uniform frames.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file.
+    """
+    frames = sample_video_frames(video_path, frames_per_second=frames_per_second, max_frames=max_frames)
+    return [perceptual_hash(f) for f in frames if f.std() >= _MIN_FRAME_STD]
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance."""
+
+    def __init__(self):
+        self._root: Optional[list] = None   # [hash, values, {distance: child}]
+        self._size = 0
+
+    def add(self, key: int, value: Any):
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            d = hamming_distance(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> list[tuple[int, Any]]:
+        """All (distance, value) pairs stored within max_distance of key."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming_distance(key, node[0])
+            if d <= max_distance:
+                found.extend((d, value) for value in node[1])
+            # Triangle inequality: only children at distance d +- max_distance can hold matches
+            for child_distance, child in node[2].items():
+                if d - max_distance <= child_distance <= d + max_distance:
+                    stack.append(child)
+        return found
+
+    def __len__(self) -> int:
+        return self._size
+
+
+@dataclass
+class VideoMatch:
+    """An indexed video that looks like the same footage as the query."""
+    video_id: str
+    analysis: str
+    match_ratio: float
+    """Share of frames (of the shorter video) with a near-identical frame in the other."""
+    mean_distance: float
+    """Average Hamming distance of the matched frames (0-64)."""
+
+
+class VideoDedupIndex:
+    """
+    Near-duplicate video index: frame pHashes in SQLite, searched through a BK-tree.
+
+    Example:
+        >>> index = VideoDedupIndex(".cache/video_hashes.sqlite3", max_videos=5000)
+        >>> hashes = video_phashes("videos/abc.mp4")
+        >>> match = index.lookup(hashes)
+        >>> if match is None:
+        ...     index.add("abc", hashes, analysis)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_videos: int,
+        max_frame_distance: int = 10,
+        min_match_ratio: float = 0.6,
+    ):
+        """
+        Args:
+            path: SQLite file to use (created with its parent directory if missing).
+            max_videos: Videos kept in the index; least recently matched videos are evicted.
+            max_frame_distance: Max Hamming distance (of 64 bits) for two frames to count as the same.
+            min_match_ratio: Share of frames that must match, in both videos, for a duplicate.
+        """
+        self.path = str(path)
+        self.max_videos = max_videos
+        self.max_frame_distance = max_frame_distance
+        self.min_match_ratio = min_match_ratio
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " video_id TEXT PRIMARY KEY,"
+            " hashes TEXT NOT NULL,"
+            " analysis TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        self._tree = BKTree()
+        self._frame_counts: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._next_generation = 0
+        self._dead_nodes = 0
+        for video_id, hashes in self._conn.execute("SELECT video_id, hashes FROM videos"):
+            self._insert(video_id, json.loads(hashes))
+
+    def _insert(self, video_id: str, hashes: list[int]):
+        # Tree nodes carry the generation they were added with; older generations are tombstones
+        generation = self._next_generation
+        self._next_generation += 1
+        self._generations[video_id] = generation
+        self._frame_counts[video_id] = len(hashes)
+        for frame_index, h in enumerate(hashes):
+            self._tree.add(h, (video_id, generation, frame_index))
+
+    def _forget(self, video_id: str):
+        """Tombstone a video's tree nodes (BK-trees can't delete)."""
+        self._generations.pop(video_id, None)
+        self._dead_nodes += self._frame_counts.pop(video_id, 0)
+
+    def add(self, video_id: str, hashes: list[int], analysis: str):
+        """Index a video's frame hashes with its analysis (replaces an existing video_id)."""
+        if not hashes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, hashes, analysis, last_access) VALUES (?, ?, ?, ?)",
+                (video_id, json.dumps(hashes), analysis, time.time()),
+            )
+            evicted = self._evict()
+            self._conn.commit()
+            self._forget(video_id)
+            for stale in evicted:
+                self._forget(stale)
+            self._insert(video_id, hashes)
+            # Compact only once tombstones outnumber live nodes: rebuilds stay rare and amortized
+            if self._dead_nodes > sum(self._frame_counts.values()):
+                self._rebuild_tree()
+
+    def lookup(self, hashes: list[int]) -> Optional[VideoMatch]:
+        """
+        Find the indexed video that best matches `hashes`, if it passes min_match_ratio.
+
+        Returns:
+            VideoMatch, or None if no indexed video is a near-duplicate.
+        """
+        if not hashes:
+            return None
+
+        # Per candidate video: which query frames and which of its frames found a partner
+        query_hits = defaultdict(dict)
+        candidate_hits = defaultdict(set)
+        with self._lock:
+            for query_index, h in enumerate(hashes):
+                for distance, (video_id, generation, frame_index) in self._tree.search(h, self.max_frame_distance):
+                    if self._generations.get(video_id) != generation:
+                        continue
+                    best = query_hits[video_id].get(query_index)
+                    if best is None or distance < best:
+                        query_hits[video_id][query_index] = distance
+                    candidate_hits[video_id].add(frame_index)
+            frame_counts = dict(self._frame_counts)
+
+        best_match = None
+        for video_id, hits in query_hits.items():
+            ratio = min(len(hits) / len(hashes), len(candidate_hits[video_id]) / frame_counts[video_id])
+            if ratio >= self.min_match_ratio and (best_match is None or ratio > best_match[1]):
+                best_match = (video_id, ratio, sum(hits.values()) / len(hits))
+        if best_match is None:
+            return None
+
+        video_id, ratio, mean_distance = best_match
+        with self._lock:
+            row = self._conn.execute("SELECT analysis FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE videos SET last_access = ? WHERE video_id = ?", (time.time(), video_id))
+            self._conn.commit()
+        return VideoMatch(video_id=video_id, analysis=row[0], match_ratio=ratio, mean_distance=mean_distance)
+
+    def _evict(self) -> list[str]:
+        """Once over max_videos, drop the least recently used videos down to (1 - _EVICT_FRACTION) of it."""
+        count = self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+        if count <= self.max_videos:
+            return []
+        drop = count - int(self.max_videos * (1 - _EVICT_FRACTION))
+        stale = [row[0] for row in self._conn.execute(
+            "SELECT video_id FROM videos ORDER BY last_access ASC LIMIT ?", (drop,)
+        )]
+        self._conn.executemany("DELETE FROM videos WHERE video_id = ?", [(v,) for v in stale])
+        return stale
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frame_counts)
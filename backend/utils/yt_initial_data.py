@@ -0,0 +1,178 @@
+"""
+Streaming extraction of YouTube's embedded `ytInitialData` JSON from a page response.
+
+Channel pages are several megabytes, with ytInitialData in a <script> tag well
+before the end. Instead of decoding the whole page and running a regex over it,
+InitialDataScanner is fed raw bytes as they arrive:
+
+  1. Find the `ytInitialData` marker (also across chunk boundaries), then the `{`
+     that opens the object.
+  2. Scan the object with a brace/string-aware tokenizer (braces inside JSON
+     strings and escaped quotes don't count), jumping between tokens with
+     regexes so the per-byte work happens in C.
+  3. Stop as soon as the top-level object closes; the caller stops reading.
+  4. While scanning, remember where each top-level value starts and ends, so
+     only the requested top-level keys are passed to json.loads.
+"""
+
+import json
+import re
+import urllib.request
+from typing import Collection, Iterable, Optional
+
+_MARKER = b"ytInitialData"
+_OBJECT_START = re.compile(rb"\s*=\s*\{")
+# Outside strings only brackets and quotes matter
+_TOKEN = re.compile(rb'[{}\[\]"]')
+# Longest run of string content that can't end the string (stops before `"` or a trailing lone `\`)
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+
+
+class InitialDataScanner:
+    """
+    Incremental scanner for the ytInitialData object in an HTML byte stream.
+
+    Example:
+        scanner = InitialDataScanner()
+        for chunk in chunks:
+            if scanner.feed(chunk):
+                break
+        data = scanner.parse(keys=("metadata",))
+    """
+
+    def __init__(self, marker: bytes = _MARKER):
+        self.marker = marker
+        self.bytes_seen = 0
+        self.done = False
+        self._prefix = b""  # Bytes before the object while searching for the marker
+        self._buf = None  # Object bytes once the opening brace was found
+        self._pos = 0
+        self._string_start = None  # Set while inside a string that continues in the next chunk
+        self._depth = 0
+        self._last_key = None
+        self._value_start = None
+        self._spans: dict[str, tuple[int, int]] = {}
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next bytes of the page. Returns True once the object is complete."""
+        if self.done:
+            return True
+        self.bytes_seen += len(chunk)
+        if self._buf is None:
+            data = self._prefix + chunk
+            while True:
+                index = data.find(self.marker)
+                if index < 0:
+                    # Keep enough to match a marker split across chunks
+                    self._prefix = data[-len(self.marker):]
+                    return False
+                start = _OBJECT_START.match(data, index + len(self.marker))
+                if start is not None:
+                    break
+                if len(data) - index < len(self.marker) + 64:
+                    # "= {" may still be on its way
+                    self._prefix = data[index:]
+                    return False
+                # Marker mentioned elsewhere (e.g. in a URL or another script); keep looking after it
+                data = data[index + len(self.marker):]
+            self._buf = bytearray(data[start.end() - 1:])
+            self._prefix = b""
+        else:
+            self._buf += chunk
+        self._scan()
+        return self.done
+
+    def _scan(self):
+        buf = self._buf
+        pos = self._pos
+        while True:
+            if self._string_start is not None:
+                body_end = _STRING_BODY.match(buf, pos).end()
+                if body_end >= len(buf) or buf[body_end] != ord('"'):
+                    # String continues in the next chunk; resume from the last safe position
+                    pos = body_end
+                    break
+                if self._depth == 1:
+                    self._last_key = buf[self._string_start:body_end]
+                self._string_start = None
+                pos = body_end + 1
+                continue
+            token = _TOKEN.search(buf, pos)
+            if token is None:
+                pos = len(buf)
+                break
+            char = buf[token.start()]
+            pos = token.end()
+            if char == ord('"'):
+                self._string_start = pos
+            elif char in b"{[":
+                self._depth += 1
+                if self._depth == 2:
+                    self._value_start = token.start()
+            else:
+                self._depth -= 1
+                if self._depth == 1 and self._last_key is not None:
+                    self._spans[self._last_key.decode("utf-8", errors="replace")] = (self._value_start, pos)
+                    self._last_key = None
+                if self._depth == 0:
+                    del buf[pos:]
+                    self.done = True
+                    break
+        self._pos = pos
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """The complete object's bytes, or None if it hasn't closed yet."""
+        return bytes(self._buf) if self.done else None
+
+    def parse(self, keys: Optional[Collection[str]] = None) -> Optional[dict]:
+        """
+        Decode the object (None if it was not found or is incomplete).
+
+        Args:
+            keys: Top-level keys to decode; others are skipped without parsing.
+                Only object/array values are tracked. If None, decodes everything.
+        """
+        if not self.done:
+            return None
+        if keys is None:
+            return json.loads(self._buf)
+        return {
+            key: json.loads(self._buf[start:end])
+            for key, (start, end) in self._spans.items()
+            if key in keys
+        }
+
+
+def extract_initial_data(chunks: Iterable[bytes], keys: Optional[Collection[str]] = None) -> Optional[dict]:
+    """Feed chunks until ytInitialData closes (the rest is never read) and decode `keys` of it."""
+    scanner = InitialDataScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.parse(keys)
+
+
+def fetch_initial_data(
+    url: str,
+    headers: Optional[dict] = None,
+    keys: Optional[Collection[str]] = None,
+    timeout: Optional[float] = None,
+    chunk_size: int = 64 * 1024,
+) -> Optional[dict]:
+    """
+    Download a YouTube page only up to the end of its ytInitialData and decode it.
+
+    Args:
+        url: Page URL.
+        headers: Request headers (User-Agent, Accept-Language, ...).
+        keys: Top-level keys to decode (see InitialDataScanner.parse).
+        timeout: Socket timeout in seconds (None: no timeout).
+        chunk_size: Bytes read per socket read.
+
+    Returns:
+        Decoded data, or None if the page has no complete ytInitialData.
+    """
+    req = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return extract_initial_data(iter(lambda: resp.read(chunk_size), b""), keys)
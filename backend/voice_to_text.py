@@ -36,13 +36,34 @@ we use the openai library as a plain HTTP client pointed at your own server URL.
 
 import os
 import subprocess
+import threading
 import time
-from typing import Optional
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Sequence, Union
 
 import modal
 
 # Re-export for callers that import from this module
-__all__ = ["app", "voice_to_text", "transcribe", "serve", "clear_client_cache"]
+__all__ = [
+    "app",
+    "voice_to_text",
+    "get_cached_transcript",
+    "transcribe",
+    "transcribe_batch",
+    "BatchTranscriptionResult",
+    "voice_to_text_async",
+    "voice_to_text_chunked",
+    "transcribe_async",
+    "TranscriptionCoalescer",
+    "get_coalescer",
+    "TranscriptionReadiness",
+    "get_readiness_manager",
+    "serve",
+    "clear_client_cache",
+    "aclose_async_clients",
+]
 
 # Import config - will work locally and in Modal after we add it to the image
 from . import config
@@ -90,6 +111,26 @@ app = modal.App(config.MODAL_APP_NAME_VOXTRAL)
 # Client cache to avoid recreating on every call
 _client_cache = {}
 
+# Async clients share one httpx connection pool per (url, timeout), per event loop. Keyed on the
+# loop object itself (weakly): a finished loop's clients go with it, and a new loop that happens
+# to reuse a dead loop's id() never gets a client bound to the closed loop.
+_async_client_cache: "weakref.WeakKeyDictionary[object, dict]" = weakref.WeakKeyDictionary()
+
+# Shared coalescers per (url, language, timeout), see get_coalescer()
+_coalescer_cache = {}
+_coalescer_lock = threading.Lock()
+
+# Persistent transcript cache, created on first use (see _get_transcript_cache)
+_transcript_cache = None
+_transcript_cache_lock = threading.Lock()
+
+# Shared readiness managers per server URL, see get_readiness_manager()
+_readiness_cache = {}
+_readiness_lock = threading.Lock()
+
+# Anything transcribe_batch() accepts as audio: a path, raw bytes, or a binary file object
+AudioSource = Union[str, os.PathLike, bytes, BinaryIO]
+
 
 @app.function(
     image=vllm_image,
@@ -133,36 +174,12 @@ def serve():
     subprocess.Popen(cmd)
 
 
-def voice_to_text(
-    audio_path: str,
-    self_hosted_vllm_url: str,
-    language: Optional[str] = None,
-    timeout: int = 300,
-) -> str:
-    """Call our self-hosted vLLM server (Voxtral on H100). Uses openai lib only as HTTP client.
-    
-    Args:
-        audio_path: Path to the audio file to transcribe.
-        self_hosted_vllm_url: URL of the self-hosted vLLM server.
-        language: ISO language code for transcription (e.g. en, es, fr). Default from config.
-        timeout: Timeout in seconds for API calls (default 300s = 5 minutes).
-    
-    Returns:
-        The transcription text.
-    
-    Note:
-        This uses batch transcription mode for pre-recorded audio files.
-        The target_streaming_delay_ms parameter only applies to streaming mode.
-    """
+def _get_client(self_hosted_vllm_url: str, timeout: int):
+    """Get or create a cached OpenAI client for (url, timeout)."""
     from openai import OpenAI
-    from mistral_common.audio import Audio
-    from mistral_common.protocol.instruct.messages import RawAudio
-    from mistral_common.protocol.transcription.request import TranscriptionRequest
     import httpx
 
-    lang = language if language is not None else config.DEFAULT_TRANSCRIPTION_LANGUAGE
-    
-    # Get or create cached OpenAI client (lightweight, but saves overhead on repeated calls)
+    # Lightweight, but saves overhead on repeated calls
     # OpenAI SDK uses HTTP/1.1 with connection pooling (max 1000 connections by default)
     cache_key = (self_hosted_vllm_url, timeout)
     if cache_key not in _client_cache:
@@ -172,32 +189,48 @@ def voice_to_text(
             timeout=httpx.Timeout(timeout, read=timeout, write=timeout, connect=10.0),
             max_retries=0,
         )
-    client = _client_cache[cache_key]
-    
-    # Use model ID from config (no need to fetch from server every time)
-    model_id = config.VOXTRAL_MODEL_ID
+    return _client_cache[cache_key]
+
+
+def _load_audio(audio_source: AudioSource):
+    """Load a path, raw bytes or binary file-like object into a mistral_common Audio."""
+    from mistral_common.audio import Audio
+
+    if isinstance(audio_source, (str, os.PathLike)):
+        return Audio.from_file(str(audio_source), strict=False)
+    if isinstance(audio_source, (bytes, bytearray, memoryview)):
+        return Audio.from_bytes(bytes(audio_source), strict=False)
+    if hasattr(audio_source, "read"):
+        return Audio.from_bytes(audio_source.read(), strict=False)
+    raise TypeError(f"Unsupported audio source type: {type(audio_source).__name__}")
+
+
+def _build_transcription_request(audio, language: Optional[str]) -> dict:
+    """Build OpenAI-format transcription kwargs for a loaded Audio."""
+    from mistral_common.protocol.instruct.messages import RawAudio
+    from mistral_common.protocol.transcription.request import TranscriptionRequest
+
+    lang = language if language is not None else config.DEFAULT_TRANSCRIPTION_LANGUAGE
 
-    # Load and process audio
-    audio = Audio.from_file(audio_path, strict=False)    
     raw = RawAudio.from_audio(audio)
-    
+
     # Convert to OpenAI format, excluding Mistral-specific parameters
     # Note: target_streaming_delay_ms only applies to streaming mode, not batch transcription
-    req = TranscriptionRequest(
-        model=model_id,
+    return TranscriptionRequest(
+        model=config.VOXTRAL_MODEL_ID,  # From config, no need to fetch from server every time
         audio=raw,
         language=lang,
         temperature=0.0,
     ).to_openai(exclude=("top_p", "seed", "target_streaming_delay_ms"))
 
-    # Send transcription request
-    response = client.audio.transcriptions.create(**req)
-    
+
+def _extract_text(response) -> str:
+    """Pull the transcription text out of a vLLM response (or raise on error)."""
     # Check if the response contains an error
     if hasattr(response, "error") and response.error:
         error_msg = response.error.get("message", "Unknown error")
         raise RuntimeError(f"Transcription failed: {error_msg}. Check Modal logs for details.")
-    
+
     # Extract and return transcription text
     if hasattr(response, "text") and response.text:
         return response.text
@@ -209,11 +242,291 @@ def voice_to_text(
         return str(response) if response else ""
 
 
+def _get_transcript_cache():
+    """The shared persistent transcript cache, or None if disabled."""
+    global _transcript_cache
+    if not config.TRANSCRIPT_CACHE_ENABLED:
+        return None
+    with _transcript_cache_lock:
+        if _transcript_cache is None:
+            from .utils.persistent_cache import PersistentLRUCache
+
+            _transcript_cache = PersistentLRUCache(
+                config.TRANSCRIPT_CACHE_PATH, max_bytes=config.TRANSCRIPT_CACHE_MAX_BYTES
+            )
+    return _transcript_cache
+
+
+def _transcript_cache_key(audio, language: Optional[str]) -> str:
+    """Cache key: hash of the decoded samples + model id + language."""
+    from .utils.audio import audio_content_hash
+
+    lang = language if language is not None else config.DEFAULT_TRANSCRIPTION_LANGUAGE
+    content_hash = audio_content_hash(audio.audio_array, audio.sampling_rate)
+    return f"{config.VOXTRAL_MODEL_ID}|{lang}|{content_hash}"
+
+
+def _lookup_transcript(audio, language: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """Return (cache key, cached text). Both None when the cache is disabled."""
+    cache = _get_transcript_cache()
+    if cache is None:
+        return None, None
+    key = _transcript_cache_key(audio, language)
+    return key, cache.get(key)
+
+
+def _store_transcript(key: Optional[str], text: str):
+    """Store a transcript under a key from _lookup_transcript (empty transcripts are not cached)."""
+    cache = _get_transcript_cache()
+    if cache is not None and key is not None and text:
+        cache.set(key, text)
+
+
+def get_cached_transcript(audio_source: AudioSource, language: Optional[str] = None) -> Optional[str]:
+    """
+    Transcript of this audio from the persistent transcript cache, or None (miss or cache disabled).
+
+    Needs no server, so callers can check it before waiting for a cold transcription
+    server. A miss costs one extra local decode when the audio is then submitted.
+
+    Example:
+        >>> text = get_cached_transcript("audio.mp3")
+        >>> if text is None:
+        ...     text = get_coalescer(url).submit("audio.mp3").result()
+    """
+    if _get_transcript_cache() is None:
+        return None
+    _, cached = _lookup_transcript(_load_audio(audio_source), language)
+    return cached
+
+
+def _describe_source(audio_source: AudioSource, index: int) -> str:
+    """Human-readable label for an audio source (path, or buffer position)."""
+    if isinstance(audio_source, (str, os.PathLike)):
+        return str(audio_source)
+    return f"<buffer {index}>"
+
+
+def voice_to_text(
+    audio_path: str,
+    self_hosted_vllm_url: str,
+    language: Optional[str] = None,
+    timeout: int = 300,
+) -> str:
+    """Call our self-hosted vLLM server (Voxtral on H100). Uses openai lib only as HTTP client.
+    
+    Args:
+        audio_path: Path to the audio file to transcribe.
+        self_hosted_vllm_url: URL of the self-hosted vLLM server.
+        language: ISO language code for transcription (e.g. en, es, fr). Default from config.
+        timeout: Timeout in seconds for API calls (default 300s = 5 minutes).
+    
+    Returns:
+        The transcription text.
+    
+    Note:
+        This uses batch transcription mode for pre-recorded audio files.
+        The target_streaming_delay_ms parameter only applies to streaming mode.
+        Transcripts are cached by audio content (see TRANSCRIPT_CACHE_ENABLED), so the
+        same audio under a different file name or video id is not re-transcribed.
+    """
+    client = _get_client(self_hosted_vllm_url, timeout)
+
+    # Load audio and check the transcript cache before any network call
+    audio = _load_audio(audio_path)
+    cache_key, cached = _lookup_transcript(audio, language)
+    if cached is not None:
+        return cached
+    req = _build_transcription_request(audio, language)
+
+    # Send transcription request
+    response = client.audio.transcriptions.create(**req)
+    text = _extract_text(response)
+    _store_transcript(cache_key, text)
+    return text
+
+
+def voice_to_text_chunked(
+    audio_path: AudioSource,
+    self_hosted_vllm_url: str,
+    language: Optional[str] = None,
+    timeout: int = 300,
+    chunk_seconds: float = config.TRANSCRIPTION_CHUNK_SECONDS,
+    overlap_seconds: float = config.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+    max_concurrency: int = config.TRANSCRIPTION_BATCH_MAX_CONCURRENCY,
+) -> str:
+    """Transcribe long audio as overlapping chunks sent concurrently, then stitch the text.
+    
+    A single request's latency grows linearly with audio length. Splitting at quiet
+    points and sending all chunks at once lets vLLM batch them, so a several-minute
+    clip takes roughly as long as one chunk. Audio no longer than one chunk is sent
+    as a single request, same as voice_to_text().
+    
+    Args:
+        audio_path: Path, raw bytes, or binary file-like object with the audio.
+        self_hosted_vllm_url: URL of the self-hosted vLLM server.
+        language: ISO language code for transcription (e.g. en, es, fr). Default from config.
+        timeout: Timeout in seconds for each chunk request.
+        chunk_seconds: Nominal chunk length in seconds.
+        overlap_seconds: Audio shared by consecutive chunks, in seconds.
+        max_concurrency: Maximum number of chunk requests in flight at once.
+    
+    Returns:
+        The stitched transcription text.
+    """
+    from mistral_common.audio import Audio
+    from .utils.chunking import plan_audio_chunks, stitch_transcripts
+
+    client = _get_client(self_hosted_vllm_url, timeout)
+
+    audio = _load_audio(audio_path)
+    cache_key, cached = _lookup_transcript(audio, language)
+    if cached is not None:
+        return cached
+    bounds = plan_audio_chunks(
+        audio.audio_array,
+        audio.sampling_rate,
+        chunk_seconds=chunk_seconds,
+        overlap_seconds=overlap_seconds,
+        search_seconds=config.TRANSCRIPTION_CHUNK_SPLIT_SEARCH_SECONDS,
+    )
+    if len(bounds) == 1:
+        response = client.audio.transcriptions.create(**_build_transcription_request(audio, language))
+        text = _extract_text(response)
+        _store_transcript(cache_key, text)
+        return text
+
+    # Chunks are re-encoded as WAV (lossless, and always writable by soundfile)
+    requests = [
+        _build_transcription_request(
+            Audio(audio_array=audio.audio_array[start:end], sampling_rate=audio.sampling_rate, format="wav"),
+            language,
+        )
+        for start, end in bounds
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(requests)))) as executor:
+        texts = list(executor.map(
+            lambda req: _extract_text(client.audio.transcriptions.create(**req)),
+            requests,
+        ))
+    duration = len(audio.audio_array) / audio.sampling_rate
+    print(f"[Chunked Transcription] {duration:.1f}s audio in {len(bounds)} chunks, "
+          f"transcribed in {time.perf_counter() - start:.2f}s")
+
+    text = stitch_transcripts(texts)
+    _store_transcript(cache_key, text)
+    return text
+
+
+def _get_async_client(self_hosted_vllm_url: str, timeout: int):
+    """Get or create a cached AsyncOpenAI client backed by a shared httpx connection pool.
+    
+    Clients are cached per event loop: httpx connections can't be shared across loops.
+    Call aclose_async_clients() before a short-lived loop (asyncio.run) ends to close
+    its connection pool; otherwise the pool is only dropped along with the loop.
+    """
+    import asyncio
+    from openai import AsyncOpenAI
+    import httpx
+
+    loop_clients = _async_client_cache.setdefault(asyncio.get_running_loop(), {})
+    cache_key = (self_hosted_vllm_url, timeout)
+    if cache_key not in loop_clients:
+        http2 = config.TRANSCRIPTION_ASYNC_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("Warning: h2 not installed, async transcription client falling back to HTTP/1.1")
+                http2 = False
+
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(timeout, read=timeout, write=timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=config.TRANSCRIPTION_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=config.TRANSCRIPTION_ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.TRANSCRIPTION_ASYNC_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        loop_clients[cache_key] = AsyncOpenAI(
+            api_key="EMPTY",
+            base_url=self_hosted_vllm_url.rstrip("/") + "/v1",
+            http_client=http_client,
+            max_retries=0,
+        )
+    return loop_clients[cache_key]
+
+
+async def voice_to_text_async(
+    audio_path: AudioSource,
+    self_hosted_vllm_url: str,
+    language: Optional[str] = None,
+    timeout: int = 300,
+) -> str:
+    """Async variant of voice_to_text() for keeping many transcriptions in flight from one event loop.
+    
+    Uses AsyncOpenAI over a shared (HTTP/2 when available) connection pool, so a pending
+    transcription holds no thread while the upload and inference run. Audio decoding is
+    CPU-bound and runs in a worker thread to keep the event loop responsive.
+    
+    Args:
+        audio_path: Path, raw bytes, or binary file-like object with the audio.
+        self_hosted_vllm_url: URL of the self-hosted vLLM server.
+        language: ISO language code for transcription (e.g. en, es, fr). Default from config.
+        timeout: Timeout in seconds for API calls (default 300s = 5 minutes).
+    
+    Returns:
+        The transcription text.
+    
+    Example:
+        >>> texts = await asyncio.gather(*(voice_to_text_async(p, url) for p in paths))
+    """
+    import asyncio
+
+    client = _get_async_client(self_hosted_vllm_url, timeout)
+
+    def prepare():
+        audio = _load_audio(audio_path)
+        cache_key, cached = _lookup_transcript(audio, language)
+        if cached is not None:
+            return cache_key, cached, None
+        return cache_key, None, _build_transcription_request(audio, language)
+
+    # Load audio, check the cache and build the request off the event loop
+    cache_key, cached, req = await asyncio.to_thread(prepare)
+    if cached is not None:
+        return cached
+
+    # Send transcription request
+    response = await client.audio.transcriptions.create(**req)
+    text = _extract_text(response)
+    await asyncio.to_thread(_store_transcript, cache_key, text)
+    return text
+
+
+def _resolve_server_url(url: Optional[str]) -> str:
+    """Explicit url, else TRANSCRIPTION_URL from .env; raise if neither is set."""
+    server_url = url or config.get_transcription_url()
+    
+    if not server_url:
+        raise RuntimeError(
+            "No transcription server URL configured. Either:\n"
+            "1. Set TRANSCRIPTION_URL in your .env file, or\n"
+            "2. Pass url parameter explicitly, or\n"
+            "3. Deploy the server: modal deploy backend/voice_to_text.py"
+        )
+    return server_url
+
+
 def transcribe(
     audio_path: str,
     language: Optional[str] = None,
     url: Optional[str] = None,
     timeout: int = 300,
+    chunked: bool = False,
 ) -> str:
     """
     Convenience function for transcribing audio with automatic URL handling.
@@ -225,6 +538,8 @@ def transcribe(
         language: Optional ISO language code (e.g., "en", "es", "fr"). Auto-detects if None.
         url: Optional server URL. If None, uses TRANSCRIPTION_URL from .env.
         timeout: Timeout in seconds for API calls (default 300s = 5 minutes).
+        chunked: Split long audio into overlapping chunks transcribed in parallel
+            (see voice_to_text_chunked). Recommended for audio longer than ~1 minute.
     
     Returns:
         The transcription text.
@@ -242,19 +557,493 @@ def transcribe(
         
         >>> # With custom URL
         >>> text = transcribe("audio.mp3", url="https://my-server.modal.run")
+        
+        >>> # Long audio (full-length shorts, watch URLs)
+        >>> text = transcribe("long_audio.mp3", chunked=True)
     """
-    # Get URL from config if not provided
-    server_url = url or config.get_transcription_url()
+    server_url = _resolve_server_url(url)
+    if chunked:
+        return voice_to_text_chunked(audio_path, server_url, language=language, timeout=timeout)
+    return voice_to_text(audio_path, server_url, language=language, timeout=timeout)
+
+
+async def transcribe_async(
+    audio_path: AudioSource,
+    language: Optional[str] = None,
+    url: Optional[str] = None,
+    timeout: int = 300,
+) -> str:
+    """
+    Async convenience wrapper around voice_to_text_async() with automatic URL handling.
     
-    if not server_url:
-        raise RuntimeError(
-            "No transcription server URL configured. Either:\n"
-            "1. Set TRANSCRIPTION_URL in your .env file, or\n"
-            "2. Pass url parameter explicitly, or\n"
-            "3. Deploy the server: modal deploy backend/voice_to_text.py"
+    Args:
+        audio_path: Path, raw bytes, or binary file-like object with the audio.
+        language: Optional ISO language code (e.g., "en", "es", "fr").
+        url: Optional server URL. If None, uses TRANSCRIPTION_URL from .env.
+        timeout: Timeout in seconds for API calls (default 300s = 5 minutes).
+    
+    Returns:
+        The transcription text.
+    
+    Raises:
+        RuntimeError: If no server URL is configured and none provided.
+    """
+    server_url = _resolve_server_url(url)
+    return await voice_to_text_async(audio_path, server_url, language=language, timeout=timeout)
+
+
+@dataclass
+class BatchTranscriptionResult:
+    """Result for one item of transcribe_batch(). Exactly one of text/error is set."""
+    index: int
+    source: str
+    text: Optional[str]
+    error: Optional[str]
+    latency_seconds: float
+    """Wall time for this item: audio loading + request, in seconds."""
+    request_seconds: float
+    """Time spent in the HTTP request alone (0.0 if the item failed before sending)."""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def transcribe_batch(
+    audio_sources: Sequence[AudioSource],
+    language: Optional[str] = None,
+    url: Optional[str] = None,
+    timeout: int = 300,
+    max_concurrency: int = config.TRANSCRIPTION_BATCH_MAX_CONCURRENCY,
+) -> list[BatchTranscriptionResult]:
+    """
+    Transcribe many audio files or buffers concurrently, so they land in the same vLLM batch.
+    
+    All audio is loaded and encoded first, then the requests are released together
+    (bounded by max_concurrency). Sending them back-to-back, rather than as each file
+    finishes decoding, is what lets vLLM's continuous batching group them.
+    
+    A failure in one item never fails the batch: it is reported in that item's `error`.
+    
+    Args:
+        audio_sources: Paths, raw bytes, or binary file-like objects.
+        language: Optional ISO language code applied to every item. Default from config.
+        url: Optional server URL. If None, uses TRANSCRIPTION_URL from .env.
+        timeout: Timeout in seconds for each API call.
+        max_concurrency: Maximum number of requests in flight at once.
+    
+    Returns:
+        One BatchTranscriptionResult per input, in input order.
+    
+    Raises:
+        RuntimeError: If no server URL is configured and none provided.
+    
+    Example:
+        >>> results = transcribe_batch(["a.mp3", "b.mp3", open("c.mp3", "rb").read()])
+        >>> for r in results:
+        >>>     print(r.source, r.latency_seconds, r.text if r.ok else r.error)
+    """
+    server_url = _resolve_server_url(url)
+    client = _get_client(server_url, timeout)
+    n = len(audio_sources)
+    if n == 0:
+        return []
+
+    prepared: list[Optional[dict]] = [None] * n
+    cache_keys: list[Optional[str]] = [None] * n
+    cached: list[Optional[str]] = [None] * n
+    load_errors: list[Optional[str]] = [None] * n
+    load_seconds = [0.0] * n
+    results: list[Optional[BatchTranscriptionResult]] = [None] * n
+
+    def prepare(i: int):
+        start = time.perf_counter()
+        try:
+            audio = _load_audio(audio_sources[i])
+            cache_keys[i], cached[i] = _lookup_transcript(audio, language)
+            if cached[i] is None:
+                prepared[i] = _build_transcription_request(audio, language)
+        except Exception as e:
+            load_errors[i] = f"{type(e).__name__}: {e}"
+        load_seconds[i] = time.perf_counter() - start
+
+    def send(i: int):
+        start = time.perf_counter()
+        text, error = None, None
+        try:
+            text = _extract_text(client.audio.transcriptions.create(**prepared[i]))
+            _store_transcript(cache_keys[i], text)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        request_seconds = time.perf_counter() - start
+        results[i] = BatchTranscriptionResult(
+            index=i,
+            source=_describe_source(audio_sources[i], i),
+            text=text,
+            error=error,
+            latency_seconds=load_seconds[i] + request_seconds,
+            request_seconds=request_seconds,
         )
+
+    workers = max(1, min(max_concurrency, n))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Phase 1: decode/encode all audio (CPU-bound, off the network path)
+        list(executor.map(prepare, range(n)))
+
+        # Phase 2: release all requests together (cache hits don't need sending)
+        to_send = [i for i in range(n) if load_errors[i] is None and cached[i] is None]
+        list(executor.map(send, to_send))
+
+    for i in range(n):
+        if cached[i] is not None:
+            results[i] = BatchTranscriptionResult(
+                index=i,
+                source=_describe_source(audio_sources[i], i),
+                text=cached[i],
+                error=None,
+                latency_seconds=load_seconds[i],
+                request_seconds=0.0,
+            )
+        elif load_errors[i] is not None:
+            results[i] = BatchTranscriptionResult(
+                index=i,
+                source=_describe_source(audio_sources[i], i),
+                text=None,
+                error=load_errors[i],
+                latency_seconds=load_seconds[i],
+                request_seconds=0.0,
+            )
+
+    ok = sum(1 for r in results if r.ok)
+    print(f"[Transcribe Batch] {ok}/{n} succeeded (max_concurrency={workers})")
+    return results
+
+
+class TranscriptionCoalescer:
+    """
+    Client-side micro-batching for transcription requests that trickle in one by one.
     
-    return voice_to_text(audio_path, server_url, language=language, timeout=timeout)
+    vLLM's continuous batching only helps when requests arrive close together, but the
+    pipeline submits them as downloads finish. The coalescer holds submitted requests for
+    a short window (or until max_batch_size are waiting) and then releases them together.
+    Audio is decoded at submit time (cache hits resolve immediately) and encoded
+    while the request is held, so releasing costs nothing extra.
+    
+    The window adapts to observed server latency: it is TRANSCRIPTION_COALESCE_LATENCY_FRACTION
+    of the latency EWMA, clamped to [min_window_ms, max_window_ms]. Slow server = more worth
+    waiting for a batch; fast server = release sooner.
+    
+    Example:
+        >>> coalescer = get_coalescer(url)
+        >>> future = coalescer.submit("audio.mp3")
+        >>> text = future.result()
+    """
+
+    def __init__(
+        self,
+        url: str,
+        language: Optional[str] = None,
+        timeout: int = 300,
+        window_ms: float = config.TRANSCRIPTION_COALESCE_WINDOW_MS,
+        max_batch_size: int = config.TRANSCRIPTION_COALESCE_MAX_BATCH_SIZE,
+        min_window_ms: float = config.TRANSCRIPTION_COALESCE_MIN_WINDOW_MS,
+        max_window_ms: float = config.TRANSCRIPTION_COALESCE_MAX_WINDOW_MS,
+        adaptive: bool = True,
+    ):
+        self.url = url
+        self.language = language
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.min_window = min_window_ms / 1000.0
+        self.max_window = max_window_ms / 1000.0
+        self.adaptive = adaptive
+        self.window_seconds = window_ms / 1000.0
+        self.latency_ewma: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._pending: list[tuple[Future, Future]] = []  # (prepared request, caller future)
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._prepare_executor = ThreadPoolExecutor(max_workers=4)
+        self._dispatch_executor = ThreadPoolExecutor(max_workers=2)
+        self._send_executor = ThreadPoolExecutor(max_workers=config.TRANSCRIPTION_BATCH_MAX_CONCURRENCY)
+
+    def submit(self, audio_source: AudioSource) -> Future:
+        """
+        Queue one transcription. Returns a Future resolving to the text (or raising).
+        
+        Raises:
+            RuntimeError: If the coalescer has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("TranscriptionCoalescer is closed")
+        caller_future: Future = Future()
+        audio = _load_audio(audio_source)
+        cache_key, cached = _lookup_transcript(audio, self.language)
+        if cached is not None:
+            caller_future.set_result(cached)
+            return caller_future
+
+        prepared = self._prepare_executor.submit(
+            lambda: (cache_key, _build_transcription_request(audio, self.language))
+        )
+        with self._lock:
+            self._pending.append((prepared, caller_future))
+            if len(self._pending) >= self.max_batch_size:
+                self._release_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return caller_future
+
+    def flush(self):
+        """Release all held requests now."""
+        with self._lock:
+            self._release_locked()
+
+    def close(self):
+        """
+        Flush held requests and shut down worker threads (waits for in-flight requests).
+        
+        Safe to call more than once. A closed coalescer is dropped from the shared
+        registry, so get_coalescer() hands out a fresh one afterwards.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._release_locked()
+        with _coalescer_lock:
+            for key, coalescer in list(_coalescer_cache.items()):
+                if coalescer is self:
+                    del _coalescer_cache[key]
+        self._prepare_executor.shutdown(wait=True)
+        self._dispatch_executor.shutdown(wait=True)
+        self._send_executor.shutdown(wait=True)
+
+    def _release_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._dispatch_executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list[tuple[Future, Future]]):
+        # Wait until every held request is encoded, then send them back-to-back
+        wait([prepared for prepared, _ in batch])
+        print(f"[Coalescer] Releasing {len(batch)} request(s) (window {self.window_seconds * 1000:.0f}ms)")
+        for prepared, caller_future in batch:
+            error = prepared.exception()
+            if error is not None:
+                caller_future.set_exception(error)
+            else:
+                cache_key, request = prepared.result()
+                self._send_executor.submit(self._send, cache_key, request, caller_future)
+
+    def _send(self, cache_key: Optional[str], request: dict, caller_future: Future):
+        client = _get_client(self.url, self.timeout)
+        start = time.perf_counter()
+        try:
+            text = _extract_text(client.audio.transcriptions.create(**request))
+        except Exception as e:
+            caller_future.set_exception(e)
+            return
+        self._observe_latency(time.perf_counter() - start)
+        _store_transcript(cache_key, text)
+        caller_future.set_result(text)
+
+    def _observe_latency(self, seconds: float):
+        with self._lock:
+            if self.latency_ewma is None:
+                self.latency_ewma = seconds
+            else:
+                self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * seconds
+            if self.adaptive:
+                target = config.TRANSCRIPTION_COALESCE_LATENCY_FRACTION * self.latency_ewma
+                self.window_seconds = min(self.max_window, max(self.min_window, target))
+
+
+def get_coalescer(
+    url: Optional[str] = None,
+    language: Optional[str] = None,
+    timeout: int = 300,
+) -> TranscriptionCoalescer:
+    """
+    Get the shared TranscriptionCoalescer for (url, language, timeout), creating it if needed.
+    
+    Everyone transcribing against the same server should share one coalescer, otherwise
+    their requests are held in separate windows and can't be released together.
+    
+    Raises:
+        RuntimeError: If no server URL is configured and none provided.
+    """
+    server_url = _resolve_server_url(url)
+    cache_key = (server_url, language, timeout)
+    with _coalescer_lock:
+        if cache_key not in _coalescer_cache:
+            _coalescer_cache[cache_key] = TranscriptionCoalescer(server_url, language=language, timeout=timeout)
+        return _coalescer_cache[cache_key]
+
+
+class TranscriptionReadiness:
+    """
+    Background readiness manager and warm-keeper for the transcription server.
+    
+    A background thread probes /health and /v1/models and tracks the server state:
+      - "unknown": not probed yet
+      - "cold":    /health not responding (container starting / scaled to zero)
+      - "loading": HTTP up, model not loaded yet
+      - "warm":    model listed by /v1/models, ready for requests
+    
+    While not warm it probes every TRANSCRIPTION_READINESS_COLD_PROBE_SECONDS; once warm it
+    sends keep-warm probes every TRANSCRIPTION_KEEP_WARM_INTERVAL_SECONDS (optionally with a
+    tiny transcription) so the container doesn't scale down between bursts.
+    
+    Callers block with wait_until_ready() or await wait_until_ready_async() instead of
+    sending a request into a 1-2 minute cold start.
+    
+    Example:
+        >>> readiness = get_readiness_manager(url)
+        >>> if readiness.wait_until_ready(timeout=20):
+        >>>     text = voice_to_text("audio.mp3", url)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cold_probe_interval: float = config.TRANSCRIPTION_READINESS_COLD_PROBE_SECONDS,
+        keep_warm_interval: float = config.TRANSCRIPTION_KEEP_WARM_INTERVAL_SECONDS,
+        keep_warm_transcribe: bool = config.TRANSCRIPTION_KEEP_WARM_TRANSCRIBE,
+        cold_after_failures: int = config.TRANSCRIPTION_READINESS_COLD_AFTER_FAILURES,
+    ):
+        self.url = url.rstrip("/")
+        self.cold_probe_interval = cold_probe_interval
+        self.keep_warm_interval = keep_warm_interval
+        self.keep_warm_transcribe = keep_warm_transcribe
+        self.cold_after_failures = cold_after_failures
+        self.consecutive_failures = 0
+        self.state = "unknown"
+        self.model_id: Optional[str] = None
+        self.last_probe: Optional[float] = None
+
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self) -> "TranscriptionReadiness":
+        """Start the background probe thread (no-op if already running)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="transcription-readiness", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background probe thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=config.VOXTRAL_HEALTH_CHECK_TIMEOUT_SECONDS * 2)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the server is warm. Returns False if `timeout` seconds pass first."""
+        return self._ready.wait(timeout)
+
+    async def wait_until_ready_async(self, timeout: Optional[float] = None) -> bool:
+        """Async variant of wait_until_ready() (waits in a worker thread)."""
+        import asyncio
+
+        return await asyncio.to_thread(self._ready.wait, timeout)
+
+    def probe(self) -> str:
+        """Probe /health then /v1/models once, update the state and return it."""
+        import json
+        import urllib.request
+
+        previous = self.state
+        self.last_probe = time.time()
+        try:
+            urllib.request.urlopen(f"{self.url}/health", timeout=config.VOXTRAL_HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            self.consecutive_failures += 1
+            if previous == "warm" and self.consecutive_failures < self.cold_after_failures:
+                # One blip on a warm server: keep accepting requests until it fails repeatedly
+                print(
+                    f"[Transcription Readiness] {self.url}: probe failed "
+                    f"({self.consecutive_failures}/{self.cold_after_failures}), staying warm: {e}"
+                )
+                return self.state
+            self._set_state("cold", previous)
+            return self.state
+        self.consecutive_failures = 0
+
+        try:
+            with urllib.request.urlopen(
+                f"{self.url}/v1/models", timeout=config.VOXTRAL_HEALTH_CHECK_TIMEOUT_SECONDS
+            ) as response:
+                data = json.loads(response.read())
+        except Exception:
+            data = {}
+        if data.get("data"):
+            self.model_id = data["data"][0].get("id")
+            self._set_state("warm", previous)
+        else:
+            self._set_state("loading", previous)
+        return self.state
+
+    def _set_state(self, state: str, previous: str):
+        self.state = state
+        if state == "warm":
+            self._ready.set()
+        else:
+            self._ready.clear()
+        if state != previous:
+            detail = f" (model {self.model_id})" if state == "warm" else ""
+            print(f"[Transcription Readiness] {self.url}: {previous} -> {state}{detail}")
+
+    def _keep_warm_transcription(self):
+        """Send a 1s silent clip through the model so the inference path stays hot."""
+        import numpy as np
+        from mistral_common.audio import Audio
+
+        silence = Audio(audio_array=np.zeros(16000, dtype=np.float32), sampling_rate=16000, format="wav")
+        try:
+            _get_client(self.url, 60).audio.transcriptions.create(
+                **_build_transcription_request(silence, None)
+            )
+        except Exception as e:
+            print(f"[Transcription Readiness] Keep-warm transcription failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            state = self.probe()
+            if state == "warm":
+                if self.keep_warm_transcribe:
+                    self._keep_warm_transcription()
+                interval = self.keep_warm_interval
+            else:
+                interval = self.cold_probe_interval
+            self._stop.wait(interval)
+
+
+def get_readiness_manager(url: Optional[str] = None, start: bool = True) -> TranscriptionReadiness:
+    """
+    Get the shared TranscriptionReadiness for a server URL (started by default).
+    
+    Raises:
+        RuntimeError: If no server URL is configured and none provided.
+    """
+    server_url = _resolve_server_url(url)
+    with _readiness_lock:
+        if server_url not in _readiness_cache:
+            _readiness_cache[server_url] = TranscriptionReadiness(server_url)
+        manager = _readiness_cache[server_url]
+    return manager.start() if start else manager
 
 
 def clear_client_cache():
@@ -263,12 +1052,23 @@ def clear_client_cache():
     
     Useful for debugging or if you need to force recreation of clients
     (e.g., after changing server URLs or network configuration).
+    Async clients are dropped too; use aclose_async_clients() from inside
+    the event loop to also close their connection pools cleanly.
     
     Example:
         >>> from backend import clear_client_cache
         >>> clear_client_cache()
     """
     _client_cache.clear()
+    _async_client_cache.clear()
+
+
+async def aclose_async_clients():
+    """Close the async clients created on the running event loop and drop them from the cache."""
+    import asyncio
+
+    for client in _async_client_cache.pop(asyncio.get_running_loop(), {}).values():
+        await client.close()
 
 
 @app.local_entrypoint()
@@ -292,52 +1092,19 @@ def main(
         print("No URL provided; starting Modal server (this may take several minutes)...")
         self_hosted_url = serve.get_web_url()
         # Wait for vLLM to be ready (model load can take 2–5+ min)
-        import urllib.request
-        import json
-        
         print("Waiting for server to be ready...")
-        health_ready = False
-        models_ready = False
-        
-        for i in range(config.VOXTRAL_HEALTH_CHECK_RETRIES):
-            # Check health endpoint
-            if not health_ready:
-                try:
-                    urllib.request.urlopen(
-                        f"{self_hosted_url}/health",
-                        timeout=config.VOXTRAL_HEALTH_CHECK_TIMEOUT_SECONDS,
-                    )
-                    health_ready = True
-                    print("✓ Health endpoint responding")
-                except Exception:
-                    if i == 0:
-                        print("  Waiting for health endpoint...")
-                    time.sleep(config.VOXTRAL_HEALTH_CHECK_INTERVAL_SECONDS)
-                    continue
-            
-            # Check if models are loaded
-            if health_ready and not models_ready:
-                try:
-                    response = urllib.request.urlopen(
-                        f"{self_hosted_url}/v1/models",
-                        timeout=config.VOXTRAL_HEALTH_CHECK_TIMEOUT_SECONDS,
-                    )
-                    data = json.loads(response.read())
-                    if data.get("data") and len(data["data"]) > 0:
-                        models_ready = True
-                        print(f"✓ Model loaded: {data['data'][0]['id']}")
-                        print(f"Server ready at {self_hosted_url}")
-                        break
-                    else:
-                        print("  Model still loading...")
-                except Exception as e:
-                    print(f"  Model not ready yet... ({e})")
-                
-                time.sleep(config.VOXTRAL_HEALTH_CHECK_INTERVAL_SECONDS)
-        
-        if not models_ready:
+        readiness = TranscriptionReadiness(
+            self_hosted_url,
+            cold_probe_interval=config.VOXTRAL_HEALTH_CHECK_INTERVAL_SECONDS,
+        ).start()
+        max_wait = config.VOXTRAL_HEALTH_CHECK_RETRIES * config.VOXTRAL_HEALTH_CHECK_INTERVAL_SECONDS
+        if readiness.wait_until_ready(timeout=max_wait):
+            print(f"✓ Model loaded: {readiness.model_id}")
+            print(f"Server ready at {self_hosted_url}")
+        else:
             print("⚠ Server did not fully load model in time.")
             print("You can still try transcription, but it may take longer or timeout.")
+        readiness.stop()
 
     if not audio_path:
         print("Usage: modal run voice_to_text.py --audio-path /path/to/audio.mp3")
@@ -0,0 +1,177 @@
+"""
+Media profile benchmark: upload + analysis latency and token usage per preset.
+
+For every preset in GEMINI_MEDIA_PROFILES (or --profiles), runs the Gemini semantic
+analysis on each video --repeats times and reports bytes sent, time spent
+preparing (ffmpeg), uploading/processing and generating, plus prompt tokens.
+Savings are relative to the first profile (default "original").
+
+With --tokens-only, no analysis is generated: the prepared clip is sent to
+count_tokens instead, which measures token savings for free.
+
+Usage (from repo root, needs GEMINI_API_KEY / GOOGLE_API_KEY and ffmpeg):
+    python tests/benchmark_media_profiles.py videos/abc.mp4 videos/def.mp4 --output media.json
+    python tests/benchmark_media_profiles.py videos/abc.mp4 --profiles original low --tokens-only
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Allow importing the server modules when run as a script from any folder
+_root_dir = Path(__file__).resolve().parent.parent
+_server_dir = _root_dir / "backend" / "server"
+if str(_server_dir) not in sys.path:
+    sys.path.insert(0, str(_server_dir))
+
+load_dotenv(_root_dir / ".env")
+
+import semantic_analysis_real
+from config import GEMINI_MEDIA_PROFILES, GEMINI_MODEL_VIDEO
+from google import genai
+from google.genai import types
+from utils.media import apply_media_profile
+
+
+def count_prompt_tokens(client, video_path: str, profile_name: str) -> dict:
+    """Prepare the clip and count its tokens without generating (upload-free for inline sizes)."""
+    profile = semantic_analysis_real.get_media_profile(profile_name)
+    start = time.perf_counter()
+    prepared = apply_media_profile(video_path, profile, output_dir=str(Path(video_path).parent / "media_profiles"))
+    prepare_seconds = time.perf_counter() - start
+    part = semantic_analysis_real._inline_video_part(Path(prepared), profile)
+    config = None
+    if profile.media_resolution is not None:
+        config = types.CountTokensConfig(generation_config=types.GenerationConfig(media_resolution=profile.media_resolution))
+    result = client.models.count_tokens(model=GEMINI_MODEL_VIDEO, contents=[part], config=config)
+    return {
+        "bytes_sent": os.path.getsize(prepared),
+        "prepare_seconds": prepare_seconds,
+        "prompt_tokens": result.total_tokens,
+    }
+
+
+def run_profile(video_paths: list[str], profile_name: str, repeats: int, api_key: str, client=None) -> dict:
+    """Benchmark one preset over all videos. Pass a client to only count tokens."""
+    samples = []
+    for video_path in video_paths:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            try:
+                if client is not None:
+                    sample = count_prompt_tokens(client, video_path, profile_name)
+                else:
+                    result = semantic_analysis_real.analyze_video_detailed(
+                        video_path, api_key=api_key, media_profile=profile_name
+                    )
+                    sample = {
+                        "bytes_sent": result.bytes_sent,
+                        "prepare_seconds": result.prepare_seconds,
+                        "upload_seconds": result.upload_seconds,
+                        "generate_seconds": result.generate_seconds,
+                        "prompt_tokens": result.prompt_tokens,
+                        "total_tokens": result.total_tokens,
+                    }
+                sample["error"] = None
+            except Exception as e:
+                sample = {"error": f"{type(e).__name__}: {e}"}
+            sample["video"] = video_path
+            sample["latency_seconds"] = time.perf_counter() - start
+            samples.append(sample)
+
+    ok = [s for s in samples if s["error"] is None]
+    mean = lambda key: float(np.mean([s[key] for s in ok if s.get(key) is not None])) if any(
+        s.get(key) is not None for s in ok
+    ) else None
+    latencies = [s["latency_seconds"] for s in ok]
+    return {
+        "profile": profile_name,
+        "settings": GEMINI_MEDIA_PROFILES[profile_name],
+        "successful": len(ok),
+        "runs": len(samples),
+        "mean_bytes_sent": mean("bytes_sent"),
+        "mean_prepare_seconds": mean("prepare_seconds"),
+        "mean_upload_seconds": mean("upload_seconds"),
+        "mean_generate_seconds": mean("generate_seconds"),
+        "mean_prompt_tokens": mean("prompt_tokens"),
+        "latency_p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "latency_p95": float(np.percentile(latencies, 95)) if latencies else None,
+        "samples": samples,
+    }
+
+
+def add_savings(results: list[dict]):
+    """Percent saved vs the first profile, for tokens, bytes and p50 latency."""
+    baseline = results[0]
+    saved = lambda key, r: (
+        100.0 * (baseline[key] - r[key]) / baseline[key] if baseline[key] and r[key] is not None else None
+    )
+    for r in results:
+        r["tokens_saved_pct"] = saved("mean_prompt_tokens", r)
+        r["bytes_saved_pct"] = saved("mean_bytes_sent", r)
+        r["latency_saved_pct"] = saved("latency_p50", r)
+
+
+def print_table(results: list[dict]):
+    header = f"{'profile':>10} {'ok':>5} {'KB':>8} {'tokens':>8} {'prep':>6} {'upload':>7} {'gen':>6} {'p50':>6} {'tok -%':>7} {'p50 -%':>7}"
+    print(header)
+    print("-" * len(header))
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    for r in results:
+        kb = r["mean_bytes_sent"] / 1024 if r["mean_bytes_sent"] is not None else None
+        print(
+            f"{r['profile']:>10} {r['successful']:>2}/{r['runs']:<2} {fmt(kb, '8.0f')} "
+            f"{fmt(r['mean_prompt_tokens'], '8.0f')} {fmt(r['mean_prepare_seconds'], '6.2f')} "
+            f"{fmt(r['mean_upload_seconds'], '7.2f')} {fmt(r['mean_generate_seconds'], '6.2f')} "
+            f"{fmt(r['latency_p50'], '6.2f')} {fmt(r['tokens_saved_pct'], '7.1f')} {fmt(r['latency_saved_pct'], '7.1f')}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="+", help="Video files to analyze")
+    parser.add_argument("--profiles", nargs="+", default=list(GEMINI_MEDIA_PROFILES),
+                        choices=list(GEMINI_MEDIA_PROFILES), help="Presets to compare (first is the baseline)")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per video and profile")
+    parser.add_argument("--tokens-only", action="store_true", help="Only count tokens, don't generate analyses")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        print("GEMINI_API_KEY or GOOGLE_API_KEY not set")
+        return
+
+    client = genai.Client(api_key=api_key) if args.tokens_only else None
+    results = []
+    for profile_name in args.profiles:
+        print(f"Running profile {profile_name} on {len(args.videos)} video(s) ...")
+        results.append(run_profile(args.videos, profile_name, args.repeats, api_key, client))
+    add_savings(results)
+
+    print()
+    print_table(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model": GEMINI_MODEL_VIDEO,
+            "tokens_only": args.tokens_only,
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "profiles": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
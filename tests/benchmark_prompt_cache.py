@@ -0,0 +1,137 @@
+"""
+Prompt cache benchmark: time-to-first-token and input tokens per video, cached vs uncached.
+
+Runs the Gemini semantic analysis on each video with the static prompt sent inline
+and with it served from Gemini context caching (alternating, so both see the same
+conditions), and reports per mode:
+
+  - TTFT p50/p95 (request sent -> first streamed chunk)
+  - mean prompt tokens, of which cached, and the uncached remainder that is
+    processed (and billed) at the full input rate
+
+Usage (from repo root, needs GEMINI_API_KEY / GOOGLE_API_KEY):
+    python tests/benchmark_prompt_cache.py videos/abc.mp4 videos/def.mp4 --repeats 3 --output cache.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Allow importing the server modules when run as a script from any folder
+_root_dir = Path(__file__).resolve().parent.parent
+_server_dir = _root_dir / "backend" / "server"
+if str(_server_dir) not in sys.path:
+    sys.path.insert(0, str(_server_dir))
+
+load_dotenv(_root_dir / ".env")
+
+import semantic_analysis_real
+from config import GEMINI_MODEL_VIDEO
+
+MODES = {"uncached": False, "cached": True}
+
+
+def summarize(samples: list[dict]) -> dict:
+    ok = [s for s in samples if s["error"] is None]
+    values = lambda key: [s[key] for s in ok if s.get(key) is not None]
+    mean = lambda key: float(np.mean(values(key))) if values(key) else None
+    pct = lambda key, q: float(np.percentile(values(key), q)) if values(key) else None
+    summary = {
+        "successful": len(ok),
+        "runs": len(samples),
+        "ttft_p50": pct("ttft_seconds", 50),
+        "ttft_p95": pct("ttft_seconds", 95),
+        "generate_p50": pct("generate_seconds", 50),
+        "mean_prompt_tokens": mean("prompt_tokens"),
+        "mean_cached_tokens": mean("cached_tokens"),
+    }
+    if summary["mean_prompt_tokens"] is not None:
+        summary["mean_uncached_tokens"] = summary["mean_prompt_tokens"] - (summary["mean_cached_tokens"] or 0.0)
+    else:
+        summary["mean_uncached_tokens"] = None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="+", help="Video files to analyze")
+    parser.add_argument("--repeats", type=int, default=2, help="Runs per video and mode")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        print("GEMINI_API_KEY or GOOGLE_API_KEY not set")
+        return
+
+    samples = {mode: [] for mode in MODES}
+    for video_path in args.videos:
+        for repeat in range(args.repeats):
+            # Alternate which mode goes first so neither always gets the warmer connection
+            order = list(MODES) if repeat % 2 == 0 else list(reversed(MODES))
+            for mode in order:
+                print(f"Running {mode} on {video_path} ({repeat + 1}/{args.repeats}) ...")
+                try:
+                    result = semantic_analysis_real.analyze_video_detailed(
+                        video_path, api_key=api_key, use_prompt_cache=MODES[mode]
+                    )
+                    sample = {
+                        "ttft_seconds": result.ttft_seconds,
+                        "generate_seconds": result.generate_seconds,
+                        "prompt_tokens": result.prompt_tokens,
+                        "cached_tokens": result.cached_tokens,
+                        "error": None,
+                    }
+                except Exception as e:
+                    sample = {"error": f"{type(e).__name__}: {e}"}
+                sample["video"] = video_path
+                samples[mode].append(sample)
+
+    summaries = {mode: summarize(samples[mode]) for mode in MODES}
+    base, cached = summaries["uncached"], summaries["cached"]
+    reduction = lambda key: (
+        100.0 * (base[key] - cached[key]) / base[key] if base[key] and cached[key] is not None else None
+    )
+    savings = {
+        "ttft_p50_reduction_pct": reduction("ttft_p50"),
+        "uncached_input_tokens_reduction_pct": reduction("mean_uncached_tokens"),
+    }
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    print()
+    header = f"{'mode':>9} {'ok':>5} {'ttft p50':>9} {'ttft p95':>9} {'prompt':>8} {'cached':>8} {'uncached':>9}"
+    print(header)
+    print("-" * len(header))
+    for mode, r in summaries.items():
+        print(
+            f"{mode:>9} {r['successful']:>2}/{r['runs']:<2} {fmt(r['ttft_p50'], '9.2f')} {fmt(r['ttft_p95'], '9.2f')} "
+            f"{fmt(r['mean_prompt_tokens'], '8.0f')} {fmt(r['mean_cached_tokens'], '8.0f')} "
+            f"{fmt(r['mean_uncached_tokens'], '9.0f')}"
+        )
+    print(f"\nTTFT p50 reduction: {fmt(savings['ttft_p50_reduction_pct'], '.1f')}%  "
+          f"uncached input tokens reduction: {fmt(savings['uncached_input_tokens_reduction_pct'], '.1f')}%")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model": GEMINI_MODEL_VIDEO,
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "summaries": summaries,
+        "savings": savings,
+        "samples": samples,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
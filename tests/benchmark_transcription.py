@@ -0,0 +1,317 @@
+"""
+Transcription benchmark suite: latency percentiles, throughput and batch efficiency.
+
+Sweeps concurrency levels, arrival patterns and audio lengths against a transcription
+endpoint and writes machine-readable JSON so runs can be compared over time.
+
+Arrival patterns:
+  - burst:     all requests arrive at t=0
+  - poisson:   exponential inter-arrival times at --rate requests/second
+  - staggered: fixed --stagger-ms between requests
+
+Per run it reports p50/p95/p99 latency, throughput and an estimate of how many
+requests were co-batched, from how much the requests' lifetimes overlap (a request
+can only share a vLLM batch with requests in flight alongside it). Against the
+local stand-in server the exact batch sizes from its /stats endpoint are reported
+as well.
+
+Usage (from repo root):
+    # Against a local stand-in (started and stopped automatically)
+    python tests/benchmark_transcription.py --stand-in --output bench.json
+
+    # Against the deployed server (TRANSCRIPTION_URL from .env, or --url)
+    python tests/benchmark_transcription.py --concurrency 1 8 32 --patterns burst poisson
+
+    # Compare two result files
+    python tests/benchmark_transcription.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing backend when run as a script from any folder
+_root_dir = Path(__file__).resolve().parent.parent
+if str(_root_dir) not in sys.path:
+    sys.path.insert(0, str(_root_dir))
+
+from backend import config, voice_to_text
+
+STAND_IN_SCRIPT = _root_dir / "backend" / "server" / "dummy_transcription_server.py"
+SAMPLE_RATE = 16000
+
+
+def make_test_audio(seconds: float, directory: str) -> str:
+    """Write a synthetic speech-like WAV of the given length (no test data needed)."""
+    import soundfile as sf
+
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 10))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    path = os.path.join(directory, f"bench_{seconds:g}s.wav")
+    sf.write(path, (0.2 * voice * syllables).astype(np.float32), SAMPLE_RATE)
+    return path
+
+
+def arrival_offsets(pattern: str, n: int, rate: float, stagger_ms: float, seed: int) -> list[float]:
+    """Arrival time (seconds from run start) of each of n requests."""
+    if pattern == "burst":
+        return [0.0] * n
+    if pattern == "staggered":
+        return [i * stagger_ms / 1000.0 for i in range(n)]
+    if pattern == "poisson":
+        rng = np.random.default_rng(seed)
+        return list(np.concatenate([[0.0], np.cumsum(rng.exponential(1.0 / rate, n - 1))]))
+    raise ValueError(f"Unknown arrival pattern: {pattern}")
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    return float(np.percentile(values, q)) if values else None
+
+
+def estimate_cobatching(records: list[dict]) -> float | None:
+    """
+    Mean number of requests (including itself) that overlap each request for at least
+    half of the shorter of the two request lifetimes.
+
+    Client-side timings can't tell batching from queueing, so this is an upper bound
+    on co-batching; it is exact for requests that are all served by one batch.
+    """
+    if not records:
+        return None
+    counts = []
+    for r in records:
+        count = 0
+        for o in records:
+            overlap = min(r["end"], o["end"]) - max(r["start"], o["start"])
+            shorter = min(r["end"] - r["start"], o["end"] - o["start"])
+            if shorter <= 0 or overlap >= 0.5 * shorter:
+                count += 1
+        counts.append(count)
+    return float(np.mean(counts))
+
+
+def fetch_stand_in_stats(url: str) -> dict | None:
+    """Batch history from the stand-in server, or None for a real vLLM server."""
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/stats", timeout=5) as resp:
+            return json.loads(resp.read())
+    except Exception:
+        return None
+
+
+def reset_stand_in_stats(url: str):
+    try:
+        req = urllib.request.Request(f"{url.rstrip('/')}/stats/reset", method="POST")
+        urllib.request.urlopen(req, timeout=5)
+    except Exception:
+        pass
+
+
+def run_once(
+    url: str,
+    audio_path: str,
+    audio_seconds: float,
+    concurrency: int,
+    pattern: str,
+    num_requests: int,
+    rate: float,
+    stagger_ms: float,
+    timeout: int,
+    seed: int,
+) -> dict:
+    """Run one (concurrency, pattern, audio length) cell of the sweep."""
+    offsets = arrival_offsets(pattern, num_requests, rate, stagger_ms, seed)
+    records: list[dict] = []
+    reset_stand_in_stats(url)
+
+    def make_request(i: int) -> dict:
+        start = time.perf_counter()
+        try:
+            voice_to_text(audio_path, url, timeout=timeout)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {"index": i, "start": start, "end": time.perf_counter(), "error": error}
+
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for i, offset in enumerate(offsets):
+            delay = run_start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(make_request, i))
+        records = [f.result() for f in futures]
+    wall = time.perf_counter() - run_start
+
+    ok = [r for r in records if r["error"] is None]
+    latencies = [r["end"] - r["start"] for r in ok]
+    result = {
+        "concurrency": concurrency,
+        "pattern": pattern,
+        "audio_seconds": audio_seconds,
+        "num_requests": num_requests,
+        "successful": len(ok),
+        "failed": len(records) - len(ok),
+        "errors": sorted({r["error"] for r in records if r["error"]})[:5],
+        "wall_seconds": wall,
+        "throughput_rps": len(ok) / wall if wall > 0 else None,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_mean": float(np.mean(latencies)) if latencies else None,
+        "estimated_cobatched": estimate_cobatching(records),
+    }
+
+    stats = fetch_stand_in_stats(url)
+    if stats and stats.get("batches"):
+        sizes = [b["size"] for b in stats["batches"]]
+        result["server_batches"] = len(sizes)
+        result["server_mean_batch_size"] = float(np.mean(sizes))
+        result["server_max_batch_size"] = max(sizes)
+    return result
+
+
+def start_stand_in(extra_args: list[str]) -> tuple[subprocess.Popen, str]:
+    """Launch the local stand-in server on a free port and wait until it is healthy."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [sys.executable, str(STAND_IN_SCRIPT), "--host", "127.0.0.1", "--port", str(port), *extra_args],
+        cwd=str(STAND_IN_SCRIPT.parent),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1)
+            return proc, url
+        except Exception:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Stand-in transcription server did not start")
+
+
+def print_table(runs: list[dict]):
+    header = f"{'conc':>5} {'pattern':>10} {'audio':>6} {'ok':>5} {'p50':>7} {'p95':>7} {'p99':>7} {'rps':>7} {'cobatch':>8} {'srv batch':>9}"
+    print(header)
+    print("-" * len(header))
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+    for r in runs:
+        print(
+            f"{r['concurrency']:>5} {r['pattern']:>10} {r['audio_seconds']:>5g}s "
+            f"{r['successful']:>2}/{r['num_requests']:<2} "
+            f"{fmt(r['latency_p50'], '7.2f')} {fmt(r['latency_p95'], '7.2f')} {fmt(r['latency_p99'], '7.2f')} "
+            f"{fmt(r['throughput_rps'], '7.2f')} {fmt(r['estimated_cobatched'], '8.1f')} "
+            f"{fmt(r.get('server_mean_batch_size'), '9.1f')}"
+        )
+
+
+def compare(old_path: str, new_path: str):
+    """Print p50/p95/throughput deltas between two benchmark JSON files."""
+    key = lambda r: (r["concurrency"], r["pattern"], r["audio_seconds"])
+    old = {key(r): r for r in json.loads(Path(old_path).read_text())["runs"]}
+    new = {key(r): r for r in json.loads(Path(new_path).read_text())["runs"]}
+    print(f"{'conc':>5} {'pattern':>10} {'audio':>6} {'p50 Δ%':>8} {'p95 Δ%':>8} {'rps Δ%':>8}")
+    delta = lambda a, b: f"{100.0 * (b - a) / a:+8.1f}" if a and b is not None else f"{'-':>8}"
+    for k in sorted(old.keys() & new.keys()):
+        o, n = old[k], new[k]
+        print(f"{k[0]:>5} {k[1]:>10} {k[2]:>5g}s "
+              f"{delta(o['latency_p50'], n['latency_p50'])} {delta(o['latency_p95'], n['latency_p95'])} "
+              f"{delta(o['throughput_rps'], n['throughput_rps'])}")
+
+
+def main():
+    # Every request must reach the server: repeats of the same audio would otherwise be cache hits
+    config.TRANSCRIPT_CACHE_ENABLED = False
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Transcription server URL (default: TRANSCRIPTION_URL)")
+    parser.add_argument("--stand-in", action="store_true", help="Start the local stand-in server and benchmark it")
+    parser.add_argument("--stand-in-args", default="", help='Extra stand-in CLI args, e.g. "--batch-window-ms 100"')
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--patterns", nargs="+", default=["burst", "poisson", "staggered"],
+                        choices=["burst", "poisson", "staggered"])
+    parser.add_argument("--audio-seconds", type=float, nargs="+", default=[5.0, 30.0])
+    parser.add_argument("--audio-file", default=None, help="Use this file instead of synthetic audio")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per run")
+    parser.add_argument("--rate", type=float, default=4.0, help="Poisson arrival rate (requests/second)")
+    parser.add_argument("--stagger-ms", type=float, default=100.0, help="Gap between staggered arrivals")
+    parser.add_argument("--timeout", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    stand_in = None
+    if args.stand_in:
+        stand_in, url = start_stand_in(args.stand_in_args.split())
+        print(f"Started stand-in server at {url}")
+    else:
+        url = args.url or config.get_transcription_url()
+        if not url:
+            print("No TRANSCRIPTION_URL set. Pass --url or --stand-in.")
+            return
+
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            if args.audio_file:
+                import soundfile as sf
+                audio = [(args.audio_file, sf.info(args.audio_file).duration)]
+            else:
+                audio = [(make_test_audio(s, tmp), s) for s in args.audio_seconds]
+
+            for audio_path, audio_seconds in audio:
+                for concurrency in args.concurrency:
+                    for pattern in args.patterns:
+                        print(f"Running: concurrency={concurrency} pattern={pattern} audio={audio_seconds:g}s ...")
+                        runs.append(run_once(
+                            url, audio_path, audio_seconds, concurrency, pattern,
+                            args.requests, args.rate, args.stagger_ms, args.timeout, args.seed,
+                        ))
+    finally:
+        if stand_in is not None:
+            stand_in.terminate()
+            stand_in.wait()
+
+    print()
+    print_table(runs)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "url": url,
+            "stand_in": args.stand_in,
+            "stand_in_args": args.stand_in_args,
+            "model": config.VOXTRAL_MODEL_ID,
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        "runs": runs,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+ytInitialData extraction benchmark: regex over the decoded page vs the streaming scanner.
+
+Runs both extractors on recorded channel about pages and reports per fixture:
+
+  - regex:  decode the whole page, `var ytInitialData\\s*=\\s*({.*?});\\s*</script>`, json.loads
+  - stream: feed 64 KB chunks to InitialDataScanner, stop when the object closes,
+            decode only the keys scrape_channel_about() uses
+
+plus how much of each page the streaming path had to read. Both must yield the
+same values for the decoded keys.
+
+Record fixtures first (network needed), then benchmark them offline:
+    python tests/benchmark_yt_initial_data.py --record https://www.youtube.com/@SomeChannel --fixtures-dir tests/fixtures/channel_pages
+    python tests/benchmark_yt_initial_data.py tests/fixtures/channel_pages/*.html --output ytdata.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Allow importing the backend modules when run as a script from any folder
+_root_dir = Path(__file__).resolve().parent.parent
+_backend_dir = _root_dir / "backend"
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.yt_initial_data import InitialDataScanner
+
+ABOUT_PAGE_KEYS = ("metadata", "onResponseReceivedEndpoints")
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+CHUNK_SIZE = 64 * 1024
+
+
+def record(channel_urls: list[str], fixtures_dir: Path):
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    for channel_url in channel_urls:
+        about_url = channel_url.rstrip("/") + "/about"
+        with urllib.request.urlopen(urllib.request.Request(about_url, headers=HEADERS), timeout=30) as resp:
+            html = resp.read()
+        name = re.sub(r"[^A-Za-z0-9_-]+", "_", channel_url.rstrip("/").rsplit("/", 1)[-1]) or "channel"
+        path = fixtures_dir / f"{name}.html"
+        path.write_bytes(html)
+        print(f"Recorded {about_url} -> {path} ({len(html) / 1024:.0f} KB)")
+
+
+def extract_regex(page: bytes) -> dict:
+    match = re.search(r"var ytInitialData\s*=\s*({.*?});\s*</script>", page.decode("utf-8"))
+    return json.loads(match.group(1)) if match else None
+
+
+def extract_stream(page: bytes) -> tuple[dict, int]:
+    scanner = InitialDataScanner()
+    for i in range(0, len(page), CHUNK_SIZE):
+        if scanner.feed(page[i:i + CHUNK_SIZE]):
+            break
+    return scanner.parse(keys=ABOUT_PAGE_KEYS), scanner.bytes_seen
+
+
+def run_fixture(path: Path, repeats: int) -> dict:
+    page = path.read_bytes()
+    regex_times, stream_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        regex_data = extract_regex(page)
+        regex_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        stream_data, bytes_read = extract_stream(page)
+        stream_times.append(time.perf_counter() - start)
+
+    same = regex_data is not None and stream_data is not None and all(
+        regex_data.get(k) == stream_data.get(k) for k in ABOUT_PAGE_KEYS
+    )
+    return {
+        "fixture": str(path),
+        "page_bytes": len(page),
+        "bytes_read": bytes_read,
+        "read_pct": 100.0 * bytes_read / len(page) if page else None,
+        "regex_p50": float(np.percentile(regex_times, 50)),
+        "stream_p50": float(np.percentile(stream_times, 50)),
+        "same_result": same,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", help="Recorded about-page HTML files")
+    parser.add_argument("--record", nargs="+", metavar="CHANNEL_URL", help="Download about pages as fixtures instead")
+    parser.add_argument("--fixtures-dir", default="tests/fixtures/channel_pages", help="Where --record saves pages")
+    parser.add_argument("--repeats", type=int, default=20, help="Runs per fixture and extractor")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, Path(args.fixtures_dir))
+        return
+    if not args.fixtures:
+        parser.error("pass recorded fixtures, or --record channel URLs first")
+
+    results = []
+    for fixture in args.fixtures:
+        print(f"Running {fixture} ...")
+        results.append(run_fixture(Path(fixture), args.repeats))
+
+    print()
+    header = f"{'fixture':>30} {'KB':>7} {'read %':>7} {'regex ms':>9} {'stream ms':>10} {'speedup':>8} {'same':>5}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        speedup = r["regex_p50"] / r["stream_p50"] if r["stream_p50"] else float("nan")
+        print(
+            f"{Path(r['fixture']).name[-30:]:>30} {r['page_bytes'] / 1024:7.0f} {r['read_pct']:7.1f} "
+            f"{r['regex_p50'] * 1000:9.2f} {r['stream_p50'] * 1000:10.2f} {speedup:8.2f} {str(r['same_result']):>5}"
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "chunk_size": CHUNK_SIZE,
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "fixtures": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,15 @@ This simulates your real-world scenario: multiple services/threads calling
 transcribe() independently in rapid succession (not pre-batched).
 
 vLLM will automatically batch these if they arrive close together!
+
+For reproducible numbers (latency percentiles, throughput, co-batching estimates
+across concurrency levels and arrival patterns, written as JSON) use
+tests/benchmark_transcription.py instead.
 """
 
 import time
 import threading
-from backend import transcribe, config
+from backend import transcribe, transcribe_batch, config
 
 
 def simulate_rapid_requests(delay_between_requests: float = 0.0):
@@ -200,6 +204,45 @@ def simulate_rapid_requests(delay_between_requests: float = 0.0):
     return results
 
 
+def simulate_batch_request(num_requests: int = 8):
+    """
+    Send the same workload through transcribe_batch() instead of hand-rolled threads.
+    
+    transcribe_batch() loads all audio first, then releases every request together,
+    so they should all land in the same vLLM batch window.
+    """
+    url = config.get_transcription_url()
+    if not url:
+        print("No TRANSCRIPTION_URL set. Deploy server first:")
+        return
+    
+    test_file = "test_data/test_audio_2.mp3"
+    
+    start = time.perf_counter()
+    results = transcribe_batch([test_file] * num_requests, url=url)
+    total_time = time.perf_counter() - start
+    
+    print()
+    print("=" * 80)
+    print("BATCH RESULTS")
+    print("=" * 80)
+    for r in results:
+        status = f"✓ {len(r.text)} chars" if r.ok else f"✗ {r.error}"
+        print(f"  Request {r.index + 1}: {r.latency_seconds:.2f}s "
+              f"(request {r.request_seconds:.2f}s) {status}")
+    
+    successful = [r for r in results if r.ok]
+    print()
+    print(f"Total time: {total_time:.2f}s")
+    print(f"Successful: {len(successful)}/{num_requests}")
+    if successful:
+        sequential = sum(r.request_seconds for r in successful)
+        print(f"Sum of request times: {sequential:.2f}s "
+              f"({sequential / total_time:.1f}x speedup vs. sequential)")
+    print()
+    return results
+
+
 def compare_delays():
     """Compare different request delays to find optimal batching."""
     
@@ -238,9 +281,14 @@ def compare_delays():
 
 if __name__ == "__main__":
     import sys
+
+    # Every request must reach the server: repeats of the same audio would otherwise be cache hits
+    config.TRANSCRIPT_CACHE_ENABLED = False
     
     if len(sys.argv) > 1 and sys.argv[1] == "compare":
         compare_delays()
+    elif len(sys.argv) > 1 and sys.argv[1] == "batch":
+        simulate_batch_request()
     else:
         # Default: simulate rapid requests with no delay
         simulate_rapid_requests(delay_between_requests=0.0)
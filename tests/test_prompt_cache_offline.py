@@ -0,0 +1,163 @@
+"""
+Gemini prompt cache checks that run without the API: create, renew, fallback and in-flight sharing.
+
+    python -m pytest tests/test_prompt_cache_offline.py
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+# Allow importing the server modules when run from any folder
+_server_dir = Path(__file__).resolve().parent.parent / "backend" / "server"
+if str(_server_dir) not in sys.path:
+    sys.path.insert(0, str(_server_dir))
+
+from google.genai import errors
+
+import semantic_analysis_real
+from semantic_analysis_real import GeminiPromptCache
+
+PROMPT = "word " * 400  # 400-500 tokens, between the minimums used below
+
+
+class _FakeCaches:
+    """Stands in for client.caches; counts calls and fails on demand."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = []
+        self.create_error = None
+        self.update_error = None
+        self.create_gate = None
+
+    def create(self, model, config):
+        if self.create_gate is not None:
+            self.create_gate.wait(timeout=5)
+        if self.create_error is not None:
+            raise self.create_error
+        self.created += 1
+        return SimpleNamespace(name=f"cachedContents/{self.created}")
+
+    def update(self, name, config):
+        if self.update_error is not None:
+            raise self.update_error
+        self.updated.append(name)
+
+
+def _client():
+    return SimpleNamespace(caches=_FakeCaches())
+
+
+def _cache(**kwargs) -> GeminiPromptCache:
+    kwargs.setdefault("min_tokens", 100)
+    return GeminiPromptCache(ttl_seconds=3600, renew_before_seconds=300, retry_after_seconds=600, **kwargs)
+
+
+def _rejected() -> errors.ClientError:
+    return errors.ClientError(400, {"error": {"message": "Cached content is too small", "status": "INVALID_ARGUMENT"}})
+
+
+def _clock(monkeypatch, start: float = 1000.0):
+    now = [start]
+    monkeypatch.setattr(semantic_analysis_real.time, "time", lambda: now[0])
+    return now
+
+
+def test_creates_once_and_reuses(monkeypatch):
+    _clock(monkeypatch)
+    client, cache = _client(), _cache()
+
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+    assert client.caches.created == 1
+    assert cache.get(client, "gemini", PROMPT + "other") == "cachedContents/2"
+
+
+def test_prompt_under_minimum_is_never_sent(monkeypatch):
+    _clock(monkeypatch)
+    client, cache = _client(), _cache(min_tokens=1024)
+
+    assert cache.get(client, "gemini", PROMPT) is None
+    assert cache.get(client, "gemini", PROMPT) is None
+    assert client.caches.created == 0
+
+
+def test_renews_near_expiry_and_recreates_if_renewal_fails(monkeypatch):
+    now = _clock(monkeypatch)
+    client, cache = _client(), _cache()
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+
+    now[0] += 3600 - 100  # Inside renew_before_seconds
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+    assert client.caches.updated == ["cachedContents/1"]
+
+    now[0] += 3600 - 100
+    client.caches.update_error = errors.ClientError(404, {"error": {"message": "not found"}})
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/2"
+
+
+def test_rejected_create_is_not_retried(monkeypatch):
+    now = _clock(monkeypatch)
+    client, cache = _client(), _cache()
+    client.caches.create_error = _rejected()
+
+    assert cache.get(client, "gemini", PROMPT) is None
+    client.caches.create_error = None
+    now[0] += 10 * 3600
+    assert cache.get(client, "gemini", PROMPT) is None
+    assert client.caches.created == 0
+
+
+def test_transient_create_failure_is_retried_later(monkeypatch):
+    now = _clock(monkeypatch)
+    client, cache = _client(), _cache()
+    client.caches.create_error = errors.ClientError(429, {"error": {"message": "quota"}})
+
+    assert cache.get(client, "gemini", PROMPT) is None
+    client.caches.create_error = None
+    now[0] += 60
+    assert cache.get(client, "gemini", PROMPT) is None  # Still backing off
+    now[0] += 600
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+
+
+def test_concurrent_callers_share_one_create(monkeypatch):
+    _clock(monkeypatch)
+    client, cache = _client(), _cache()
+    client.caches.create_gate = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get, client, "gemini", PROMPT) for _ in range(4)]
+        client.caches.create_gate.set()
+        names = [f.result(timeout=5) for f in futures]
+
+    assert names == ["cachedContents/1"] * 4
+    assert client.caches.created == 1
+
+
+def test_callers_keep_live_entry_while_it_renews(monkeypatch):
+    now = _clock(monkeypatch)
+    client, cache = _client(), _cache()
+    assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"
+    now[0] += 3600 - 100
+
+    renewing, release = threading.Event(), threading.Event()
+    def slow_update(name, config):
+        renewing.set()
+        release.wait(timeout=5)
+    client.caches.update = slow_update
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        owner = executor.submit(cache.get, client, "gemini", PROMPT)
+        assert renewing.wait(timeout=5)
+        assert cache.get(client, "gemini", PROMPT) == "cachedContents/1"  # Doesn't wait for the update
+        release.set()
+        assert owner.result(timeout=5) == "cachedContents/1"
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
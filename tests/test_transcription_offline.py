@@ -0,0 +1,254 @@
+"""
+Transcription client checks that run without a server: readiness state, the transcript cache,
+batching and coalescing.
+
+    python -m pytest tests/test_transcription_offline.py
+"""
+
+import asyncio
+import gc
+import importlib
+import time
+import urllib.request
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend import config
+
+# backend re-exports the voice_to_text function under the module's name
+vtt = importlib.import_module("backend.voice_to_text")
+
+
+class _Response:
+    def __init__(self, body: bytes = b""):
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _fake_urlopen(health_ok: bool):
+    def urlopen(url, timeout=None):
+        if url.endswith("/health"):
+            if not health_ok:
+                raise TimeoutError("timed out")
+            return _Response()
+        return _Response(b'{"data": [{"id": "voxtral"}]}')
+    return urlopen
+
+
+def _fake_server(monkeypatch, create):
+    """Route transcription requests to `create(request)`; each request carries its source name."""
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(
+        create=lambda **req: SimpleNamespace(text=create(req), error=None),
+    )))
+    monkeypatch.setattr(vtt, "_get_client", lambda url, timeout: client)
+    monkeypatch.setattr(vtt, "_load_audio", lambda source: source)
+    monkeypatch.setattr(vtt, "_build_transcription_request", lambda audio, language: {"source": audio})
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_ENABLED", False)
+
+
+def test_single_failed_probe_keeps_warm_server_ready(monkeypatch):
+    readiness = vtt.TranscriptionReadiness("http://fake-server", cold_after_failures=3)
+
+    monkeypatch.setattr(urllib.request, "urlopen", _fake_urlopen(health_ok=True))
+    assert readiness.probe() == "warm"
+
+    monkeypatch.setattr(urllib.request, "urlopen", _fake_urlopen(health_ok=False))
+    assert readiness.probe() == "warm"
+    assert readiness.wait_until_ready(timeout=0)  # The pipeline does not block on the blip
+
+    readiness.probe()
+    assert readiness.probe() == "cold"
+    assert not readiness.wait_until_ready(timeout=0)
+
+    monkeypatch.setattr(urllib.request, "urlopen", _fake_urlopen(health_ok=True))
+    assert readiness.probe() == "warm"
+    assert readiness.consecutive_failures == 0
+
+
+def test_cache_disabled_call_reaches_server(monkeypatch, tmp_path):
+    requests = []
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(
+        create=lambda **req: requests.append(req) or SimpleNamespace(text="hello", error=None),
+    )))
+    audio = SimpleNamespace(audio_array=np.zeros(16000, dtype=np.float32), sampling_rate=16000)
+    monkeypatch.setattr(vtt, "_get_client", lambda url, timeout: client)
+    monkeypatch.setattr(vtt, "_load_audio", lambda source: audio)
+    monkeypatch.setattr(vtt, "_build_transcription_request", lambda audio, language: {"model": "fake"})
+    monkeypatch.setattr(vtt, "_transcript_cache", None)
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_PATH", tmp_path / "transcripts.sqlite3")
+
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_ENABLED", True)
+    assert vtt.voice_to_text("clip.wav", "http://fake-server") == "hello"
+    assert vtt.voice_to_text("clip.wav", "http://fake-server") == "hello"
+    assert len(requests) == 1  # Second call was a cache hit
+
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_ENABLED", False)
+    assert vtt.voice_to_text("clip.wav", "http://fake-server") == "hello"
+    assert len(requests) == 2
+
+
+def test_cached_transcript_needs_no_server(monkeypatch, tmp_path):
+    audio = SimpleNamespace(audio_array=np.ones(16000, dtype=np.float32) * 0.1, sampling_rate=16000)
+    monkeypatch.setattr(vtt, "_load_audio", lambda source: audio)
+    monkeypatch.setattr(vtt, "_transcript_cache", None)
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_PATH", tmp_path / "transcripts.sqlite3")
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_ENABLED", True)
+
+    assert vtt.get_cached_transcript("clip.wav") is None
+    key, _ = vtt._lookup_transcript(audio, None)
+    vtt._store_transcript(key, "cached words")
+    assert vtt.get_cached_transcript("clip.wav") == "cached words"
+
+    monkeypatch.setattr(config, "TRANSCRIPT_CACHE_ENABLED", False)
+    assert vtt.get_cached_transcript("clip.wav") is None
+
+
+def test_async_clients_are_per_loop_and_closed(monkeypatch):
+    monkeypatch.setattr(vtt, "_async_client_cache", type(vtt._async_client_cache)())
+
+    async def get_twice():
+        first = vtt._get_async_client("http://fake-server", 30)
+        assert vtt._get_async_client("http://fake-server", 30) is first
+        return first
+
+    async def get_and_close():
+        client = vtt._get_async_client("http://fake-server", 30)
+        await vtt.aclose_async_clients()
+        return client
+
+    first = asyncio.run(get_twice())
+    gc.collect()
+    assert len(vtt._async_client_cache) == 0  # Dropped with its loop
+    assert asyncio.run(get_twice()) is not first
+
+    closed = asyncio.run(get_and_close())
+    assert closed.is_closed()
+    assert len(vtt._async_client_cache) == 0
+
+
+def test_batch_results_keep_input_order_and_per_item_errors(monkeypatch):
+    def create(req):
+        if req["source"] == "bad.wav":
+            raise ConnectionError("server went away")
+        time.sleep(0.05 if req["source"] == "a.wav" else 0)  # First item finishes last
+        return f"text of {req['source']}"
+    _fake_server(monkeypatch, create)
+
+    real_load = vtt._load_audio
+    def load(source):
+        if source == "missing.wav":
+            raise FileNotFoundError(source)
+        return real_load(source)
+    monkeypatch.setattr(vtt, "_load_audio", load)
+
+    sources = ["a.wav", "bad.wav", "missing.wav", "b.wav"]
+    results = vtt.transcribe_batch(sources, url="http://fake-server", max_concurrency=4)
+
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert [r.text for r in results] == ["text of a.wav", None, None, "text of b.wav"]
+    assert [r.ok for r in results] == [True, False, False, True]
+    assert "ConnectionError" in results[1].error
+    assert "FileNotFoundError" in results[2].error
+    assert results[2].request_seconds == 0.0
+
+
+def _coalescer(**kwargs):
+    return vtt.TranscriptionCoalescer("http://fake-server", adaptive=False, **kwargs)
+
+
+def test_coalescer_releases_after_window(monkeypatch):
+    sent = []
+    _fake_server(monkeypatch, lambda req: sent.append(req["source"]) or req["source"].upper())
+    coalescer = _coalescer(window_ms=100, max_batch_size=10)
+    try:
+        futures = [coalescer.submit("a"), coalescer.submit("b")]
+        time.sleep(0.03)
+        assert sent == []  # Still held in the window
+        assert [f.result(timeout=2) for f in futures] == ["A", "B"]
+        assert sorted(sent) == ["a", "b"]
+    finally:
+        coalescer.close()
+
+
+def test_coalescer_releases_at_max_batch_size(monkeypatch):
+    _fake_server(monkeypatch, lambda req: req["source"].upper())
+    coalescer = _coalescer(window_ms=60_000, max_batch_size=3)
+    try:
+        futures = [coalescer.submit(s) for s in "abc"]
+        assert [f.result(timeout=2) for f in futures] == ["A", "B", "C"]
+        assert coalescer._timer is None
+    finally:
+        coalescer.close()
+
+
+def test_coalescer_delivers_errors_to_each_caller(monkeypatch):
+    def create(req):
+        if req["source"] == "bad":
+            raise ConnectionError("server went away")
+        return req["source"].upper()
+    _fake_server(monkeypatch, create)
+
+    real_build = vtt._build_transcription_request
+    def build(audio, language):
+        if audio == "corrupt":
+            raise ValueError("cannot encode")
+        return real_build(audio, language)
+    monkeypatch.setattr(vtt, "_build_transcription_request", build)
+
+    coalescer = _coalescer(window_ms=60_000, max_batch_size=3)
+    try:
+        good, bad, corrupt = (coalescer.submit(s) for s in ("good", "bad", "corrupt"))
+        assert good.result(timeout=2) == "GOOD"
+        assert isinstance(bad.exception(timeout=2), ConnectionError)
+        assert isinstance(corrupt.exception(timeout=2), ValueError)
+    finally:
+        coalescer.close()
+
+
+def test_coalescer_window_follows_server_latency(monkeypatch):
+    monkeypatch.setattr(config, "TRANSCRIPTION_COALESCE_LATENCY_FRACTION", 0.5)
+    coalescer = vtt.TranscriptionCoalescer(
+        "http://fake-server", window_ms=50, min_window_ms=10, max_window_ms=200, adaptive=True,
+    )
+    try:
+        coalescer._observe_latency(0.1)
+        assert coalescer.window_seconds == 0.05
+        coalescer._observe_latency(0.6)  # EWMA 0.8 * 0.1 + 0.2 * 0.6 = 0.2
+        assert abs(coalescer.window_seconds - 0.1) < 1e-9
+        coalescer._observe_latency(10.0)
+        assert coalescer.window_seconds == 0.2  # Clamped to max_window_ms
+        for _ in range(50):
+            coalescer._observe_latency(0.001)
+        assert coalescer.window_seconds == 0.01  # Clamped to min_window_ms
+    finally:
+        coalescer.close()
+
+
+def test_coalescer_close_flushes_and_leaves_registry(monkeypatch):
+    _fake_server(monkeypatch, lambda req: req["source"].upper())
+    monkeypatch.setattr(vtt, "_coalescer_cache", {})
+    coalescer = vtt.get_coalescer("http://fake-server")
+    assert vtt.get_coalescer("http://fake-server") is coalescer
+
+    held = coalescer.submit("a")
+    coalescer.close()
+    assert held.result(timeout=0) == "A"  # close() waited for the held request
+    coalescer.close()  # Idempotent
+    with pytest.raises(RuntimeError):
+        coalescer.submit("b")
+    assert vtt.get_coalescer("http://fake-server") is not coalescer
+    vtt.get_coalescer("http://fake-server").close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))